@@ -0,0 +1,416 @@
+"""Runtime validation of model actions and mapping of their clicks.
+
+The clients return whatever JSON object the model produced.  Before it can
+move the mouse, `ActionParser`
+
+* validates it against `ACTION_SCHEMA` with a validator compiled once from
+  the schema – a tree of small closures, much cheaper per call than
+  `jsonschema.validate`, which re‑walks the schema every time,
+* turns it into an `Action`, a `__slots__` object with typed fields, and
+* maps its click from model‑image pixels to window pixels, for a whole batch
+  of actions in one vectorised step, optionally snapping it onto the plugin
+  object it hits (`snap_to_window`).
+
+Malformed actions and the clients' fallback centre clicks are dropped and
+counted by failure instead of being clicked somewhere arbitrary; the
+pipeline then treats the frame as a no‑op and moves on to the next one.
+
+`action_schema` derives variants of the schema for constrained decoding: the
+clients can pass it to the backend (Ollama `format`, OpenAI‑style
+`response_format`) so the model can only produce a valid action, and a terse
+variant caps or drops `reason`, which otherwise accounts for most of the
+generated tokens.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .config import RegionConfig
+from .metrics import REGISTRY, MetricsRegistry
+from .utils.spatial import GridIndex
+
+ACTION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "click": {
+            "type": "array",
+            "items": {"type": "integer"},
+            "minItems": 2,
+            "maxItems": 2,
+        },
+        "modifiers": {
+            "type": "object",
+            "properties": {
+                "shift": {"type": "boolean"},
+            },
+            "required": ["shift"],
+        },
+        "reason": {"type": "string"},
+    },
+    "required": ["click", "modifiers", "reason"],
+}
+
+REASON_MODES = ("full", "capped", "none")
+
+Validator = Callable[[Any], Optional[str]]
+
+_TYPES: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+_ANNOTATIONS = {"title", "description", "default", "examples", "$schema"}
+
+
+def compile_schema(schema: Dict[str, Any], path: str = "$") -> Validator:
+    """Compile a JSON schema into a validator function.
+
+    Supports the subset the action schemas use: `type`, `properties`,
+    `required`, `additionalProperties: false`, `items`, `minItems`,
+    `maxItems`, `minLength`, `maxLength`, `minimum`, `maximum` and `enum`.
+
+    Args:
+        schema: The schema.
+        path: Location of `schema` in the document, used in error messages.
+
+    Returns:
+        `validate(value)` returning None if `value` is valid, otherwise a
+        short message naming the failing location and keyword (never the
+        value, so messages can be used as counter keys).
+
+    Raises:
+        ValueError: If the schema uses an unsupported keyword.
+    """
+    unknown = set(schema) - _ANNOTATIONS - {
+        "type", "properties", "required", "additionalProperties", "items",
+        "minItems", "maxItems", "minLength", "maxLength", "minimum", "maximum", "enum",
+    }
+    if unknown:
+        raise ValueError(f"Unsupported schema keywords at {path}: {sorted(unknown)}")
+    checks: List[Validator] = []
+
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else list(types)
+        preds = [_TYPES[name] for name in names]
+        message = f"{path}: expected {'/'.join(names)}"
+        checks.append(lambda v: None if any(p(v) for p in preds) else message)
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+        checks.append(lambda v: None if v in allowed else f"{path}: not in enum")
+    for key, test in (("minimum", lambda v, b: v >= b), ("maximum", lambda v, b: v <= b)):
+        if key in schema:
+            checks.append(_bound(path, key, schema[key], test, (int, float)))
+    for key, test in (("minLength", lambda v, b: len(v) >= b), ("maxLength", lambda v, b: len(v) <= b)):
+        if key in schema:
+            checks.append(_bound(path, key, schema[key], test, str))
+    for key, test in (("minItems", lambda v, b: len(v) >= b), ("maxItems", lambda v, b: len(v) <= b)):
+        if key in schema:
+            checks.append(_bound(path, key, schema[key], test, list))
+    if "items" in schema:
+        item = compile_schema(schema["items"], f"{path}[]")
+
+        def check_items(value: Any) -> Optional[str]:
+            if isinstance(value, list):
+                for element in value:
+                    error = item(element)
+                    if error is not None:
+                        return error
+            return None
+
+        checks.append(check_items)
+    properties = {name: compile_schema(sub, f"{path}.{name}") for name, sub in (schema.get("properties") or {}).items()}
+    required = list(schema.get("required") or [])
+    closed = schema.get("additionalProperties", True) is False
+    if properties or required or closed:
+        known = set(properties)
+
+        def check_object(value: Any) -> Optional[str]:
+            if not isinstance(value, dict):
+                return None
+            for name in required:
+                if name not in value:
+                    return f"{path}.{name}: missing"
+            for name, validate in properties.items():
+                if name in value:
+                    error = validate(value[name])
+                    if error is not None:
+                        return error
+            if closed and not known.issuperset(value):
+                return f"{path}: unexpected property"
+            return None
+
+        checks.append(check_object)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def validate(value: Any) -> Optional[str]:
+        for check in checks:
+            error = check(value)
+            if error is not None:
+                return error
+        return None
+
+    return validate
+
+
+def action_schema(reason: str = "full", reason_length: int = 60, images: int = 1,
+                  strict: bool = False) -> Dict[str, Any]:
+    """Build the action schema for a reason mode and observation layout.
+
+    Args:
+        reason: `full` (free text), `capped` (at most `reason_length`
+            characters) or `none` (no reason).
+        reason_length: Character cap in `capped` mode.
+        images: Images per observation; with more than one the action
+            carries the `image` index of its click.
+        strict: Require every property and forbid others, as structured
+            output backends expect.  Without it `reason` is optional in
+            `none` mode and extra properties are allowed, as in
+            `ACTION_SCHEMA`.
+
+    Returns:
+        A new schema.
+    """
+    if reason not in REASON_MODES:
+        raise ValueError(f"Unsupported reason mode: {reason}")
+    modifiers: Dict[str, Any] = {
+        "type": "object",
+        "properties": {"shift": {"type": "boolean"}},
+        "required": ["shift"],
+    }
+    properties: Dict[str, Any] = {
+        "click": {"type": "array", "items": {"type": "integer"}, "minItems": 2, "maxItems": 2},
+        "modifiers": modifiers,
+    }
+    required = ["click", "modifiers"]
+    if images > 1:
+        properties["image"] = {"type": "integer"}
+        if strict:
+            properties["image"].update(minimum=0, maximum=images - 1)
+            required.append("image")
+    if reason != "none":
+        properties["reason"] = {"type": "string"}
+        if reason == "capped":
+            properties["reason"]["maxLength"] = int(reason_length)
+        required.append("reason")
+    schema: Dict[str, Any] = {"type": "object", "properties": properties, "required": required}
+    if strict:
+        schema["additionalProperties"] = False
+        modifiers["additionalProperties"] = False
+    return schema
+
+
+def batch_schema(schema: Dict[str, Any], count: int) -> Dict[str, Any]:
+    """Return the schema of a reply carrying `count` actions."""
+    return {"type": "array", "items": schema, "minItems": count, "maxItems": count}
+
+
+def terse_prompt(prompt: str, reason: str, reason_length: int = 60) -> str:
+    """Extend the system prompt to cap or drop `reason`."""
+    if reason == "capped":
+        return f"{prompt}\n\nKeep `reason` to a few words, at most {int(reason_length)} characters."
+    if reason == "none":
+        return f"{prompt}\n\nOmit `reason`; output only `click` and `modifiers`."
+    return prompt
+
+
+def _bound(path: str, key: str, bound: Any, test: Callable[[Any, Any], bool], kinds) -> Validator:
+    message = f"{path}: {key}"
+    return lambda v: message if isinstance(v, kinds) and not isinstance(v, bool) and not test(v, bound) else None
+
+
+class Action:
+    """A validated click action.
+
+    Attributes:
+        x, y: Click position; in model‑image pixels as parsed, window pixels
+            after `ActionParser.to_window`.
+        shift: Whether shift is held during the click.
+        reason: The model's explanation (may be empty).
+        image: Index of the region image the click refers to.
+    """
+
+    __slots__ = ("x", "y", "shift", "reason", "image")
+
+    def __init__(self, x: int, y: int, shift: bool = False, reason: str = "", image: int = 0):
+        self.x = x
+        self.y = y
+        self.shift = shift
+        self.reason = reason
+        self.image = image
+
+    @property
+    def click(self) -> Tuple[int, int]:
+        return self.x, self.y
+
+    def moved(self, x: int, y: int) -> "Action":
+        """Return a copy clicking at `(x, y)` instead."""
+        return Action(int(x), int(y), self.shift, self.reason, self.image)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the action in the model's JSON format."""
+        out: Dict[str, Any] = {"click": [self.x, self.y], "modifiers": {"shift": self.shift}, "reason": self.reason}
+        if self.image:
+            out["image"] = self.image
+        return out
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Action):
+            return NotImplemented
+        return (self.x, self.y, self.shift, self.reason, self.image) == \
+            (other.x, other.y, other.shift, other.reason, other.image)
+
+    def __repr__(self) -> str:
+        return f"Action(x={self.x}, y={self.y}, shift={self.shift}, reason={self.reason!r}, image={self.image})"
+
+
+def scale_points(points: Any, src_size: Any, dst_size: Any, offset: Any = 0) -> np.ndarray:
+    """Map pixel positions between two resolutions of the same area.
+
+    Positions are taken at pixel centres, so the centre of the source maps
+    to the centre of the destination, and the results are clamped to it.
+    The sizes and offset broadcast against `points`, so every point can have
+    its own source, destination and offset.
+
+    Args:
+        points: `(n, 2)` x/y positions in the source.
+        src_size: Source (width, height), shape `(2,)` or `(n, 2)`.
+        dst_size: Destination (width, height), shape `(2,)` or `(n, 2)`.
+        offset: Added to the results (e.g. a region's left/top).
+
+    Returns:
+        `(n, 2)` int64 positions in the destination.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    src = np.asarray(src_size, dtype=np.float64)
+    dst = np.asarray(dst_size, dtype=np.float64)
+    offset = np.asarray(offset, dtype=np.float64)
+    out = np.floor(offset + (points + 0.5) * dst / src)
+    return np.clip(out, offset, offset + dst - 1).astype(np.int64)
+
+
+class ActionParser:
+    """Validate model output and map clicks to window pixels.
+
+    Args:
+        schema: Schema the model output must satisfy.
+        model_size: (width, height) of the full‑window model image.
+        regions: Capture regions; if set, clicks refer to the region image
+            selected by `image` and map into that region.
+        fallback_reasons: `reason` values of client fallback actions, which
+            are rejected like malformed output.
+        metrics: Registry for the `invalid_actions` counter.
+    """
+
+    def __init__(
+        self,
+        schema: Optional[Dict[str, Any]] = None,
+        model_size: Tuple[int, int] = (224, 224),
+        regions: Optional[Sequence[RegionConfig]] = None,
+        fallback_reasons: Sequence[str] = (),
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self._validate = compile_schema(schema if schema is not None else ACTION_SCHEMA)
+        self.model_size = (int(model_size[0]), int(model_size[1]))
+        self.regions = list(regions or [])
+        self.fallback_reasons = frozenset(fallback_reasons)
+        self.metrics = metrics if metrics is not None else REGISTRY
+        # Per‑region source size, destination size and offset for to_window.
+        self._src = np.array([r.output_size for r in self.regions], dtype=np.float64).reshape(-1, 2)
+        self._dst = np.array([(r.width, r.height) for r in self.regions], dtype=np.float64).reshape(-1, 2)
+        self._off = np.array([(r.left, r.top) for r in self.regions], dtype=np.float64).reshape(-1, 2)
+        self.parsed = 0
+        self.failures: Dict[str, int] = {}
+
+    def parse(self, data: Any) -> Optional[Action]:
+        """Validate one model action.
+
+        Returns:
+            The action, or None (counted) if it is malformed or a fallback.
+        """
+        if isinstance(data, dict) and data.get("reason") in self.fallback_reasons:
+            return self._fail("fallback")
+        error = self._validate(data)
+        if error is not None:
+            return self._fail(error)
+        click = data.get("click")
+        if click is None:
+            return self._fail("$.click: missing")
+        modifiers = data.get("modifiers") or {}
+        image = data.get("image", 0)
+        if not isinstance(image, int) or not 0 <= image < len(self.regions):
+            image = 0
+        self.parsed += 1
+        return Action(click[0], click[1], bool(modifiers.get("shift", False)), data.get("reason") or "", image)
+
+    def _fail(self, reason: str) -> None:
+        self.failures[reason] = self.failures.get(reason, 0) + 1
+        self.metrics.inc("invalid_actions")
+        return None
+
+    def to_window(self, actions: Sequence[Action],
+                  window: Union[Tuple[int, int], Sequence[Tuple[int, int]]] = (224, 224)) -> List[Action]:
+        """Map clicks from model‑image pixels to window pixels.
+
+        Args:
+            actions: Parsed actions.
+            window: (width, height) of the window, or one per action.
+                Ignored with regions, which are given in window pixels.
+
+        Returns:
+            New actions with window‑pixel clicks (clamped to the window or
+            region) and `image` reset to 0.
+        """
+        if not actions:
+            return []
+        points = [(a.x, a.y) for a in actions]
+        if self.regions:
+            index = np.fromiter((a.image for a in actions), dtype=np.intp, count=len(actions))
+            mapped = scale_points(points, self._src[index], self._dst[index], self._off[index])
+        else:
+            mapped = scale_points(points, self.model_size, np.asarray(window).reshape(-1, 2))
+        return [Action(x, y, a.shift, a.reason) for a, (x, y) in zip(actions, mapped.tolist())]
+
+    def snap_to_window(self, action: Action, window: Tuple[int, int], grid: GridIndex,
+                       objects: Sequence[Dict[str, Any]], max_distance: float) -> Action:
+        """Map one click to window pixels and snap it onto a plugin object.
+
+        Object boxes are in window pixels, so the click is scaled out of the
+        model image before the index is queried.
+
+        Args:
+            action: Parsed action, click in model‑image pixels.
+            window: (width, height) of the window.
+            grid: Index kept in sync with `objects`.
+            objects: The plugin objects of the frame.
+            max_distance: Largest distance in window pixels to a centre
+                for a click outside every box to snap.
+
+        Returns:
+            The action in window pixels, moved to the centre of the object
+            it hits or nearly hits.
+        """
+        action = self.to_window([action], window)[0]
+        grid.sync(objects)
+        snapped = grid.snap(action.x, action.y, max_distance)
+        if snapped is None or tuple(snapped) == action.click:
+            return action
+        self.metrics.inc("snapped_clicks")
+        return action.moved(*snapped)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return parsed and rejected counts, by failure."""
+        return {
+            "parsed": self.parsed,
+            "invalid": sum(self.failures.values()),
+            "failures": dict(self.failures),
+        }
@@ -0,0 +1,307 @@
+"""Mouse actuation on a dedicated thread.
+
+`control.move_and_click` sleeps through the whole movement on the caller's
+thread.  `Actuator` instead accepts click commands on a queue and plays the
+Bezier path on its own thread, so capture and inference keep running while
+the cursor moves.  A newer command from the same source pre‑empts the one in
+flight: the path is abandoned where the cursor is and a fresh path starts
+towards the new target.  Commands from different sources (e.g. game windows
+sharing the one cursor) are played in order.
+
+The input device is a pluggable backend:
+
+* `PyAutoGUIBackend` – portable; pyautogui's per‑call `PAUSE` is disabled
+  because the actuator does its own pacing,
+* `XTestBackend` – injects events directly through the X11 XTest extension
+  (Linux, requires `python-xlib`),
+* `NullBackend` – records events instead of moving anything, for tests and
+  offline runs.
+
+For every command the actuator records the planned movement duration and the
+time it actually took.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+from .metrics import REGISTRY, MetricsRegistry
+from .utils.beziers import bezier_path
+from .utils.geometry import clamp_point
+
+logger = logging.getLogger("qposrs")
+
+
+class NullBackend:
+    """Record cursor events instead of performing them."""
+
+    def __init__(self, start: Tuple[int, int] = (0, 0)):
+        self._pos = start
+        self.events: List[Tuple[float, str, int, int]] = []
+
+    def position(self) -> Tuple[int, int]:
+        return self._pos
+
+    def move_to(self, x: int, y: int) -> None:
+        self._pos = (x, y)
+        self.events.append((time.monotonic(), "move", x, y))
+
+    def click(self) -> None:
+        self.events.append((time.monotonic(), "click", self._pos[0], self._pos[1]))
+
+    def clicks(self) -> List[Tuple[int, int]]:
+        return [(x, y) for _, kind, x, y in self.events if kind == "click"]
+
+
+class PyAutoGUIBackend:
+    """Drive the cursor through pyautogui."""
+
+    def __init__(self) -> None:
+        import pyautogui
+
+        # The actuator paces the path itself; pyautogui's default 0.1 s pause
+        # after every call would stretch a 15‑step path by 1.5 s.
+        pyautogui.PAUSE = 0
+        self._gui = pyautogui
+
+    def position(self) -> Tuple[int, int]:
+        pos = self._gui.position()
+        return int(pos[0]), int(pos[1])
+
+    def move_to(self, x: int, y: int) -> None:
+        self._gui.moveTo(x, y, _pause=False)
+
+    def click(self) -> None:
+        self._gui.click(_pause=False)
+
+
+class XTestBackend:
+    """Inject pointer events through the X11 XTest extension."""
+
+    def __init__(self, display_name: Optional[str] = None) -> None:
+        from Xlib import X, display
+        from Xlib.ext import xtest
+
+        self._X = X
+        self._xtest = xtest
+        self._display = display.Display(display_name)
+        self._root = self._display.screen().root
+
+    def position(self) -> Tuple[int, int]:
+        pointer = self._root.query_pointer()
+        return int(pointer.root_x), int(pointer.root_y)
+
+    def move_to(self, x: int, y: int) -> None:
+        self._xtest.fake_input(self._display, self._X.MotionNotify, x=int(x), y=int(y))
+        self._display.sync()
+
+    def click(self) -> None:
+        self._xtest.fake_input(self._display, self._X.ButtonPress, 1)
+        self._xtest.fake_input(self._display, self._X.ButtonRelease, 1)
+        self._display.sync()
+
+
+def make_backend(name: str = "auto") -> Any:
+    """Create an input backend by name.
+
+    Args:
+        name: `pyautogui`, `xtest`, `null` or `auto` (XTest on Linux when
+            python‑xlib is available, otherwise pyautogui).
+    """
+    name = name.lower()
+    if name == "null":
+        return NullBackend()
+    if name == "pyautogui":
+        return PyAutoGUIBackend()
+    if name == "xtest":
+        return XTestBackend()
+    if name == "auto":
+        if sys.platform.startswith("linux"):
+            try:
+                return XTestBackend()
+            except Exception as exc:  # python-xlib missing or no X display
+                logger.info("XTest backend unavailable (%s); using pyautogui", exc)
+        return PyAutoGUIBackend()
+    raise ValueError(f"Unknown actuator backend: {name}")
+
+
+@dataclass
+class Command:
+    """One queued click.  `done` is set once it completed or was pre‑empted."""
+
+    target: Tuple[int, int]
+    duration: float
+    source: Hashable = None
+    submitted: float = field(default_factory=time.monotonic)
+    done: threading.Event = field(default_factory=threading.Event)
+    preempted: bool = False
+    actual: float = 0.0
+    finished: float = 0.0
+
+    def finish(self) -> None:
+        """Stamp the completion time and set `done`."""
+        self.finished = time.monotonic()
+        self.done.set()
+
+
+class Actuator:
+    """Play click commands on a background thread.
+
+    Args:
+        backend: Input backend (see `make_backend`).
+        steps: Number of points per Bezier path.
+        duration: Default movement duration in seconds.
+        metrics: Registry for timing (the process‑wide one by default).
+    """
+
+    def __init__(self, backend: Any, steps: int = 15, duration: float = 0.15, metrics: Optional[MetricsRegistry] = None):
+        self.backend = backend
+        self.steps = max(int(steps), 2)
+        self.duration = float(duration)
+        self.metrics = metrics if metrics is not None else REGISTRY
+        self._pending: Deque[Command] = deque()
+        self._current: Optional[Command] = None
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        self.completed = 0
+        self.preempted = 0
+        self._planned_total = 0.0
+        self._actual_total = 0.0
+        self._overrun_max = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="actuator", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop after the command in flight; queued commands are dropped."""
+        with self._cond:
+            self._stop = True
+            for command in self._pending:
+                command.preempted = True
+                command.finish()
+            self._pending.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+    def submit(
+        self,
+        target: Tuple[int, int],
+        window_rect: Optional[Dict[str, int]] = None,
+        duration: Optional[float] = None,
+        source: Hashable = None,
+    ) -> Command:
+        """Queue a click without waiting for it.
+
+        Args:
+            target: Click position; relative to `window_rect` if given,
+                otherwise absolute screen coordinates.
+            window_rect: Window the target lies in; the click is clamped to it.
+            duration: Movement duration (defaults to the actuator's).
+            source: Commands pre‑empt earlier ones with the same source.
+
+        Returns:
+            The queued command.
+        """
+        x, y = int(target[0]), int(target[1])
+        if window_rect is not None:
+            x, y = clamp_point(window_rect["left"] + x, window_rect["top"] + y,
+                               window_rect["left"], window_rect["top"],
+                               window_rect["width"], window_rect["height"])
+        command = Command(target=(x, y), duration=self.duration if duration is None else float(duration), source=source)
+        with self._cond:
+            for old in [c for c in self._pending if c.source == source]:
+                self._pending.remove(old)
+                old.preempted = True
+                self.preempted += 1
+                old.finish()
+            self._pending.append(command)
+            self._cond.notify_all()
+        return command
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no command is queued or in flight."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._current is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _superseded(self, command: Command) -> bool:
+        return any(c.source == command.source for c in self._pending)
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                command = self._current = self._pending.popleft()
+            try:
+                self._play(command)
+            finally:
+                with self._cond:
+                    self._current = None
+                    self._cond.notify_all()
+                command.finish()
+
+    def _play(self, command: Command) -> None:
+        path = bezier_path(self.backend.position(), command.target, steps=self.steps)
+        start = time.monotonic()
+        last = len(path) - 1
+        for i, (px, py) in enumerate(path):
+            due = start + command.duration * i / last
+            with self._cond:
+                while not self._stop and not self._superseded(command):
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stop or self._superseded(command):
+                    command.preempted = True
+                    self.preempted += 1
+                    return
+            self.backend.move_to(px, py)
+        self.backend.click()
+        command.actual = time.monotonic() - start
+        overrun = command.actual - command.duration
+        self.completed += 1
+        self._planned_total += command.duration
+        self._actual_total += command.actual
+        self._overrun_max = max(self._overrun_max, overrun)
+        self.metrics.observe("mouse_move", command.actual)
+        self.metrics.observe("mouse_overrun", max(overrun, 0.0))
+
+    def summary(self) -> Dict[str, Any]:
+        """Return completion, pre‑emption and planned vs actual timing."""
+        done = self.completed
+        return {
+            "completed": done,
+            "preempted": self.preempted,
+            "planned_ms": round(self._planned_total / done * 1000.0, 2) if done else 0.0,
+            "actual_ms": round(self._actual_total / done * 1000.0, 2) if done else 0.0,
+            "max_overrun_ms": round(self._overrun_max * 1000.0, 2),
+        }
@@ -0,0 +1,283 @@
+"""Offline throughput benchmark of the inference path.
+
+`run_bench` replays a set of frames as fast as possible through the same
+preprocess → encode → infer → parse path the live loop uses, with a
+configurable number of requests in flight, and returns a JSON‑serialisable
+report of throughput, end‑to‑end latency percentiles and the per‑stage
+breakdown from the metrics registry.  Frames are decoded once up front so
+disk reads do not show up in the numbers.
+
+`StubModelServer` is a local stand‑in for the model backend that answers
+Ollama‑style requests (plain or streamed, single or batched) after a delay
+drawn from a configurable latency distribution, so backends and regressions
+can be compared without a GPU or a game client.
+
+Latency distributions are given as `name:arg[:arg]` strings, in seconds:
+
+    constant:0.25
+    uniform:0.1:0.4
+    normal:0.25:0.05        (mean, standard deviation; clipped at 0)
+    lognormal:0.25:0.5      (median, sigma of the underlying normal)
+    exponential:0.25        (mean)
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from .metrics import REGISTRY, MetricsRegistry
+from .recorder import iter_recording
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+
+# Text the stub appends after the action in streamed replies, standing in for
+# the explanation Qwen tends to add once the JSON is complete.
+_TRAILING_TEXT = " The action above clicks the most relevant target on screen." * 4
+
+
+def parse_latency(spec: str, seed: Optional[int] = None) -> Callable[[], float]:
+    """Turn a latency distribution spec into a sampler returning seconds.
+
+    Args:
+        spec: Distribution spec, e.g. `constant:0.2` or `normal:0.25:0.05`.
+        seed: Optional seed for reproducible samples.
+
+    Returns:
+        A callable returning one non‑negative latency per call.
+    """
+    name, _, rest = spec.partition(":")
+    try:
+        args = [float(a) for a in rest.split(":")] if rest else []
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}") from None
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    name = name.lower()
+    if name == "constant" and len(args) == 1:
+        draw = lambda: args[0]
+    elif name == "uniform" and len(args) == 2:
+        draw = lambda: rng.uniform(args[0], args[1])
+    elif name == "normal" and len(args) == 2:
+        draw = lambda: rng.gauss(args[0], args[1])
+    elif name == "lognormal" and len(args) == 2 and args[0] > 0:
+        draw = lambda: rng.lognormvariate(math.log(args[0]), args[1])
+    elif name == "exponential" and len(args) == 1 and args[0] > 0:
+        draw = lambda: rng.expovariate(1.0 / args[0])
+    else:
+        raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample() -> float:
+        with lock:
+            return max(draw(), 0.0)
+
+    return sample
+
+
+class StubModelServer:
+    """Local HTTP server imitating an Ollama `/api/generate` endpoint.
+
+    Every request is answered with a centre click after a delay from
+    `latency`.  Batch requests (an array `format` or the batch prompt of
+    `BaseClient.batch_prompt`) get a JSON array with one action per image;
+    other requests with several images carry region crops and get one action
+    on the first crop (`"image": 0`).  Requests with `stream: true` get NDJSON
+    chunks followed by trailing chatter, so early stopping is exercised too.
+
+    Args:
+        latency: Sampler returning seconds, e.g. from `parse_latency`.
+        host: Interface to bind.
+        port: Port to bind; 0 picks a free one.
+    """
+
+    def __init__(self, latency: Callable[[], float], host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests += 1
+                time.sleep(stub.latency())
+                count = len(request.get("images") or [request.get("image")])
+                action = {"click": [112, 112], "modifiers": {"shift": False}, "reason": "stub"}
+                fmt = request.get("format")
+                batch = ((isinstance(fmt, dict) and fmt.get("type") == "array")
+                         or "independent observations" in str(request.get("prompt", "")))
+                if batch:
+                    text = json.dumps([action] * count)
+                elif count > 1:
+                    text = json.dumps(dict(action, image=0))
+                else:
+                    text = json.dumps(action)
+                if request.get("stream"):
+                    self._stream(text)
+                else:
+                    self._send(json.dumps({"response": text, "done": True}).encode("utf-8"))
+
+            def _send(self, body: bytes) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, text: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                pieces = [text[i:i + 16] for i in range(0, len(text), 16)] + [_TRAILING_TEXT]
+                try:
+                    for piece in pieces:
+                        self.wfile.write((json.dumps({"response": piece, "done": False}) + "\n").encode("utf-8"))
+                        self.wfile.flush()
+                    self.wfile.write((json.dumps({"response": "", "done": True}) + "\n").encode("utf-8"))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-model", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+
+def load_frames(source: str) -> List[np.ndarray]:
+    """Load every frame of a directory of images or a recorded run.
+
+    Args:
+        source: Directory containing `.png`/`.jpg` frames (e.g.
+            `demo_frames/`), or a run recorded by `recorder.RunRecorder`.
+
+    Returns:
+        The frames in file‑name or recording order, in OpenCV's BGR channel
+        order.
+    """
+    if os.path.exists(os.path.join(source, "index.jsonl")):
+        with open(os.path.join(source, "meta.json"), "r", encoding="utf-8") as fh:
+            recorded_order = json.load(fh).get("channel_order", "rgb")
+        frames = []
+        for _, frame in iter_recording(source):
+            frame = np.asarray(frame)
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR) if recorded_order == "rgb" else frame.copy())
+        return frames
+    paths = sorted(p for p in Path(source).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    frames = []
+    for path in paths:
+        img = cv2.imread(str(path))
+        if img is not None:
+            frames.append(img)
+    return frames
+
+
+def _percentiles_ms(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    arr = np.asarray(samples, dtype=np.float64) * 1000.0
+    p50, p95, p99 = np.quantile(arr, (0.5, 0.95, 0.99))
+    return {
+        "mean": round(float(arr.mean()), 2),
+        "p50": round(float(p50), 2),
+        "p95": round(float(p95), 2),
+        "p99": round(float(p99), 2),
+        "max": round(float(arr.max()), 2),
+    }
+
+
+def run_bench(
+    client: Any,
+    frames: List[np.ndarray],
+    prompt: str,
+    iterations: Optional[int] = None,
+    concurrency: int = 1,
+    warmup: int = 2,
+    channel_order: str = "rgb",
+    size: tuple = (224, 224),
+    registry: MetricsRegistry = REGISTRY,
+) -> Dict[str, Any]:
+    """Replay frames through preprocess → encode → infer → parse.
+
+    Args:
+        client: Model client exposing `generate_action`.
+        frames: BGR frames as returned by `load_frames`; reused cyclically.
+        prompt: System prompt sent with every frame.
+        iterations: Number of measured requests (defaults to one per frame).
+        concurrency: Number of requests kept in flight.
+        warmup: Requests sent before measuring, to open connections and let
+            the backend load the model.
+        channel_order: Channel order the client expects, `rgb` or `bgr`.
+        size: Model input size.
+        registry: Registry whose stage breakdown is reported; it is reset
+            after the warmup.
+
+    Returns:
+        A JSON‑serialisable report.
+    """
+    if not frames:
+        raise ValueError("No frames to benchmark")
+    iterations = len(frames) if iterations is None else int(iterations)
+    concurrency = max(int(concurrency), 1)
+    fallback_reasons = set(getattr(client, "FALLBACK_REASONS", ()))
+
+    def one(index: int) -> tuple:
+        start = time.perf_counter()
+        with registry.span("resize"):
+            img = frames[index % len(frames)]
+            if channel_order == "rgb":
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+        action = client.generate_action(prompt, img, objects=None)
+        return time.perf_counter() - start, action.get("reason") in fallback_reasons
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+        list(pool.map(one, range(max(int(warmup), 0))))
+        registry.reset()
+        start = time.perf_counter()
+        results = list(pool.map(one, range(iterations)))
+        wall = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in results]
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "warmup": int(warmup),
+        "wall_s": round(wall, 3),
+        "throughput_fps": round(iterations / wall, 2) if wall > 0 else 0.0,
+        "latency_ms": _percentiles_ms(latencies),
+        "fallbacks": sum(1 for _, fallback in results if fallback),
+        "stages": registry.summary(),
+    }
@@ -3,56 +3,167 @@
 This module wraps the `mss` library to capture a rectangular region of the
 desktop at a specified frame rate.  Captured frames can be downscaled to
 224×224 pixels and optionally masked to hide the chatbox.  The capture
-functions return images in RGB numpy array format.
+functions return images in RGB numpy array format, or in OpenCV's BGR order
+when the capturer is created with `channel_order="bgr"` so the encoder can
+skip its own conversion.  `ChangeDetector` compares consecutive frames so
+the loop can skip model calls while the scene is static.
+
+Two preprocessing paths are provided.  The default copies the mss buffer,
+converts it and resizes it, allocating three full‑size arrays per frame.
+With `zero_copy=True` the capturer wraps the mss buffer in place and
+`FusedPreprocessor` resizes only the unmasked part of the window straight into
+preallocated output arrays, so steady‑state capture allocates nothing.
+
+With `regions` configured, `grab_regions` cuts the viewport, inventory and
+minimap out of one grab at their own resolutions instead (see `regions`).
+
+`ScreenCapturer.start` runs capture on a background thread paced by `wait`.
+Timestamped frames land in a small ring buffer; consumers read the newest one
+with `latest`, everything newer than a timestamp with `since`, or block for
+the next frame with `wait_for_frame`, so the tick never pays the grab latency.
 """
 
 from __future__ import annotations
 
+import threading
 import time
-from typing import Optional, Tuple
+from collections import deque
+from typing import Any, Deque, List, Optional, Sequence, Tuple
 
 import mss
 import numpy as np
 import cv2
 
+from .config import RegionConfig
+from .metrics import REGISTRY
+from .regions import Observation, RegionPreprocessor, as_images
+
+# For OSRS, the chatbox occupies roughly the bottom 20% of the window.
+CHAT_FRACTION = 0.8
+
+
+class FusedPreprocessor:
+    """Resize, mask and channel‑convert BGRA frames without allocating.
+
+    The chat area is masked by resizing only the rows above it into the top of
+    a preallocated BGRA scratch image whose remaining rows stay black; the
+    small scratch image is then converted into one of `pool_size` rotating
+    output arrays.  The full‑resolution frame is therefore read once and never
+    copied.  Returned frames are reused after `pool_size` further calls, so
+    consumers that keep frames longer must copy them.
+    """
+
+    def __init__(self, size: Tuple[int, int] = (224, 224), channel_order: str = "rgb",
+                 mask_chat: bool = True, pool_size: int = 4):
+        """Create a preprocessor.
+
+        Args:
+            size: Output (width, height).
+            channel_order: `rgb` or `bgr` channel order of returned frames.
+            mask_chat: If true, black out the lower chat area.
+            pool_size: Number of output arrays to rotate through.
+        """
+        if channel_order not in ("rgb", "bgr"):
+            raise ValueError(f"Unsupported channel order: {channel_order}")
+        self.size = size
+        self.mask_chat = mask_chat
+        self._conversion = cv2.COLOR_BGRA2RGB if channel_order == "rgb" else cv2.COLOR_BGRA2BGR
+        width, height = size
+        self._scratch = np.zeros((height, width, 4), dtype=np.uint8)
+        self._outputs = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(max(int(pool_size), 1))]
+        self._next = 0
+        self._out_rows = int(round(height * CHAT_FRACTION)) if mask_chat else height
+
+    def process(self, buffer, width: int, height: int) -> np.ndarray:
+        """Preprocess a raw BGRA buffer.
+
+        Args:
+            buffer: Object exposing the buffer protocol (e.g. `ScreenShot.raw`)
+                holding `height * width * 4` bytes of BGRA pixels.
+            width: Source width in pixels.
+            height: Source height in pixels.
+
+        Returns:
+            A (h, w, 3) view into the preprocessor's output pool.
+        """
+        src = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4)
+        if self.mask_chat:
+            src = src[:int(height * CHAT_FRACTION)]
+        dst = self._scratch[:self._out_rows]
+        cv2.resize(src, (self.size[0], self._out_rows), dst=dst, interpolation=cv2.INTER_AREA)
+        out = self._outputs[self._next]
+        self._next = (self._next + 1) % len(self._outputs)
+        cv2.cvtColor(self._scratch, self._conversion, dst=out)
+        return out
+
 
 class ScreenCapturer:
     """Capture a region of the screen at a given frame rate."""
 
-    def __init__(self, rect: dict, fps: float = 2.0, mask_chat: bool = True):
+    def __init__(self, rect: dict, fps: float = 2.0, mask_chat: bool = True, channel_order: str = "rgb",
+                 zero_copy: bool = False, pool_size: int = 4, regions: Optional[Sequence[RegionConfig]] = None):
         """Create a new capturer.
 
         Args:
             rect: A dictionary with `left`, `top`, `width`, `height` keys.
             fps: Target frames per second.
             mask_chat: If true, mask out the lower chat area to reduce noise.
+            channel_order: `rgb` or `bgr` channel order of returned frames.
+            zero_copy: Use the allocation‑free `FusedPreprocessor` path in
+                `grab_resized`.
+            pool_size: Number of reusable output frames in zero‑copy mode.
+            regions: Crops produced by `grab_regions`; when set, threaded
+                capture yields a list of region images per frame.
         """
+        if channel_order not in ("rgb", "bgr"):
+            raise ValueError(f"Unsupported channel order: {channel_order}")
         self.rect = rect
         self.fps = fps
         self.mask_chat = mask_chat
-        self.sct = mss.mss()
+        self.channel_order = channel_order
+        self._conversion = cv2.COLOR_BGRA2RGB if channel_order == "rgb" else cv2.COLOR_BGRA2BGR
+        self.zero_copy = zero_copy
+        self.pool_size = pool_size
+        self._fused: dict = {}
+        self.regions = list(regions or [])
+        self._regions: Optional[RegionPreprocessor] = None
+        self._local = threading.local()
         self._last_time: float = 0.0
+        self._ring: Deque[Tuple[float, Any]] = deque(maxlen=4)
+        self._ring_cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
 
-    def grab(self) -> np.ndarray:
-        """Grab the current frame.
+    @property
+    def sct(self) -> "mss.base.MSSBase":
+        """Per-thread mss instance; mss handles must not cross threads."""
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+        return sct
 
-        Returns:
-            A numpy array in RGB format with shape (h, w, 3).
-        """
+    def _grab_raw(self):
         monitor = {
             "left": self.rect["left"],
             "top": self.rect["top"],
             "width": self.rect["width"],
             "height": self.rect["height"],
         }
-        frame = self.sct.grab(monitor)
-        img = np.array(frame)
-        # mss returns BGRA; convert to RGB and drop alpha
-        img = cv2.cvtColor(img, cv2.COLOR_BGRA2RGB)
+        return self.sct.grab(monitor)
+
+    def grab(self) -> np.ndarray:
+        """Grab the current frame.
+
+        Returns:
+            A numpy array in RGB (or BGR) format with shape (h, w, 3).
+        """
+        img = np.array(self._grab_raw())
+        # mss returns BGRA; convert to RGB/BGR and drop alpha
+        img = cv2.cvtColor(img, self._conversion)
         if self.mask_chat:
-            # For OSRS, the chatbox occupies roughly the bottom 20% of the window.
             h = img.shape[0]
-            chat_y = int(h * 0.8)
+            chat_y = int(h * CHAT_FRACTION)
             img[chat_y:, :] = 0
         return img
 
@@ -63,19 +174,194 @@ class ScreenCapturer:
             size: Target (width, height).
 
         Returns:
-            Resized image as a numpy array in RGB format.
+            Resized image as a numpy array in the capturer's channel order.
         """
-        img = self.grab()
-        resized = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+        if self.zero_copy:
+            fused = self._fused.get(size)
+            if fused is None:
+                fused = FusedPreprocessor(size, self.channel_order, self.mask_chat, self.pool_size)
+                self._fused[size] = fused
+            with REGISTRY.span("capture"):
+                shot = self._grab_raw()
+            with REGISTRY.span("resize"):
+                return fused.process(shot.raw, shot.width, shot.height)
+        with REGISTRY.span("capture"):
+            img = self.grab()
+        with REGISTRY.span("resize"):
+            resized = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
         return resized
 
+    def grab_regions(self) -> List[np.ndarray]:
+        """Grab the window once and cut it into the configured regions.
+
+        Returns:
+            One image per region, in the capturer's channel order.  The
+            images are reused after `pool_size` further grabs.
+        """
+        if self._regions is None:
+            self._regions = RegionPreprocessor(self.regions, self.channel_order, self.pool_size)
+        with REGISTRY.span("capture"):
+            shot = self._grab_raw()
+        with REGISTRY.span("resize"):
+            return self._regions.process(shot.raw, shot.width, shot.height)
+
     def wait(self) -> None:
         """Sleep to honour the frame rate."""
         if self.fps <= 0:
             return
-        now = time.time()
+        now = time.monotonic()
         period = 1.0 / self.fps
         dt = now - self._last_time
         if dt < period:
             time.sleep(period - dt)
-        self._last_time = time.time()
\ No newline at end of file
+        self._last_time = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Threaded mode
+    # ------------------------------------------------------------------
+    def start(self, size: Tuple[int, int] = (224, 224), ring_size: int = 4) -> None:
+        """Capture continuously at `fps` on a background thread.
+
+        Args:
+            size: Target (width, height) passed to `grab_resized`; ignored
+                when regions are configured.
+            ring_size: Number of recent frames to keep.
+        """
+        if self._thread is not None:
+            return
+        # Frames in the ring and with consumers must not be overwritten by
+        # the zero‑copy output pool.
+        self.pool_size = max(self.pool_size, ring_size + 2)
+        self._fused.pop(size, None)
+        self._regions = None
+        self._ring = deque(maxlen=max(int(ring_size), 1))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._capture_loop, args=(size,), name="capture", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the background capture thread."""
+        self._stop.set()
+        with self._ring_cond:
+            self._ring_cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    @property
+    def threaded(self) -> bool:
+        return self._thread is not None
+
+    def _capture_loop(self, size: Tuple[int, int]) -> None:
+        while not self._stop.is_set():
+            self.wait()
+            ts = time.monotonic()
+            frame = self.grab_regions() if self.regions else self.grab_resized(size)
+            with self._ring_cond:
+                self._ring.append((ts, frame))
+                self._ring_cond.notify_all()
+
+    def latest(self) -> Optional[Tuple[float, np.ndarray]]:
+        """Return the newest `(timestamp, frame)` pair, if any.
+
+        Timestamps come from `time.monotonic()` and mark the start of the grab.
+        """
+        with self._ring_cond:
+            return self._ring[-1] if self._ring else None
+
+    def since(self, ts: float) -> List[Tuple[float, np.ndarray]]:
+        """Return all buffered frames captured after `ts`, oldest first."""
+        with self._ring_cond:
+            return [item for item in self._ring if item[0] > ts]
+
+    def wait_for_frame(self, after: float = 0.0, timeout: Optional[float] = None) -> Optional[Tuple[float, np.ndarray]]:
+        """Block until a frame newer than `after` is available.
+
+        Args:
+            after: Timestamp of the last frame the caller has seen.
+            timeout: Maximum time to wait in seconds.
+
+        Returns:
+            The newest `(timestamp, frame)` pair, or None on timeout or stop.
+        """
+        with self._ring_cond:
+            ready = self._ring_cond.wait_for(
+                lambda: self._stop.is_set() or (self._ring and self._ring[-1][0] > after), timeout=timeout)
+            if not ready or not self._ring or self._ring[-1][0] <= after:
+                return None
+            return self._ring[-1]
+
+
+class ChangeDetector:
+    """Detect whether the scene changed enough to warrant a model call.
+
+    Frames are reduced to a small thumbnail and compared with the thumbnail of
+    the last frame that was let through, using the mean absolute difference
+    (0–255).  Comparing against the last *sent* frame rather than the previous
+    one means slow drift still accumulates and eventually triggers a send.
+    A multi‑region observation is compared region by region and counts as
+    changed if any region changed, so an inventory‑only change is not lost
+    in the much larger viewport.
+    """
+
+    def __init__(self, threshold: float = 2.0, size: Tuple[int, int] = (32, 32), max_skip: int = 10):
+        """Create a change detector.
+
+        Args:
+            threshold: Minimum mean absolute difference counted as a change.
+                A threshold of 0 lets every frame through.
+            size: Thumbnail (width, height) used for the comparison.
+            max_skip: Force a send after this many consecutive skipped frames
+                (0 disables the limit).
+        """
+        self.threshold = float(threshold)
+        self.size = size
+        self.max_skip = int(max_skip)
+        self._reference: Optional[List[np.ndarray]] = None
+        self._consecutive = 0
+        self.last_score: float = 0.0
+        self.sent = 0
+        self.skipped = 0
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        return cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def changed(self, frame: Observation) -> bool:
+        """Return True if `frame` should be sent to the model.
+
+        Args:
+            frame: Captured frame in any channel order, or a list of region
+                crops.
+
+        Returns:
+            Whether the frame (or any region) differs enough from the last
+            sent one.
+        """
+        thumbs = [self._thumbnail(image) for image in as_images(frame)]
+        if self._reference is None or len(self._reference) != len(thumbs) or self.threshold <= 0:
+            self.last_score = float("inf")
+        else:
+            self.last_score = max(float(np.abs(thumb - ref).mean()) for thumb, ref in zip(thumbs, self._reference))
+        forced = self.max_skip > 0 and self._consecutive >= self.max_skip
+        if forced or self.last_score >= self.threshold:
+            self._reference = thumbs
+            self._consecutive = 0
+            self.sent += 1
+            return True
+        self._consecutive += 1
+        self.skipped += 1
+        return False
+
+    def reset(self) -> None:
+        """Forget the reference frame so the next frame is always sent."""
+        self._reference = None
+        self._consecutive = 0
+
+    def summary(self) -> dict:
+        """Return sent/skipped counters for logging."""
+        total = self.sent + self.skipped
+        return {
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "skip_ratio": round(self.skipped / total, 3) if total else 0.0,
+        }
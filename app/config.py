@@ -10,19 +10,202 @@ from __future__ import annotations
 
 import dataclasses
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
 
 @dataclass
 class ModelConfig:
-    """Configuration for the LLM backend."""
+    """Configuration for the LLM backend.
+
+    `deadline` bounds each request as a whole in seconds (0 for none); an
+    expired request yields no action, so a hung model cannot stall
+    inference for the full `read_timeout`.
+    """
 
     backend: str = "ollama"
     url: str = "http://localhost:11434/api/generate"
     model_name: Optional[str] = None
     headers: Dict[str, str] = field(default_factory=dict)
+    connect_timeout: float = 3.05
+    read_timeout: float = 30.0
+    deadline: float = 0.0
+    pool_size: int = 4
+    image_format: str = "jpeg"
+    image_quality: int = 90
+    png_compression: int = 1
+    stream: bool = False
+
+
+@dataclass
+class DecodingConfig:
+    """Bound what the model may generate.
+
+    With `structured`, the action schema is sent to the backend (Ollama
+    `format`, OpenAI‑style `response_format`) so only valid actions can be
+    generated.  `reason` is `full`, `capped` (at most `reason_length`
+    characters) or `none`; `max_tokens` caps the tokens per action
+    (0 for no cap).
+    """
+
+    structured: bool = False
+    reason: str = "full"
+    reason_length: int = 60
+    max_tokens: int = 0
+
+
+@dataclass
+class RegionConfig:
+    """One crop of the game window sent to the model as its own image.
+
+    `left`/`top`/`width`/`height` are window pixels; `size` is the
+    (width, height) the crop is resized to, or None to keep its own size.
+    """
+
+    name: str
+    left: int
+    top: int
+    width: int
+    height: int
+    size: Optional[Tuple[int, int]] = None
+
+    @property
+    def output_size(self) -> Tuple[int, int]:
+        return self.size if self.size is not None else (self.width, self.height)
+
+
+# Crops for the fixed classic client layout (765×503); `regions: fixed`.
+FIXED_REGIONS: Tuple[RegionConfig, ...] = (
+    RegionConfig("viewport", 4, 4, 512, 334, (384, 252)),
+    RegionConfig("inventory", 548, 205, 190, 261, (143, 196)),
+    RegionConfig("minimap", 550, 4, 210, 160, (105, 80)),
+)
+
+
+@dataclass
+class CaptureConfig:
+    """Screen capture options.
+
+    With `regions` set, every grab is cut into those crops (the first one is
+    the game viewport) instead of being resized to a single 224×224 frame.
+    """
+
+    mask_chat: bool = True
+    zero_copy: bool = False
+    pool_size: int = 4
+    threaded: bool = False
+    ring_size: int = 4
+    regions: List[RegionConfig] = field(default_factory=list)
+
+
+@dataclass
+class ChangeGateConfig:
+    """Skip model calls while the captured scene is static."""
+
+    threshold: float = 0.0
+    policy: str = "noop"
+    max_skip: int = 10
+
+
+@dataclass
+class CacheConfig:
+    """Memoise model actions by perceptual frame hash."""
+
+    enabled: bool = False
+    max_entries: int = 1024
+    ttl: float = 300.0
+    max_distance: int = 4
+    path: Optional[str] = None
+
+
+@dataclass
+class SnapConfig:
+    """Snap model clicks onto plugin objects.
+
+    A click inside an object's bounding box moves to its centre; otherwise it
+    moves to the nearest object centre within `max_distance` pixels.  Both
+    are in window pixels: clicks are snapped after scaling out of the model
+    image.
+    """
+
+    enabled: bool = True
+    max_distance: float = 24.0
+    cell_size: int = 32
+
+
+@dataclass
+class ActuatorConfig:
+    """Background mouse actuator.
+
+    `backend` is `auto`, `pyautogui`, `xtest` (Linux, python‑xlib) or `null`
+    (record only).
+    """
+
+    backend: str = "auto"
+    steps: int = 15
+    duration: float = 0.15
+
+
+@dataclass
+class SchedulerConfig:
+    """Action pacing and game‑tick alignment.
+
+    `sync` selects the tick source the scheduler phase‑locks to: `none`
+    (only enforce `min_interval`), `plugin` (the object feed's `GameTick`
+    messages) or `frames` (captured frames whose change score exceeds
+    `frame_threshold`; needs a capture rate well above 2 FPS).
+    """
+
+    min_interval: float = 0.6
+    period: float = 0.6
+    sync: str = "none"
+    offset: float = 0.03
+    hold: float = 0.1
+    gain: float = 0.3
+    latency_window: int = 20
+    latency_percentile: float = 90.0
+    frame_threshold: float = 8.0
+
+
+@dataclass
+class SpeculationConfig:
+    """Start inference on the newest frame while an action is executing.
+
+    The result is used if the first post‑action frame is within
+    `max_distance` dHash bits of the speculative one.
+    """
+
+    enabled: bool = False
+    max_distance: int = 6
+
+
+@dataclass
+class RecorderConfig:
+    """Record frames, objects and actions to `recording/` in the run directory.
+
+    `compression` is `none` or `delta` (a full frame every
+    `keyframe_interval` frames, compressed differences in between).
+    """
+
+    enabled: bool = False
+    chunk_size: int = 256
+    queue_size: int = 64
+    compression: str = "none"
+    keyframe_interval: int = 30
+
+
+@dataclass
+class MetricsConfig:
+    """Per‑stage latency reporting.
+
+    `port` serves Prometheus text on `/metrics` (None disables the endpoint);
+    a percentile summary is written to `run.log` every `interval` seconds.
+    """
+
+    host: str = "127.0.0.1"
+    port: Optional[int] = None
+    interval: float = 30.0
 
 
 @dataclass
@@ -40,14 +223,43 @@ class WindowRect:
 
 @dataclass
 class AppConfig:
-    """Top‑level application configuration."""
+    """Top‑level application configuration.
+
+    `windows` lists every game window to drive; `window` is the first of them
+    and is kept for single‑window code paths.  With several windows, each
+    client's plugin publishes on its own endpoint: `plugin_addresses` lists
+    them in window order, and the first window falls back to
+    `plugin_address`.
+    """
 
     window: WindowRect
+    windows: List[WindowRect] = field(default_factory=list)
     fps: float = 2.0
     model: ModelConfig = field(default_factory=ModelConfig)
+    decoding: DecodingConfig = field(default_factory=DecodingConfig)
+    capture: CaptureConfig = field(default_factory=CaptureConfig)
+    change_gate: ChangeGateConfig = field(default_factory=ChangeGateConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    snap: SnapConfig = field(default_factory=SnapConfig)
+    actuator: ActuatorConfig = field(default_factory=ActuatorConfig)
+    scheduler: SchedulerConfig = field(default_factory=SchedulerConfig)
+    speculation: SpeculationConfig = field(default_factory=SpeculationConfig)
+    recorder: RecorderConfig = field(default_factory=RecorderConfig)
     plugin_enabled: bool = False
+    plugin_address: str = "tcp://127.0.0.1:5555"
+    plugin_addresses: List[str] = field(default_factory=list)
+    plugin_max_age: float = 1.2
+    plugin_conflate: bool = True
     rag_enabled: bool = False
     log_dir: Optional[str] = None
+    queue_size: int = 1
+    channel_order: str = "rgb"
+    batch_window: float = 0.05
+
+    def __post_init__(self) -> None:
+        if not self.windows:
+            self.windows = [self.window]
 
 
 def _parse_window(data: Dict[str, Any]) -> WindowRect:
@@ -62,11 +274,40 @@ def _parse_window(data: Dict[str, Any]) -> WindowRect:
         raise ValueError(f"Invalid window configuration: {data}") from exc
 
 
+def _parse_region(data: Dict[str, Any]) -> RegionConfig:
+    try:
+        size = data.get("size")
+        region = RegionConfig(
+            name=str(data["name"]),
+            left=int(data.get("left", 0)),
+            top=int(data.get("top", 0)),
+            width=int(data["width"]),
+            height=int(data["height"]),
+            size=(int(size[0]), int(size[1])) if size else None,
+        )
+    except Exception as exc:
+        raise ValueError(f"Invalid capture region: {data}") from exc
+    if region.width <= 0 or region.height <= 0 or min(region.output_size) <= 0:
+        raise ValueError(f"Invalid capture region: {data}")
+    return region
+
+
+def _parse_regions(data: Any) -> List[RegionConfig]:
+    if not data:
+        return []
+    if data == "fixed":
+        return list(FIXED_REGIONS)
+    if not isinstance(data, list):
+        raise ValueError(f"Invalid capture regions: {data}")
+    return [_parse_region(item or {}) for item in data]
+
+
 def load_config(path: str) -> AppConfig:
     """Load a YAML configuration file and return an AppConfig.
 
-    The YAML file must contain at least the `window` section; other fields are
-    optional.  Unknown keys are ignored.
+    The YAML file must contain at least the `window` section, or a `windows`
+    list with one entry per game client; other fields are optional.  Unknown
+    keys are ignored.
 
     Args:
         path: Path to a YAML file.
@@ -77,7 +318,11 @@ def load_config(path: str) -> AppConfig:
     with open(path, "r", encoding="utf-8") as fh:
         data = yaml.safe_load(fh) or {}
 
-    window = _parse_window(data.get("window", {}))
+    if data.get("windows"):
+        windows = [_parse_window(item or {}) for item in data["windows"]]
+    else:
+        windows = [_parse_window(data.get("window", {}))]
+    window = windows[0]
 
     model_data = data.get("model", {})
     model = ModelConfig(
@@ -85,13 +330,135 @@ def load_config(path: str) -> AppConfig:
         url=model_data.get("url", "http://localhost:11434/api/generate"),
         model_name=model_data.get("model_name"),
         headers=model_data.get("headers", {}) or {},
+        connect_timeout=float(model_data.get("connect_timeout", 3.05)),
+        read_timeout=float(model_data.get("read_timeout", 30.0)),
+        deadline=float(model_data.get("deadline", 0.0)),
+        pool_size=int(model_data.get("pool_size", 4)),
+        image_format=str(model_data.get("image_format", "jpeg")),
+        image_quality=int(model_data.get("image_quality", 90)),
+        png_compression=int(model_data.get("png_compression", 1)),
+        stream=bool(model_data.get("stream", False)),
+    )
+
+    decoding_data = data.get("decoding", {}) or {}
+    reason = str(decoding_data.get("reason", "full")).lower()
+    if reason not in ("full", "capped", "none"):
+        raise ValueError(f"Invalid decoding reason: {reason}")
+    decoding = DecodingConfig(
+        structured=bool(decoding_data.get("structured", False)),
+        reason=reason,
+        reason_length=int(decoding_data.get("reason_length", 60)),
+        max_tokens=int(decoding_data.get("max_tokens", 0) or 0),
+    )
+
+    capture_data = data.get("capture", {}) or {}
+    capture = CaptureConfig(
+        mask_chat=bool(capture_data.get("mask_chat", True)),
+        zero_copy=bool(capture_data.get("zero_copy", False)),
+        pool_size=int(capture_data.get("pool_size", 4)),
+        threaded=bool(capture_data.get("threaded", False)),
+        ring_size=int(capture_data.get("ring_size", 4)),
+        regions=_parse_regions(capture_data.get("regions")),
+    )
+
+    gate_data = data.get("change_gate", {}) or {}
+    policy = str(gate_data.get("policy", "noop")).lower()
+    if policy not in ("noop", "reuse"):
+        raise ValueError(f"Invalid change_gate policy: {policy}")
+    change_gate = ChangeGateConfig(
+        threshold=float(gate_data.get("threshold", 0.0)),
+        policy=policy,
+        max_skip=int(gate_data.get("max_skip", 10)),
+    )
+
+    cache_data = data.get("cache", {}) or {}
+    cache = CacheConfig(
+        enabled=bool(cache_data.get("enabled", False)),
+        max_entries=int(cache_data.get("max_entries", 1024)),
+        ttl=float(cache_data.get("ttl", 300.0)),
+        max_distance=int(cache_data.get("max_distance", 4)),
+        path=cache_data.get("path"),
+    )
+
+    snap_data = data.get("snap", {}) or {}
+    snap = SnapConfig(
+        enabled=bool(snap_data.get("enabled", True)),
+        max_distance=float(snap_data.get("max_distance", 24.0)),
+        cell_size=int(snap_data.get("cell_size", 32)),
+    )
+
+    actuator_data = data.get("actuator", {}) or {}
+    actuator = ActuatorConfig(
+        backend=str(actuator_data.get("backend", "auto")).lower(),
+        steps=int(actuator_data.get("steps", 15)),
+        duration=float(actuator_data.get("duration", 0.15)),
+    )
+
+    scheduler_data = data.get("scheduler", {}) or {}
+    sync = str(scheduler_data.get("sync", "none")).lower()
+    if sync not in ("none", "plugin", "frames"):
+        raise ValueError(f"Invalid scheduler sync: {sync}")
+    scheduler = SchedulerConfig(
+        min_interval=float(scheduler_data.get("min_interval", 0.6)),
+        period=float(scheduler_data.get("period", 0.6)),
+        sync=sync,
+        offset=float(scheduler_data.get("offset", 0.03)),
+        hold=float(scheduler_data.get("hold", 0.1)),
+        gain=float(scheduler_data.get("gain", 0.3)),
+        latency_window=int(scheduler_data.get("latency_window", 20)),
+        latency_percentile=float(scheduler_data.get("latency_percentile", 90.0)),
+        frame_threshold=float(scheduler_data.get("frame_threshold", 8.0)),
+    )
+
+    speculation_data = data.get("speculation", {}) or {}
+    speculation = SpeculationConfig(
+        enabled=bool(speculation_data.get("enabled", False)),
+        max_distance=int(speculation_data.get("max_distance", 6)),
+    )
+
+    recorder_data = data.get("recorder", {}) or {}
+    compression = str(recorder_data.get("compression", "none")).lower()
+    if compression not in ("none", "delta"):
+        raise ValueError(f"Invalid recorder compression: {compression}")
+    recorder = RecorderConfig(
+        enabled=bool(recorder_data.get("enabled", False)),
+        chunk_size=int(recorder_data.get("chunk_size", 256)),
+        queue_size=int(recorder_data.get("queue_size", 64)),
+        compression=compression,
+        keyframe_interval=int(recorder_data.get("keyframe_interval", 30)),
+    )
+
+    metrics_data = data.get("metrics", {}) or {}
+    port = metrics_data.get("port")
+    metrics = MetricsConfig(
+        host=str(metrics_data.get("host", "127.0.0.1")),
+        port=int(port) if port is not None else None,
+        interval=float(metrics_data.get("interval", 30.0)),
     )
 
     return AppConfig(
         window=window,
+        windows=windows,
         fps=float(data.get("fps", 2.0)),
         model=model,
+        decoding=decoding,
+        capture=capture,
+        change_gate=change_gate,
+        cache=cache,
+        metrics=metrics,
+        snap=snap,
+        actuator=actuator,
+        scheduler=scheduler,
+        speculation=speculation,
+        recorder=recorder,
         plugin_enabled=bool(data.get("plugin_enabled", False)),
+        plugin_address=str(data.get("plugin_address", "tcp://127.0.0.1:5555")),
+        plugin_addresses=[str(address) for address in data.get("plugin_addresses", []) or []],
+        plugin_max_age=float(data.get("plugin_max_age", 1.2)),
+        plugin_conflate=bool(data.get("plugin_conflate", True)),
         rag_enabled=bool(data.get("rag_enabled", False)),
         log_dir=data.get("log_dir"),
+        queue_size=int(data.get("queue_size", 1)),
+        channel_order=str(data.get("channel_order", "rgb")).lower(),
+        batch_window=float(data.get("batch_window", 0.05)),
     )
\ No newline at end of file
@@ -3,6 +3,8 @@
 This module wraps PyAutoGUI to move the mouse and click in a human‑like
 fashion.  It clamps coordinates within a configured window rectangle and
 computes simple Bezier curves with jitter to avoid straight‑line movements.
+`move_and_click` blocks the caller for the whole movement; the live loop uses
+`actuator.Actuator`, which plays paths on its own thread.
 """
 
 from __future__ import annotations
@@ -35,13 +37,14 @@ def move_and_click(target: Tuple[int, int], window_rect: dict, duration: float =
     # Generate a path with jitter
     current_pos = pyautogui.position()
     path: Iterable[Tuple[int, int]] = bezier_path(current_pos, (abs_x, abs_y), steps=15)
-    start_time = time.time()
+    start_time = time.monotonic()
     for i, (px, py) in enumerate(path):
         # Interpolate time to maintain constant overall duration
-        now = time.time()
+        now = time.monotonic()
         t_elapsed = now - start_time
         t_target = duration * (i / max(len(path) - 1, 1))
         if t_target > t_elapsed:
             time.sleep(t_target - t_elapsed)
-        pyautogui.moveTo(px, py)
-    pyautogui.click()
\ No newline at end of file
+        # Pacing is done here; skip pyautogui's default PAUSE after each call
+        pyautogui.moveTo(px, py, _pause=False)
+    pyautogui.click(_pause=False)
\ No newline at end of file
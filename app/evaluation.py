@@ -0,0 +1,269 @@
+"""Regression evaluation of click accuracy and latency on labelled frames.
+
+`run_eval` sends every frame of a replay dataset (`demo_frames/` or a
+recorded run, see `app.replay`) to a model client, spread over a process
+pool, and scores the actions against ground‑truth target boxes:
+
+* hit rate – fraction of labelled frames whose click lands in a target box,
+* pixel error – distance from the click to the nearest target box centre,
+* invalid rate – fraction of replies the live pipeline would reject (client
+  fallback centre clicks and output failing the action schema, see
+  `app.actions`),
+* latency percentiles of the model round‑trip.
+
+Labels are a JSON file, by default `labels.json` next to the frames:
+
+    {
+      "size": [765, 503],
+      "frames": {
+        "frame_0001.png": [[x0, y0, x1, y1], ...],
+        "42": [[x0, y0, x1, y1]]
+      }
+    }
+
+Frames are keyed by file name, or by sequence number for recordings.  Boxes
+are in pixels of an image of `size` (width, height; the model input size if
+omitted) and are scaled to the dataset frames.  Unlabelled frames still count
+towards the invalid rate and latency.
+
+Results are cached per (frame content, prompt hash, model) in an append‑only
+JSONL file, so a rerun after changing the prompt or backend only evaluates
+what changed and an unchanged rerun costs nothing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .actions import ActionParser
+from .bench import _percentiles_ms
+from .metrics import MetricsRegistry
+from .replay import CACHE_DIR, ReplayDataset
+
+Box = Tuple[float, float, float, float]
+
+# Per‑process state of pool workers, set by `_init_worker`.
+_worker: Dict[str, Any] = {}
+
+
+def load_labels(path: str, size: Tuple[int, int] = (224, 224)) -> Dict[str, List[Box]]:
+    """Read target boxes and scale them to frames of `size`.
+
+    Args:
+        path: Labels JSON file (see the module docstring).
+        size: (width, height) of the evaluated frames.
+
+    Returns:
+        Boxes per frame key.
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    src_w, src_h = data.get("size") or size
+    sx, sy = size[0] / float(src_w), size[1] / float(src_h)
+    labels: Dict[str, List[Box]] = {}
+    for key, boxes in (data.get("frames") or {}).items():
+        scaled = []
+        for box in boxes:
+            if len(box) != 4:
+                raise ValueError(f"Target box for {key} must be [x0, y0, x1, y1]: {box}")
+            x0, y0, x1, y1 = (float(v) for v in box)
+            scaled.append((min(x0, x1) * sx, min(y0, y1) * sy, max(x0, x1) * sx, max(y0, y1) * sy))
+        labels[str(key)] = scaled
+    return labels
+
+
+def score(click: Tuple[float, float], boxes: Sequence[Box]) -> Tuple[bool, float]:
+    """Score one click against the target boxes of its frame.
+
+    Returns:
+        Whether the click is inside any box (edges included), and its
+        distance in pixels to the nearest box centre.
+    """
+    arr = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    x, y = click
+    inside = (arr[:, 0] <= x) & (x <= arr[:, 2]) & (arr[:, 1] <= y) & (y <= arr[:, 3])
+    cx = (arr[:, 0] + arr[:, 2]) / 2.0
+    cy = (arr[:, 1] + arr[:, 3]) / 2.0
+    return bool(inside.any()), float(np.hypot(cx - x, cy - y).min())
+
+
+class EvalCache:
+    """Append‑only JSONL store of evaluation results by key."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._results: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._results[record["key"]] = record
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._results.get(key)
+
+    def put(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as fh:
+            for record in records:
+                self._results[record["key"]] = record
+                fh.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+
+def result_key(frame: np.ndarray, prompt_hash: str, model: str) -> str:
+    """Cache key of one frame evaluated with a prompt and model."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(frame).tobytes())
+    digest.update(prompt_hash.encode("utf-8"))
+    digest.update(model.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _init_worker(client_factory: Callable[[], Any], source: str, size: Tuple[int, int], channel_order: str) -> None:
+    # The dataset cache was built by the parent, so this only maps it.
+    _worker["client"] = client_factory()
+    _worker["dataset"] = ReplayDataset.open(source, size, channel_order)
+
+
+def _evaluate(client: Any, dataset: ReplayDataset, prompt: str, index: int) -> Tuple[int, Any, float]:
+    objects = dataset.entries[index].get("objects") if dataset.entries else None
+    start = time.perf_counter()
+    action = client.generate_action(prompt, dataset[index], objects=objects)
+    return index, action, time.perf_counter() - start
+
+
+def _evaluate_in_worker(prompt: str, index: int) -> Tuple[int, Any, float]:
+    return _evaluate(_worker["client"], _worker["dataset"], prompt, index)
+
+
+def run_eval(
+    client_factory: Callable[[], Any],
+    source: str,
+    labels: Dict[str, List[Box]],
+    prompt: str,
+    model: str,
+    workers: int = 4,
+    size: Tuple[int, int] = (224, 224),
+    channel_order: str = "rgb",
+    cache_path: Optional[str] = None,
+    fallback_reasons: Sequence[str] = (),
+    schema: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Evaluate a client on labelled frames.
+
+    Args:
+        client_factory: Picklable callable creating a model client exposing
+            `generate_action`; each worker process creates its own.
+        source: Frame directory or recording, opened with `ReplayDataset`.
+        labels: Target boxes per frame key, e.g. from `load_labels`.
+        prompt: System prompt sent with every frame.
+        model: Identifies the backend, model and encoding in cache keys.
+        workers: Worker processes; 0 or 1 evaluates in this process.
+        size: Model input size.
+        channel_order: Channel order the client expects.
+        cache_path: Result cache (defaults to `eval_results.jsonl` in the
+            dataset's `.replay_cache/`); an empty string disables it.
+        fallback_reasons: `reason` values marking a client fallback action.
+        schema: Action schema replies must satisfy (`ACTION_SCHEMA` by
+            default).
+
+    Returns:
+        A JSON‑serialisable report with aggregate and per‑frame results.
+    """
+    dataset = ReplayDataset.open(source, size, channel_order)
+    if not len(dataset):
+        raise ValueError(f"No frames to evaluate in {source}")
+    if cache_path is None:
+        cache_path = os.path.join(source, CACHE_DIR, "eval_results.jsonl")
+    cache = EvalCache(cache_path) if cache_path else None
+    prompt_hash = hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).hexdigest()
+    keys = [result_key(dataset[i], prompt_hash, model) for i in range(len(dataset))]
+    records: List[Optional[Dict[str, Any]]] = [cache.get(key) if cache else None for key in keys]
+    todo = [i for i, record in enumerate(records) if record is None]
+
+    start = time.perf_counter()
+    if todo and workers > 1:
+        init = (client_factory, source, size, channel_order)
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo)), initializer=_init_worker, initargs=init) as pool:
+            outputs = list(pool.map(partial(_evaluate_in_worker, prompt), todo))
+    elif todo:
+        client = client_factory()
+        try:
+            outputs = [_evaluate(client, dataset, prompt, i) for i in todo]
+        finally:
+            close = getattr(client, "close", None)
+            if close is not None:
+                close()
+    else:
+        outputs = []
+    wall = time.perf_counter() - start
+
+    fresh = []
+    for index, action, latency in outputs:
+        record = {"key": keys[index], "model": model, "prompt": prompt_hash, "action": action, "latency": latency}
+        records[index] = record
+        fresh.append(record)
+    if cache is not None:
+        cache.put(fresh)
+
+    parser = ActionParser(schema, fallback_reasons=fallback_reasons, metrics=MetricsRegistry())
+    fresh_indices = set(todo)
+    results = []
+    hits, errors, latencies, invalid = 0, [], [], 0
+    for i, record in enumerate(records):
+        parsed = parser.parse(record["action"])
+        click = parsed.click if parsed is not None else None
+        is_invalid = parsed is None
+        boxes = labels.get(str(dataset.sources[i]))
+        hit, error = (None, None)
+        if boxes and not is_invalid:
+            hit, error = score(click, boxes)
+            hits += hit
+            errors.append(error)
+        elif boxes:
+            hit = False
+        invalid += is_invalid
+        latencies.append(record["latency"])
+        results.append({
+            "source": dataset.sources[i],
+            "click": list(click) if click is not None else None,
+            "hit": hit,
+            "pixel_error": round(error, 2) if error is not None else None,
+            "invalid": is_invalid,
+            "latency_ms": round(record["latency"] * 1000.0, 2),
+            "cached": i not in fresh_indices,
+        })
+
+    labelled = sum(1 for r in results if r["hit"] is not None)
+    error_arr = np.asarray(errors, dtype=np.float64)
+    return {
+        "frames": len(dataset),
+        "labelled": labelled,
+        "evaluated": len(todo),
+        "cached": len(dataset) - len(todo),
+        "workers": int(workers),
+        "model": model,
+        "prompt_hash": prompt_hash,
+        "wall_s": round(wall, 3),
+        "hit_rate": round(hits / labelled, 4) if labelled else 0.0,
+        "pixel_error": {
+            "mean": round(float(error_arr.mean()), 2) if errors else 0.0,
+            "p50": round(float(np.quantile(error_arr, 0.5)), 2) if errors else 0.0,
+            "p95": round(float(np.quantile(error_arr, 0.95)), 2) if errors else 0.0,
+        },
+        "invalid_rate": round(invalid / len(dataset), 4),
+        "failures": parser.summary()["failures"],
+        "latency_ms": _percentiles_ms(latencies),
+        "results": results,
+    }
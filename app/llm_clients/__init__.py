@@ -7,7 +7,8 @@ for **Ollama** and a generic HTTP client for any API.  If no backend is
 available, a dummy client can produce centre clicks for demo purposes.
 """
 
+from .base import BaseClient, make_session
 from .ollama_client import OllamaClient
 from .open_api_client import OpenAPIClient
 
-__all__ = ["OllamaClient", "OpenAPIClient"]
\ No newline at end of file
+__all__ = ["BaseClient", "OllamaClient", "OpenAPIClient", "make_session"]
\ No newline at end of file
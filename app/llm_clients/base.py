@@ -0,0 +1,375 @@
+"""Shared plumbing for the HTTP model clients.
+
+`BaseClient` owns a pooled, keep‑alive `requests.Session` so consecutive ticks
+reuse the same TCP connection instead of reconnecting on every request.
+Connect and read timeouts are configured separately: a dead server is noticed
+within the connect timeout, while a slow generation may use the full read
+timeout.  Subclasses only describe the request payload and where the model
+text lives in the response.
+
+With `stream=True` the response is consumed incrementally and the request is
+closed as soon as the first complete JSON object has arrived, which frees the
+backend from generating text nobody reads.
+
+An observation is either one frame or a list of region crops (see
+`app.regions`); the crops are sent as several images in one request.
+
+`generate_actions` serves several observations (e.g. one per game window) with
+a single request when the backend supports it and fans the actions back out.
+
+With a `schema`, the backend is asked to constrain generation to it (see
+`app.actions.action_schema`); `max_tokens` caps the tokens generated per
+action.  How both are expressed in the request is up to each client.
+
+A `deadline` bounds each request as a whole, not just each socket read: the
+connect and read timeouts are capped at the time left, the body is read in
+chunks and the response is closed once the deadline has passed, so a server
+that keeps dribbling bytes cannot hold the caller.  An expired request returns
+the centre click with the `request abandoned after deadline` reason, which
+the action parser rejects like any fallback.  A read that stalls right before
+the deadline can overrun it by at most the time that was left when the
+request started.
+
+`agenerate_action` runs the same request on a small worker pool and awaits it
+from asyncio.  Its `timeout` is the request's deadline, and cancelling the
+awaiting task stops the request at its next chunk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..metrics import REGISTRY
+from ..regions import Observation, as_images
+from .encoding import ImageEncoder
+from .streaming import JsonObjectScanner, iter_lines, iter_stream_events
+
+# Bytes read per step of a response body read under a deadline.
+_CHUNK_SIZE = 4096
+
+
+def make_session(pool_size: int = 4, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """Create a keep‑alive session with a bounded connection pool.
+
+    Args:
+        pool_size: Maximum number of pooled connections per host.
+        headers: Default headers sent with every request.
+
+    Returns:
+        A configured `requests.Session`.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(int(pool_size), 1), max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+class BaseClient:
+    """Common request, parsing and fallback logic for model clients."""
+
+    FALLBACK_REASONS = ("fallback centre click", "request abandoned after deadline")
+
+    def __init__(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 30.0,
+        pool_size: int = 4,
+        encoder: Optional[ImageEncoder] = None,
+        stream: bool = False,
+        schema: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 0,
+        deadline: float = 0.0,
+    ):
+        self.url = url
+        self.encoder = encoder or ImageEncoder()
+        self.stream = bool(stream)
+        self.schema = schema
+        self.max_tokens = max(int(max_tokens), 0)
+        self.early_stops = 0
+        self.connect_timeout = float(connect_timeout)
+        self.read_timeout = float(read_timeout)
+        self.deadline = max(float(deadline), 0.0)
+        self.pool_size = max(int(pool_size), 1)
+        self.session = make_session(self.pool_size, headers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # ------------------------------------------------------------------
+    # Hooks for subclasses
+    # ------------------------------------------------------------------
+    def _build_payload(self, prompt: str, image: Observation, objects: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _stream_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Return `payload` modified to request a streamed response."""
+        return dict(payload, stream=True)
+
+    def _stream_text(self, event: Dict[str, Any]) -> str:
+        """Return the text delta carried by one streamed event."""
+        return event.get("response", "")
+
+    def _stream_done(self, event: Dict[str, Any]) -> bool:
+        """Return True if the event marks the end of the stream."""
+        return bool(event.get("done"))
+
+    def _build_batch_payload(self, prompt: str, images: List[np.ndarray],
+                             objects: List[Optional[List[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """Return a payload carrying all observations, or None if unsupported."""
+        return None
+
+    def _response_text(self, data: Dict[str, Any]) -> str:
+        """Return the model output text from a decoded response body."""
+        return data.get("response", "")
+
+    def _batch_response(self, data: Dict[str, Any], count: int) -> Optional[List[Dict[str, Any]]]:
+        """Extract `count` actions from a decoded batch response body."""
+        return self._parse_array(self._response_text(data), count)
+
+    # ------------------------------------------------------------------
+    # Request helpers
+    # ------------------------------------------------------------------
+    @property
+    def timeout(self) -> tuple:
+        """The `(connect, read)` timeout pair passed to requests."""
+        return (self.connect_timeout, self.read_timeout)
+
+    def _deadline(self) -> Optional[float]:
+        """Return the `time.monotonic()` deadline of a request starting now."""
+        return time.monotonic() + self.deadline if self.deadline > 0 else None
+
+    def _timeout(self, deadline: Optional[float]) -> tuple:
+        if deadline is None:
+            return self.timeout
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError("request deadline passed")
+        return (min(self.connect_timeout, left), min(self.read_timeout, left))
+
+    @staticmethod
+    def _check(deadline: Optional[float], cancel: Optional[threading.Event]) -> None:
+        if cancel is not None and cancel.is_set():
+            raise TimeoutError("request cancelled")
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError("request deadline passed")
+
+    def _post(self, payload: Dict[str, Any], deadline: Optional[float] = None, **kwargs: Any) -> requests.Response:
+        resp = self.session.post(self.url, json=payload, timeout=self._timeout(deadline), **kwargs)
+        resp.raise_for_status()
+        return resp
+
+    def _post_json(self, payload: Dict[str, Any], deadline: Optional[float] = None,
+                   cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Post and decode the JSON body, giving up at `deadline` or `cancel`."""
+        if deadline is None and cancel is None:
+            return self._post(payload).json()
+        resp = self._post(payload, deadline, stream=True)
+        try:
+            body = b"".join(self._read(resp, deadline, cancel))
+        finally:
+            resp.close()
+        return json.loads(body)
+
+    def _read(self, resp: requests.Response, deadline: Optional[float],
+              cancel: Optional[threading.Event]) -> Iterator[bytes]:
+        """Yield the body as it arrives, stopping at `deadline` or `cancel`."""
+        read1 = getattr(resp.raw, "read1", None)  # urllib3 2: whatever has arrived
+        if read1 is not None:
+            chunks = iter(lambda: read1(_CHUNK_SIZE, decode_content=True), b"")
+        else:
+            chunks = resp.iter_content(_CHUNK_SIZE)
+        for chunk in chunks:
+            self._check(deadline, cancel)
+            yield chunk
+
+    def _post_streaming(self, payload: Dict[str, Any], deadline: Optional[float] = None,
+                        cancel: Optional[threading.Event] = None) -> Optional[Dict[str, Any]]:
+        """Stream a response and return the first complete JSON object.
+
+        The response is closed as soon as the object is complete; dropping the
+        connection makes the server stop generating.
+        """
+        scanner = JsonObjectScanner()
+        resp = self._post(self._stream_payload(payload), deadline, stream=True)
+        try:
+            for event in iter_stream_events(iter_lines(self._read(resp, deadline, cancel))):
+                if scanner.feed(self._stream_text(event)) is not None:
+                    if not self._stream_done(event):
+                        self.early_stops += 1
+                    return scanner.parse()
+                if self._stream_done(event):
+                    break
+        finally:
+            resp.close()
+        return None
+
+    @staticmethod
+    def _parse_text(text: str) -> Optional[Dict[str, Any]]:
+        """Extract the JSON object from model text, which may contain markdown."""
+        text = text.strip()
+        start = text.find("{")
+        end = text.rfind("}")
+        if start != -1 and end != -1:
+            return json.loads(text[start:end + 1])
+        return None
+
+    @staticmethod
+    def _parse_array(text: str, count: int) -> Optional[List[Dict[str, Any]]]:
+        """Extract a JSON array of exactly `count` action objects from text."""
+        text = text.strip()
+        start = text.find("[")
+        end = text.rfind("]")
+        if start == -1 or end == -1:
+            return None
+        actions = json.loads(text[start:end + 1])
+        if not isinstance(actions, list) or len(actions) != count or not all(isinstance(a, dict) for a in actions):
+            return None
+        return actions
+
+    @staticmethod
+    def batch_prompt(prompt: str, count: int) -> str:
+        """Extend the system prompt for a request carrying `count` images."""
+        return (
+            f"{prompt}\n\nThis request contains {count} independent observations, one per image, "
+            f"each from a different game window.  Return a JSON array of exactly {count} actions, "
+            "in image order, each following the schema above."
+        )
+
+    @staticmethod
+    def _fallback(image: Observation, reason: str = FALLBACK_REASONS[0]) -> Dict[str, Any]:
+        # For region crops this is the centre of the first (viewport) image.
+        h, w = as_images(image)[0].shape[:2]
+        return {
+            "click": [w // 2, h // 2],
+            "modifiers": {"shift": False},
+            "reason": reason,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def generate_action(self, prompt: str, image: Observation, objects: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Send the observation to the model and return the parsed action.
+
+        Args:
+            prompt: The full prompt including system and user instructions.
+            image: RGB image (224×224) to send, or a list of region crops.
+            objects: Optional list of object dictionaries; included in the prompt.
+
+        Returns:
+            Parsed JSON action.  If the model fails or the client's
+            `deadline` passes, returns a centre click.
+        """
+        return self._generate(prompt, image, objects, self._deadline())
+
+    def _generate(self, prompt: str, image: Observation, objects: Optional[List[Dict[str, Any]]],
+                  deadline: Optional[float] = None, cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        try:
+            # Encoding errors fall back like request errors do.
+            payload = self._build_payload(prompt, image, objects)
+            if self.stream:
+                with REGISTRY.span("http"):
+                    action = self._post_streaming(payload, deadline, cancel)
+            else:
+                with REGISTRY.span("http"):
+                    data = self._post_json(payload, deadline, cancel)
+                with REGISTRY.span("parse"):
+                    action = self._parse_text(self._response_text(data))
+            if action is not None:
+                return action
+            REGISTRY.inc("invalid_responses")
+        except Exception as exc:
+            if isinstance(exc, TimeoutError) or (isinstance(exc, requests.Timeout) and deadline is not None
+                                                 and time.monotonic() >= deadline):
+                REGISTRY.inc("abandoned_requests")
+                return self._fallback(image, self.FALLBACK_REASONS[1])
+            REGISTRY.inc("failed_requests")
+        return self._fallback(image)
+
+    def generate_actions(
+        self,
+        prompt: str,
+        images: List[np.ndarray],
+        objects: Optional[List[Optional[List[Dict[str, Any]]]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Generate one action per image, batching them into one request.
+
+        Args:
+            prompt: The system prompt.
+            images: Observations, one per agent.
+            objects: Optional object lists, aligned with `images`.
+
+        Returns:
+            Actions aligned with `images`.  If the backend cannot batch or
+            the batched reply is malformed, each image is sent on its own.
+            Multi‑region observations are always sent one request each.
+        """
+        objects = objects or [None] * len(images)
+        if len(images) == 1:
+            return [self.generate_action(prompt, images[0], objects=objects[0])]
+        if not all(isinstance(image, np.ndarray) for image in images):
+            return [self.generate_action(prompt, image, objects=objs) for image, objs in zip(images, objects)]
+        payload = self._build_batch_payload(prompt, images, objects)
+        if payload is not None:
+            try:
+                actions = self._batch_response(self._post_json(payload, self._deadline()), len(images))
+                if actions is not None:
+                    return actions
+            except Exception:
+                pass
+        return [self.generate_action(prompt, image, objects=objs) for image, objs in zip(images, objects)]
+
+    async def agenerate_action(
+        self,
+        prompt: str,
+        image: Observation,
+        objects: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Asynchronous variant of `generate_action`.
+
+        Args:
+            prompt: The full prompt including system and user instructions.
+            image: RGB image (224×224) to send, or a list of region crops.
+            objects: Optional list of object dictionaries.
+            timeout: Overall deadline in seconds (the client's `deadline`
+                if omitted).  When it expires the request is stopped and a
+                centre click is returned.
+
+        Returns:
+            Parsed JSON action or the fallback centre click.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix=type(self).__name__)
+        deadline = time.monotonic() + float(timeout) if timeout is not None else self._deadline()
+        cancel = threading.Event()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._generate, prompt, image, objects, deadline, cancel)
+        try:
+            return await asyncio.wait_for(future, None if deadline is None else max(deadline - time.monotonic(), 0.0))
+        except asyncio.TimeoutError:
+            cancel.set()
+            return self._fallback(image, self.FALLBACK_REASONS[1])
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    def close(self) -> None:
+        """Release pooled connections and worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.session.close()
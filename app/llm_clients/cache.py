@@ -0,0 +1,257 @@
+"""Memoisation of model actions keyed by perceptual frame hash.
+
+Many ticks show a scene the model has already seen: demo replays, walking
+back and forth, repeated skilling spots.  `ActionCache` maps the dHash of the
+frame, together with a digest of the prompt and object payload, to the parsed
+action.  Entries are evicted least‑recently‑used beyond `max_entries` and
+expire after `ttl` seconds.  Lookups accept hashes within `max_distance` bits
+so near‑duplicate frames (a moving cursor, an animated NPC) also hit.  The
+cache can be saved to and loaded from a JSON file.
+
+`CachedClient` wraps any client exposing `generate_action` and consults the
+cache first.  Only replies that pass `ActionParser.parse` are stored, so a
+malformed reply is retried on the next tick rather than replayed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..actions import ActionParser
+from ..metrics import MetricsRegistry
+from ..regions import Observation, as_images
+from ..utils.imagehash import dhash, hamming
+from .base import BaseClient
+
+
+@dataclass
+class CacheEntry:
+    action: Dict[str, Any]
+    created: float
+    latency: float
+
+
+def context_key(prompt: str, objects: Optional[List[Dict[str, Any]]], extra: Sequence[int] = ()) -> str:
+    """Digest the non‑image part of an observation.
+
+    `extra` holds the hashes of any region crops after the first, so they
+    must match exactly while the viewport hash may be near.
+    """
+    parts: List[Any] = [prompt, objects or []]
+    if extra:
+        parts.append(list(extra))
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class ActionCache:
+    """LRU/TTL cache of actions with Hamming‑distance tolerant lookups.
+
+    Args:
+        max_entries: Maximum number of cached actions.
+        ttl: Seconds after which an entry expires (0 disables expiry).
+        max_distance: Largest Hamming distance treated as the same frame.
+        path: Optional JSON file used by `load` and `save`.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0, max_distance: int = 4, path: Optional[str] = None):
+        self.max_entries = max(int(max_entries), 1)
+        self.ttl = float(ttl)
+        self.max_distance = int(max_distance)
+        self.path = path
+        self._entries: "OrderedDict[Tuple[str, int], CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expired(self, entry: CacheEntry, now: float) -> bool:
+        return self.ttl > 0 and now - entry.created > self.ttl
+
+    def get(self, frame_hash: int, context: str) -> Optional[CacheEntry]:
+        """Return the closest live entry for the hash and context, if any."""
+        now = time.time()
+        with self._lock:
+            key = (context, frame_hash)
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                del self._entries[key]
+                entry = None
+            if entry is None and self.max_distance > 0:
+                # Expired entries are evicted so they cannot shadow a live
+                # one that is slightly further away.
+                best = self.max_distance + 1
+                expired = []
+                for (ctx, h), candidate in self._entries.items():
+                    if ctx != context:
+                        continue
+                    if self._expired(candidate, now):
+                        expired.append((ctx, h))
+                        continue
+                    distance = hamming(h, frame_hash)
+                    if distance < best:
+                        best, key, entry = distance, (ctx, h), candidate
+                for stale in expired:
+                    del self._entries[stale]
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, frame_hash: int, context: str, action: Dict[str, Any], latency: float = 0.0) -> None:
+        """Store an action, evicting the least recently used entries."""
+        with self._lock:
+            key = (context, frame_hash)
+            self._entries[key] = CacheEntry(action=action, created=time.time(), latency=latency)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def load(self) -> int:
+        """Load entries from `path`; returns the number of live entries read."""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with open(self.path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        now = time.time()
+        loaded = 0
+        with self._lock:
+            for item in data.get("entries", []):
+                entry = CacheEntry(action=item["action"], created=float(item["created"]), latency=float(item.get("latency", 0.0)))
+                if self._expired(entry, now):
+                    continue
+                self._entries[(item["context"], int(item["hash"], 16))] = entry
+                loaded += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return loaded
+
+    def save(self) -> None:
+        """Write live entries to `path` (no‑op without a path)."""
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = [
+                {"context": ctx, "hash": f"{h:016x}", "action": e.action, "created": e.created, "latency": e.latency}
+                for (ctx, h), e in self._entries.items()
+                if not self._expired(e, now)
+            ]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"version": 1, "entries": entries}, fh)
+        os.replace(tmp, self.path)
+
+
+class CachedClient:
+    """Wrap a model client with an `ActionCache`.
+
+    Fallback actions produced when the backend fails, and replies that do not
+    validate against the action schema, are never cached.  Attributes not
+    defined here (e.g. `encoder`) are forwarded to the wrapped client.
+
+    Args:
+        client: Model client to wrap.
+        cache: Cache to consult and fill.
+        schema: Action schema replies must satisfy to be cached (the
+            default action schema if None).
+    """
+
+    def __init__(self, client: Any, cache: ActionCache, schema: Optional[Dict[str, Any]] = None):
+        self.client = client
+        self.cache = cache
+        # Own registry: rejected replies are counted by the pipeline's parser.
+        self._parser = ActionParser(schema, fallback_reasons=BaseClient.FALLBACK_REASONS, metrics=MetricsRegistry())
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    @staticmethod
+    def _key(prompt: str, image: Observation, objects: Optional[List[Dict[str, Any]]]) -> Tuple[int, str]:
+        images = as_images(image)
+        return dhash(images[0]), context_key(prompt, objects, [dhash(crop) for crop in images[1:]])
+
+    def _lookup(self, frame_hash: int, context: str) -> Optional[CacheEntry]:
+        entry = self.cache.get(frame_hash, context)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.latency_saved += entry.latency
+        return entry
+
+    def _store(self, frame_hash: int, context: str, action: Dict[str, Any], latency: float) -> None:
+        if self._parser.parse(action) is not None:
+            self.cache.put(frame_hash, context, dict(action), latency)
+
+    def generate_action(self, prompt: str, image: Observation, objects: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        frame_hash, context = self._key(prompt, image, objects)
+        entry = self._lookup(frame_hash, context)
+        if entry is not None:
+            return dict(entry.action)
+        start = time.perf_counter()
+        action = self.client.generate_action(prompt, image, objects=objects)
+        self._store(frame_hash, context, action, time.perf_counter() - start)
+        return action
+
+    def generate_actions(
+        self,
+        prompt: str,
+        images: List[np.ndarray],
+        objects: Optional[List[Optional[List[Dict[str, Any]]]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Batched variant: only cache misses are forwarded, in one batch."""
+        objects = objects or [None] * len(images)
+        keys = [self._key(prompt, image, objs) for image, objs in zip(images, objects)]
+        results: List[Optional[Dict[str, Any]]] = []
+        for frame_hash, context in keys:
+            entry = self._lookup(frame_hash, context)
+            results.append(dict(entry.action) if entry is not None else None)
+        missing = [i for i, action in enumerate(results) if action is None]
+        if missing:
+            start = time.perf_counter()
+            batch = getattr(self.client, "generate_actions", None)
+            if batch is not None:
+                actions = batch(prompt, [images[i] for i in missing], [objects[i] for i in missing])
+            else:
+                actions = [self.client.generate_action(prompt, images[i], objects=objects[i]) for i in missing]
+            latency = (time.perf_counter() - start) / len(missing)
+            for i, action in zip(missing, actions):
+                results[i] = action
+                self._store(keys[i][0], keys[i][1], action, latency)
+        return results
+
+    def summary(self) -> Dict[str, Any]:
+        """Return hit/miss and latency‑saved statistics."""
+        with self._lock:
+            hits, misses, saved = self.hits, self.misses, self.latency_saved
+        lookups = hits + misses
+        return {
+            "entries": len(self.cache),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "latency_saved_s": round(saved, 3),
+        }
+
+    def close(self) -> None:
+        """Persist the cache and close the wrapped client."""
+        self.cache.save()
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            close()
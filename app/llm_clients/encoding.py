@@ -0,0 +1,120 @@
+"""Image encoding shared by the model clients.
+
+Every tick the observation has to be compressed and base64‑encoded before it
+is uploaded, and both steps are a measurable share of the tick budget.  The
+`ImageEncoder` here lets the format and quality be chosen in the config
+(JPEG and WebP are much cheaper to produce and upload than PNG), skips the
+colour conversion when frames are already in OpenCV's BGR order, and keeps
+per‑frame timing and payload size statistics.
+
+The encoder returns bare base64 (what Ollama's `images` field expects); call
+`EncodedImage.data_uri()` for endpoints that want a `data:` URI.
+"""
+
+from __future__ import annotations
+
+import base64
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from ..metrics import REGISTRY
+
+# format name -> (file extension, MIME type)
+FORMATS: Dict[str, tuple] = {
+    "jpeg": (".jpg", "image/jpeg"),
+    "jpg": (".jpg", "image/jpeg"),
+    "webp": (".webp", "image/webp"),
+    "png": (".png", "image/png"),
+}
+
+
+@dataclass
+class EncodedImage:
+    """A compressed, base64‑encoded frame."""
+
+    data: str
+    mime: str
+    nbytes: int
+    encode_ms: float
+
+    def data_uri(self) -> str:
+        return f"data:{self.mime};base64,{self.data}"
+
+
+class ImageEncoder:
+    """Encode numpy frames for upload.
+
+    Args:
+        fmt: One of `jpeg`, `webp` or `png`.
+        quality: JPEG/WebP quality (1–100).
+        png_compression: PNG zlib level (0–9); low levels are much faster.
+        channel_order: Channel order of incoming frames, `rgb` or `bgr`.
+            OpenCV encodes BGR, so `bgr` frames are encoded without a copy.
+    """
+
+    def __init__(self, fmt: str = "jpeg", quality: int = 90, png_compression: int = 1, channel_order: str = "rgb"):
+        fmt = fmt.lower()
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported image format: {fmt}")
+        channel_order = channel_order.lower()
+        if channel_order not in ("rgb", "bgr"):
+            raise ValueError(f"Unsupported channel order: {channel_order}")
+        self.fmt = fmt
+        self.ext, self.mime = FORMATS[fmt]
+        self.channel_order = channel_order
+        if self.ext == ".jpg":
+            self.params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        elif self.ext == ".webp":
+            self.params = [cv2.IMWRITE_WEBP_QUALITY, int(quality)]
+        else:
+            self.params = [cv2.IMWRITE_PNG_COMPRESSION, int(png_compression)]
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.total_ms = 0.0
+        self.total_bytes = 0
+        self.last: Optional[EncodedImage] = None
+
+    def encode(self, image: np.ndarray) -> EncodedImage:
+        """Compress and base64‑encode a frame.
+
+        Args:
+            image: Frame in the encoder's channel order, shape (h, w, 3).
+
+        Returns:
+            The encoded image with its size and encode time.
+        """
+        start = time.perf_counter()
+        bgr = image if self.channel_order == "bgr" else cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        success, buffer = cv2.imencode(self.ext, bgr, self.params)
+        if not success:
+            raise RuntimeError("Failed to encode image")
+        data = base64.b64encode(buffer).decode("ascii")
+        elapsed = time.perf_counter() - start
+        REGISTRY.observe("encode", elapsed)
+        elapsed_ms = elapsed * 1000.0
+        encoded = EncodedImage(data=data, mime=self.mime, nbytes=int(buffer.size), encode_ms=elapsed_ms)
+        with self._lock:
+            self.frames += 1
+            self.total_ms += elapsed_ms
+            self.total_bytes += encoded.nbytes
+            self.last = encoded
+        return encoded
+
+    def summary(self) -> Dict[str, float]:
+        """Return encode statistics for logging."""
+        with self._lock:
+            frames = self.frames
+            last = self.last
+            return {
+                "format": self.fmt,
+                "frames": frames,
+                "mean_ms": round(self.total_ms / frames, 3) if frames else 0.0,
+                "mean_bytes": round(self.total_bytes / frames, 1) if frames else 0.0,
+                "last_ms": round(last.encode_ms, 3) if last else 0.0,
+                "last_bytes": last.nbytes if last else 0,
+            }
@@ -1,71 +1,82 @@
 """Client for local Ollama Qwen‑2.5‑VL model.
 
-This client sends a base64‑encoded image and optional JSON context to a
+This client sends a bare base64‑encoded image and optional JSON context to a
 locally running Ollama server.  The server is expected to accept a POST
 request at `/api/generate` with fields `model`, `prompt` and `images`.  The
 response must contain a `response` field with the model's output.  If the
 server is not available, the client falls back to returning the centre of
-the image.
+the image.  In streaming mode (`stream: true`) Ollama sends NDJSON chunks
+whose `response` fields are concatenated until the action is complete.
+Multi‑region observations send every crop in `images`, in region order.
+Batches put every image into one request and ask the model for a
+JSON array with one action per image.  A `schema` is sent as `format`, which
+makes Ollama constrain generation to it, and `max_tokens` as the
+`num_predict` option.  Ollama has no field for context, so plugin objects
+are appended to the prompt as compact JSON (per image for batches).
 """
 
 from __future__ import annotations
 
-import base64
-import io
 import json
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
-import cv2
 import numpy as np
-import requests
 
+from ..actions import batch_schema
+from ..regions import Observation, as_images
+from .base import BaseClient
+from .encoding import ImageEncoder
 
-class OllamaClient:
-    def __init__(self, url: str, model_name: str = "qwen2.5-vl"):
-        self.url = url.rstrip("/")
+
+class OllamaClient(BaseClient):
+    def __init__(
+        self,
+        url: str,
+        model_name: str = "qwen2.5-vl",
+        connect_timeout: float = 3.05,
+        read_timeout: float = 30.0,
+        pool_size: int = 4,
+        encoder: Optional[ImageEncoder] = None,
+        stream: bool = False,
+        schema: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 0,
+        deadline: float = 0.0,
+    ):
+        super().__init__(url.rstrip("/"), connect_timeout=connect_timeout, read_timeout=read_timeout,
+                         pool_size=pool_size, encoder=encoder, stream=stream, schema=schema,
+                         max_tokens=max_tokens, deadline=deadline)
         self.model_name = model_name
 
-    def _encode_image(self, image: np.ndarray) -> str:
-        """Encode an RGB numpy array as a PNG data URI."""
-        success, buffer = cv2.imencode(".png", cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
-        if not success:
-            raise RuntimeError("Failed to encode image")
-        encoded = base64.b64encode(buffer.tobytes()).decode("ascii")
-        return f"data:image/png;base64,{encoded}"
+    def _constrain(self, payload: Dict[str, Any], count: int = 1) -> Dict[str, Any]:
+        if self.schema is not None:
+            payload["format"] = self.schema if count == 1 else batch_schema(self.schema, count)
+        if self.max_tokens:
+            payload["options"] = {"num_predict": self.max_tokens * count}
+        return payload
 
-    def generate_action(self, prompt: str, image: np.ndarray, objects: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
-        """Send the observation to the model and return the parsed action.
+    @staticmethod
+    def _objects_text(objects: Optional[List[Dict[str, Any]]]) -> str:
+        return json.dumps(objects or [], separators=(",", ":"))
 
-        Args:
-            prompt: The full prompt including system and user instructions.
-            image: RGB image (224×224) to send.
-            objects: Optional list of object dictionaries; included in the prompt.
+    def _build_payload(self, prompt: str, image: Observation, objects: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        if objects:
+            prompt = f"{prompt}\n\nObjects: {self._objects_text(objects)}"
+        return self._constrain({
+            "model": self.model_name,
+            "prompt": prompt,
+            "images": [self.encoder.encode(crop).data for crop in as_images(image)],
+            "stream": False,
+        })
 
-        Returns:
-            Parsed JSON action.  If the model fails, returns a centre click.
-        """
-        payload = {
+    def _build_batch_payload(self, prompt: str, images: List[np.ndarray],
+                             objects: List[Optional[List[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        prompt = self.batch_prompt(prompt, len(images))
+        if any(objects):
+            lines = [f"Objects in image {i + 1}: {self._objects_text(objs)}" for i, objs in enumerate(objects)]
+            prompt = prompt + "\n\n" + "\n".join(lines)
+        return self._constrain({
             "model": self.model_name,
             "prompt": prompt,
-            "images": [self._encode_image(image)],
-        }
-        try:
-            resp = requests.post(self.url, json=payload, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-            text = data.get("response", "").strip()
-            # Try to parse JSON; model may return markdown, so extract braces
-            start = text.find("{")
-            end = text.rfind("}")
-            if start != -1 and end != -1:
-                json_str = text[start:end + 1]
-                return json.loads(json_str)
-        except Exception:
-            pass
-        # Fallback: centre click
-        h, w = image.shape[:2]
-        return {
-            "click": [w // 2, h // 2],
-            "modifiers": {"shift": False},
-            "reason": "fallback centre click",
-        }
\ No newline at end of file
+            "images": [self.encoder.encode(image).data for image in images],
+            "stream": False,
+        }, len(images))
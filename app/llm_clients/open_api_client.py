@@ -1,60 +1,109 @@
 """Generic HTTP client for remote Qwen‑2.5‑VL endpoints.
 
 This client sends a JSON payload to an arbitrary HTTP endpoint.  The payload
-contains the prompt, a base64‑encoded PNG image and optional JSON context.
-The endpoint is expected to return a JSON object with a `response` field
-containing a JSON string.  If anything goes wrong, the client produces a
-centre click as a fallback.
+contains the prompt, the encoded image as a `data:` URI and optional JSON
+context.  The endpoint is expected to return a JSON object with a `response`
+field containing a JSON string.  If anything goes wrong, the client produces a
+centre click as a fallback.  A multi‑region observation sends its crops as an
+`images` list of `data:` URIs instead of `image`.  Batched requests send `images` and `objects`
+lists; the endpoint may answer with a `responses` list (one string per image)
+or with a single `response` holding a JSON array.  In streaming mode the
+payload carries `stream: true` and the endpoint may reply with NDJSON or
+server‑sent events carrying either a `response` delta or an OpenAI‑style
+`choices[0].delta.content`.  A `schema` is sent as an OpenAI‑style
+`response_format` (`json_schema`, strict), which vLLM and compatible servers
+enforce with guided decoding; batched requests wrap the actions in an
+`actions` array because the root must be an object.  `max_tokens` is sent
+as is.
 """
 
 from __future__ import annotations
 
-import base64
-import json
 from typing import Any, Dict, List, Optional
 
-import cv2
 import numpy as np
-import requests
 
+from ..actions import batch_schema
+from ..regions import Observation, as_images
+from .base import BaseClient
+from .encoding import ImageEncoder
 
-class OpenAPIClient:
-    def __init__(self, url: str, headers: Optional[Dict[str, str]] = None, model_name: Optional[str] = None):
-        self.url = url
+
+class OpenAPIClient(BaseClient):
+    def __init__(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        model_name: Optional[str] = None,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 30.0,
+        pool_size: int = 4,
+        encoder: Optional[ImageEncoder] = None,
+        stream: bool = False,
+        schema: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 0,
+        deadline: float = 0.0,
+    ):
+        super().__init__(url, headers=headers, connect_timeout=connect_timeout, read_timeout=read_timeout,
+                         pool_size=pool_size, encoder=encoder, stream=stream, schema=schema,
+                         max_tokens=max_tokens, deadline=deadline)
         self.headers = headers or {}
         self.model_name = model_name
 
-    def _encode_image(self, image: np.ndarray) -> str:
-        success, buffer = cv2.imencode(".png", cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
-        if not success:
-            raise RuntimeError("Failed to encode image")
-        encoded = base64.b64encode(buffer.tobytes()).decode("ascii")
-        return f"data:image/png;base64,{encoded}"
+    def _constrain(self, payload: Dict[str, Any], count: int = 1) -> Dict[str, Any]:
+        if self.schema is not None:
+            schema = self.schema
+            if count > 1:
+                schema = {"type": "object", "properties": {"actions": batch_schema(self.schema, count)},
+                          "required": ["actions"], "additionalProperties": False}
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "actions" if count > 1 else "action", "schema": schema, "strict": True},
+            }
+        if self.max_tokens:
+            payload["max_tokens"] = self.max_tokens * count
+        return payload
+
+    def _build_payload(self, prompt: str, image: Observation, objects: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"prompt": prompt, "objects": objects or []}
+        if isinstance(image, np.ndarray):
+            payload["image"] = self.encoder.encode(image).data_uri()
+        else:
+            payload["images"] = [self.encoder.encode(crop).data_uri() for crop in as_images(image)]
+        if self.model_name:
+            payload["model_name"] = self.model_name
+        return self._constrain(payload)
 
-    def generate_action(self, prompt: str, image: np.ndarray, objects: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    def _build_batch_payload(self, prompt: str, images: List[np.ndarray],
+                             objects: List[Optional[List[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
         payload = {
-            "prompt": prompt,
-            "image": self._encode_image(image),
-            "objects": objects or [],
+            "prompt": self.batch_prompt(prompt, len(images)),
+            "images": [self.encoder.encode(image).data_uri() for image in images],
+            "objects": [objs or [] for objs in objects],
         }
         if self.model_name:
             payload["model_name"] = self.model_name
-        try:
-            resp = requests.post(self.url, json=payload, headers=self.headers, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-            text = data.get("response", "").strip()
-            start = text.find("{")
-            end = text.rfind("}")
-            if start != -1 and end != -1:
-                json_str = text[start:end + 1]
-                return json.loads(json_str)
-        except Exception:
-            pass
-        # Fallback centre click
-        h, w = image.shape[:2]
-        return {
-            "click": [w // 2, h // 2],
-            "modifiers": {"shift": False},
-            "reason": "fallback centre click",
-        }
\ No newline at end of file
+        return self._constrain(payload, len(images))
+
+    def _batch_response(self, data: Dict[str, Any], count: int) -> Optional[List[Dict[str, Any]]]:
+        responses = data.get("responses")
+        if isinstance(responses, list) and len(responses) == count:
+            actions = [self._parse_text(text) for text in responses]
+            if all(action is not None for action in actions):
+                return actions
+            return None
+        return super()._batch_response(data, count)
+
+    def _stream_text(self, event: Dict[str, Any]) -> str:
+        choices = event.get("choices")
+        if choices:
+            choice = choices[0]
+            delta = choice.get("delta") or {}
+            return delta.get("content") or choice.get("text") or ""
+        return event.get("response", "")
+
+    def _stream_done(self, event: Dict[str, Any]) -> bool:
+        choices = event.get("choices")
+        if choices:
+            return choices[0].get("finish_reason") is not None
+        return bool(event.get("done"))
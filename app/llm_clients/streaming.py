@@ -0,0 +1,107 @@
+"""Incremental parsing of streamed model output.
+
+Qwen often keeps talking after it has produced the JSON action.  When the
+response is streamed, `JsonObjectScanner` watches the text as it arrives and
+reports the first complete top‑level JSON object as soon as its closing brace
+is seen, so the client can act on it and hang up on the rest of the
+generation.  The scanner tracks string literals and escapes, so braces inside
+`reason` strings do not confuse it.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+
+class JsonObjectScanner:
+    """Find the first complete top‑level JSON object in streamed text."""
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.result: Optional[str] = None
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Consume more text.
+
+        Args:
+            chunk: The next piece of model output.
+
+        Returns:
+            The text of the first complete object once it has been closed,
+            otherwise None.  After an object is found further input is ignored.
+        """
+        if self.result is not None or not chunk:
+            return self.result
+        self._text += chunk
+        text = self._text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                if self._depth > 0:
+                    self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif ch == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.result = text[self._start:i + 1]
+                    self._pos = i + 1
+                    return self.result
+        self._pos = len(text)
+        return None
+
+    def parse(self) -> Optional[Dict[str, Any]]:
+        """Decode the object found so far, if any."""
+        return json.loads(self.result) if self.result is not None else None
+
+
+def iter_stream_events(lines: Iterable[Union[bytes, str]]) -> Iterator[Dict[str, Any]]:
+    """Decode NDJSON or server‑sent‑event lines into JSON objects.
+
+    Blank lines, SSE comments and the OpenAI `[DONE]` sentinel are skipped.
+
+    Args:
+        lines: Iterable of `bytes` or `str` lines, e.g. `Response.iter_lines()`.
+
+    Yields:
+        Decoded JSON objects.
+    """
+    for raw in lines:
+        line = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw
+        line = line.strip()
+        if not line or line.startswith(":"):
+            continue
+        if line.startswith("data:"):
+            line = line[5:].strip()
+        if line == "[DONE]":
+            return
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Split a stream of byte chunks into lines as soon as each is complete."""
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        yield from lines
+    if pending:
+        yield pending
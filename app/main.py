@@ -14,102 +14,758 @@ import os
 import sys
 import threading
 import time
+from functools import partial
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 import numpy as np
 import tkinter as tk
-import cv2
 from tkinter import messagebox
 
+from .actions import Action, ActionParser, action_schema, terse_prompt
+from .actuator import Actuator, make_backend
+from .bench import StubModelServer, load_frames, parse_latency, run_bench
 from .config import load_config
-from .capture import ScreenCapturer
+from .evaluation import load_labels, run_eval
+from .metrics import REGISTRY, MetricsServer, SummaryReporter
+from .capture import ChangeDetector, ScreenCapturer
 from .scheduler import TickScheduler
-from .overlay import draw_click, draw_objects
-from .utils.logging_utils import prepare_run_dir, setup_logging
+from .pipeline import Agent, BatchPipeline, Pipeline
+from .plugin_feed import ObjectFeed
+from .recorder import RunRecorder
+from .regions import as_images, region_prompt
+from .replay import ReplayDataset
+from .speculation import Speculator
+from .utils.logging_utils import log_stats, prepare_run_dir, setup_logging
+from .utils.spatial import GridIndex
 from .llm_clients import OllamaClient, OpenAPIClient
-from .control import move_and_click
+from .llm_clients.base import BaseClient
+from .llm_clients.cache import ActionCache, CachedClient
+from .llm_clients.encoding import ImageEncoder
 
 
-def build_system_prompt() -> str:
-    """Load the system prompt from prompts/system_qwen.md."""
+def build_system_prompt(regions=None, decoding=None) -> str:
+    """Load the system prompt from prompts/system_qwen.md.
+
+    Args:
+        regions: Capture regions; if given, the prompt describes the images
+            they produce.
+        decoding: Decoding settings; a capped or dropped `reason` is
+            requested in the prompt too.
+    """
     prompt_path = Path(__file__).resolve().parent.parent / "prompts" / "system_qwen.md"
     with open(prompt_path, "r", encoding="utf-8") as fh:
-        return fh.read().strip()
+        prompt = fh.read().strip()
+    if decoding is not None:
+        prompt = terse_prompt(prompt, decoding.reason, decoding.reason_length)
+    return region_prompt(prompt, regions) if regions else prompt
 
 
-def select_client(config) -> object:
-    """Create an LLM client based on the model backend."""
+def _action_schema(config, decoding: bool = False) -> dict:
+    """Return the action schema for the configured reason mode and regions.
+
+    Args:
+        decoding: Return the strict schema sent to the backend.  Otherwise
+            return the one replies are validated against: the strict one if
+            the backend enforces it, else a lenient one that does not reject
+            a reason running past its cap.
+    """
+    cfg = config.decoding
+    regions = config.capture.regions
+    images = len(regions) if regions else 1
+    if decoding or cfg.structured:
+        return action_schema(cfg.reason, cfg.reason_length, images, strict=True)
+    return action_schema("none" if cfg.reason == "none" else "full", images=images)
+
+
+def _select_backend(config) -> object:
+    """Create the raw LLM client for the configured model backend."""
     backend = config.model.backend.lower()
+    client_kwargs = dict(
+        connect_timeout=config.model.connect_timeout,
+        read_timeout=config.model.read_timeout,
+        deadline=config.model.deadline,
+        pool_size=config.model.pool_size,
+        stream=config.model.stream,
+        schema=_action_schema(config, decoding=True) if config.decoding.structured else None,
+        max_tokens=config.decoding.max_tokens,
+        encoder=ImageEncoder(
+            fmt=config.model.image_format,
+            quality=config.model.image_quality,
+            png_compression=config.model.png_compression,
+            channel_order=config.channel_order,
+        ),
+    )
     if backend == "ollama":
-        return OllamaClient(url=config.model.url, model_name=config.model.model_name or "qwen2.5-vl")
+        return OllamaClient(url=config.model.url, model_name=config.model.model_name or "qwen2.5-vl", **client_kwargs)
     elif backend == "open_api":
-        return OpenAPIClient(url=config.model.url, headers=config.model.headers, model_name=config.model.model_name)
+        return OpenAPIClient(url=config.model.url, headers=config.model.headers, model_name=config.model.model_name, **client_kwargs)
     else:
         # fallback dummy client
         from typing import Any, Dict
         class DummyClient:
             def generate_action(self, prompt: str, image: np.ndarray, objects: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
-                h, w = image.shape[:2]
+                h, w = as_images(image)[0].shape[:2]
                 return {"click": [w // 2, h // 2], "modifiers": {"shift": False}, "reason": "dummy"}
         return DummyClient()
 
 
+def select_client(config) -> object:
+    """Create an LLM client based on the model backend.
+
+    When the action cache is enabled the client is wrapped in a
+    `CachedClient`, pre‑loaded from `cache.path` if that file exists.
+    """
+    client = _select_backend(config)
+    if config.cache.enabled:
+        cache = ActionCache(
+            max_entries=config.cache.max_entries,
+            ttl=config.cache.ttl,
+            max_distance=config.cache.max_distance,
+            path=config.cache.path,
+        )
+        cache.load()
+        client = CachedClient(client, cache, schema=_action_schema(config))
+    return client
+
+
+def close_client(client: object, logger) -> None:
+    """Log cache statistics and release the client's resources."""
+    if isinstance(client, CachedClient):
+        log_stats(logger, "action_cache", client.summary())
+    close = getattr(client, "close", None)
+    if close is not None:
+        close()
+
+
+class MetricsReporting:
+    """Start the `/metrics` endpoint and periodic run.log summaries.
+
+    Use as a context manager around a run; on exit the endpoint is shut down
+    and a final summary is logged.
+    """
+
+    def __init__(self, config, logger):
+        self.server: Optional[MetricsServer] = None
+        if config.metrics.port is not None:
+            try:
+                self.server = MetricsServer(REGISTRY, host=config.metrics.host, port=config.metrics.port)
+            except OSError as exc:
+                logger.warning("Metrics endpoint disabled: %s", exc)
+        self.reporter = SummaryReporter(logger, REGISTRY, interval=config.metrics.interval)
+
+    def __enter__(self) -> "MetricsReporting":
+        if self.server is not None:
+            self.server.start()
+        self.reporter.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.reporter.stop()
+        if self.server is not None:
+            self.server.stop()
+
+
+def _replay_demo(config, logger, run_dir: str, limit: int, should_continue=lambda: True) -> bool:
+    """Send the demo frames to the model, recording each action.
+
+    Frames come from the `demo_frames/` replay cache, so they are decoded
+    and resized only the first time (or after a frame changes).
+
+    Returns:
+        False if there were no demo frames.
+    """
+    demo_dir = Path(__file__).resolve().parent.parent / "demo_frames"
+    dataset = ReplayDataset.from_directory(str(demo_dir), channel_order=config.channel_order)
+    if not len(dataset):
+        return False
+    client = select_client(config)
+    system_prompt = build_system_prompt(decoding=config.decoding)
+    total = min(limit, len(dataset))
+    recorder = _make_recorder(config, run_dir, system_prompt, force=True)
+    with MetricsReporting(config, logger):
+        for idx in range(total):
+            if not should_continue():
+                break
+            # Per-frame read, comparable with the live capture stage.
+            with REGISTRY.span("capture"):
+                frame = dataset[idx]
+            with REGISTRY.span("infer"):
+                action = client.generate_action(system_prompt, frame, objects=None)
+            logger.info(f"Frame {idx+1}/{total}: {json.dumps(action)}")
+            # Saved for inspection on the recorder thread
+            recorder.record(time.monotonic(), frame, None, action)
+            # Sleep to simulate pacing
+            with REGISTRY.span("scheduler_wait"):
+                time.sleep(1.0 / max(config.fps, 1e-3))
+    recorder.stop()
+    log_stats(logger, "recorder", recorder.summary())
+    close_client(client, logger)
+    return True
+
+
 def run_demo(config_path: str, limit: int = 10) -> None:
     """Run the offline replay harness using prerecorded frames."""
     config = load_config(config_path)
     run_dir = prepare_run_dir(config.log_dir)
     logger = setup_logging(run_dir)
     logger.info("Starting demo harness…")
-    capturer = ScreenCapturer(config.window.as_dict(), fps=config.fps)
-    client = select_client(config)
-    system_prompt = build_system_prompt()
-    demo_dir = Path(__file__).resolve().parent.parent / "demo_frames"
-    frames = sorted([p for p in demo_dir.iterdir() if p.suffix.lower() in {".png", ".jpg", ".jpeg"}])
-    if not frames:
+    if not _replay_demo(config, logger, run_dir, limit):
         logger.error("No demo frames found in demo_frames/ directory.")
         return
-    total = min(limit, len(frames))
-    for idx, frame_path in enumerate(frames[:total]):
-        img = cv2.imread(str(frame_path))
-        if img is None:
-            continue
-        # Convert BGR to RGB
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        resized = cv2.resize(img_rgb, (224, 224))
-        action = client.generate_action(system_prompt, resized, objects=None)
-        logger.info(f"Frame {idx+1}/{total}: action {action}")
-        # Draw overlay and save for inspection
-        click = tuple(action.get("click", [112, 112]))
-        annotated = draw_click(resized, click)
-        out_path = Path(run_dir) / f"demo_{idx+1:04d}.png"
-        cv2.imwrite(str(out_path), cv2.cvtColor(annotated, cv2.COLOR_RGB2BGR))
-        # Sleep to simulate pacing
-        time.sleep(1.0 / config.fps)
     logger.info("Demo completed.")
 
 
+def _make_capture(config, window: dict):
+    """Create a capturer for `window` plus the pipeline `(capture, pace)` pair.
+
+    With capture regions configured, each frame is a list of region crops.
+    """
+    capturer = ScreenCapturer(
+        window,
+        fps=config.fps,
+        mask_chat=config.capture.mask_chat,
+        channel_order=config.channel_order,
+        zero_copy=config.capture.zero_copy,
+        pool_size=config.capture.pool_size,
+        regions=config.capture.regions,
+    )
+    if config.capture.threaded:
+        # The capture thread paces itself; the pipeline takes the newest frame.
+        last_ts = 0.0
+
+        def capture() -> Optional[tuple]:
+            nonlocal last_ts
+            latest = capturer.wait_for_frame(last_ts, timeout=0.5)
+            if latest is not None:
+                last_ts = latest[0]
+            return latest
+
+        capturer.start((224, 224), ring_size=config.capture.ring_size)
+        return capturer, capture, None
+
+    def capture() -> Optional[tuple]:
+        if capturer.regions:
+            return time.monotonic(), capturer.grab_regions()
+        return time.monotonic(), capturer.grab_resized((224, 224))
+
+    return capturer, capture, capturer.wait
+
+
+def _with_objects(capture: Callable[[], Optional[tuple]], feed: Optional[ObjectFeed]) -> Callable[[], Optional[tuple]]:
+    """Pair every captured frame with the plugin objects current at capture.
+
+    The wrapped capture returns `(captured_at, (frame, objects, captured_at))`.
+    """
+    def capture_observation() -> Optional[tuple]:
+        captured = capture()
+        if captured is None:
+            return None
+        captured_at, frame = captured
+        objects = feed.objects_at(captured_at) if feed is not None else None
+        return captured_at, (frame, objects, captured_at)
+
+    return capture_observation
+
+
+def _make_recorder(config, run_dir: Optional[str], prompt: str, name: str = "recording",
+                   force: bool = False) -> Optional[RunRecorder]:
+    """Start a recorder under `run_dir` if recording is enabled (or forced)."""
+    if run_dir is None or not (config.recorder.enabled or force):
+        return None
+    recorder = RunRecorder(
+        os.path.join(run_dir, name),
+        chunk_size=config.recorder.chunk_size,
+        queue_size=config.recorder.queue_size,
+        compression=config.recorder.compression,
+        keyframe_interval=config.recorder.keyframe_interval,
+        prompt=prompt,
+        channel_order=config.channel_order,
+    )
+    recorder.start()
+    return recorder
+
+
+def _make_scheduler(config) -> TickScheduler:
+    """Create the tick scheduler described by the `scheduler` section."""
+    cfg = config.scheduler
+    return TickScheduler(
+        min_interval=cfg.min_interval,
+        period=cfg.period,
+        offset=cfg.offset,
+        hold=cfg.hold,
+        gain=cfg.gain,
+        latency_window=cfg.latency_window,
+        latency_percentile=cfg.latency_percentile,
+    )
+
+
+def _make_actuator(config) -> Actuator:
+    """Start the background actuator.  One cursor serves every window."""
+    actuator = Actuator(
+        make_backend(config.actuator.backend),
+        steps=config.actuator.steps,
+        duration=config.actuator.duration,
+    )
+    actuator.start()
+    return actuator
+
+
+def _make_actuate(actuator: Actuator, window: dict, logger, name: Optional[str] = None, on_submit=None):
+    """Return a callable that queues a click inside `window` and logs it.
+
+    The click is played on the actuator thread; a newer action for the same
+    window pre‑empts one still in flight.  `on_submit`, if given, is called
+    with the queued command.
+    """
+    def actuate(action: Action) -> None:
+        command = actuator.submit(action.click, window, source=name)
+        if on_submit is not None:
+            on_submit(command)
+        if name is None:
+            logger.info(json.dumps(action.as_dict()))
+        else:
+            logger.info("%s %s", name, json.dumps(action.as_dict()))
+
+    return actuate
+
+
+def _make_action_parser(config, regions=None) -> ActionParser:
+    """Create the validator mapping model output to window‑pixel actions."""
+    return ActionParser(_action_schema(config), regions=regions, fallback_reasons=BaseClient.FALLBACK_REASONS)
+
+
+def _client_stats(client) -> dict:
+    out = {}
+    if isinstance(client, CachedClient):
+        out["action_cache"] = client.summary()
+    encoder = getattr(client, "encoder", None)
+    if encoder is not None:
+        out["encode"] = encoder.summary()
+    if getattr(client, "stream", False):
+        out["stream_early_stops"] = client.early_stops
+    return out
+
+
+def build_live_pipeline(config, logger, run_dir: Optional[str] = None) -> Pipeline:
+    """Assemble the capture → inference → actuation pipeline for live play.
+
+    With `recorder.enabled`, every frame the model sees is recorded to
+    `run_dir` together with its objects and action.
+    """
+    capturer, capture, pace = _make_capture(config, config.window.as_dict())
+    scheduler = _make_scheduler(config)
+    client = select_client(config)
+    regions = config.capture.regions
+    system_prompt = build_system_prompt(regions, config.decoding)
+    gate = ChangeDetector(config.change_gate.threshold, max_skip=config.change_gate.max_skip)
+    recorder = _make_recorder(config, run_dir, system_prompt)
+    feed: Optional[ObjectFeed] = None
+    if config.plugin_enabled:
+        feed = ObjectFeed(config.plugin_address, max_age=config.plugin_max_age, conflate=config.plugin_conflate)
+        if config.scheduler.sync == "plugin":
+            feed.add_tick_listener(lambda tick, received: scheduler.observe_tick(received, tick))
+        feed.start()
+    # Scene changes between consecutive captured frames mark tick boundaries.
+    tick_gate = ChangeDetector(config.scheduler.frame_threshold, max_skip=0) \
+        if config.scheduler.sync == "frames" else None
+    parser = _make_action_parser(config, regions)
+    window_size = (config.window.width, config.window.height)
+    last_action: Optional[Action] = None
+    last_seen = 0.0
+    last_captured: Optional[tuple] = None
+
+    def capture_observation() -> Optional[tuple]:
+        nonlocal last_seen, last_captured
+        # Once phase‑locked, start inference so it finishes as the tick turns.
+        scheduler.wait_for_inference()
+        captured = capture()
+        if captured is None:
+            return None
+        captured_at, frame = captured
+        if tick_gate is not None:
+            recent = capturer.since(last_seen) if capturer.threaded else [captured]
+            for ts, image in recent:
+                if tick_gate.changed(image):
+                    scheduler.observe_tick(ts)
+            last_seen = captured_at
+        # Pair each frame with the plugin objects that were current when it
+        # was grabbed; the lookup never touches the socket.
+        objects = feed.objects_at(captured_at) if feed is not None else None
+        last_captured = captured
+        return captured_at, (frame, objects, captured_at)
+
+    grid = GridIndex(config.snap.cell_size)
+    actuator = _make_actuator(config)
+
+    def generate(frame, objects: Optional[list]) -> dict:
+        start = time.perf_counter()
+        action = client.generate_action(system_prompt, frame, objects=objects)
+        scheduler.record_latency(time.perf_counter() - start)
+        return action
+
+    speculator: Optional[Speculator] = None
+    on_submit = None
+    if config.speculation.enabled:
+        speculator = Speculator(generate, max_distance=config.speculation.max_distance)
+
+        def on_submit(command) -> None:
+            # Ask the model about the newest frame while the mouse moves.
+            latest = capturer.latest() if capturer.threaded else last_captured
+            if latest is not None:
+                ts, frame = latest
+                objects = feed.objects_at(ts) if feed is not None else None
+                speculator.speculate(frame, objects, after=command)
+
+    def infer(observation: tuple) -> Optional[Action]:
+        nonlocal last_action
+        frame, objects, captured_at = observation
+        if speculator is not None and speculator.waiting(captured_at):
+            # The speculative request stands in for this frame, which was
+            # captured before the action finished.
+            return None
+        # Resolve the speculation before the gate: a static scene is where it
+        # matches most, and one left pending blocks every later speculation.
+        output = speculator.take(frame, captured_at) if speculator is not None else None
+        changed = gate.changed(frame)
+        if output is None and not changed:
+            # Static scene: repeat the previous action or do nothing
+            return last_action if config.change_gate.policy == "reuse" else None
+        if output is None:
+            output = generate(frame, objects)
+        parsed = parser.parse(output)
+        if parsed is None:
+            # Malformed output: skip this frame instead of clicking at random.
+            if recorder is not None:
+                recorder.record(captured_at, frame, objects, None)
+            return None
+        # Clicks are in model‑image pixels; objects are in window pixels.
+        if objects and config.snap.enabled:
+            action = parser.snap_to_window(parsed, window_size, grid, objects, config.snap.max_distance)
+        else:
+            action = parser.to_window([parsed], window_size)[0]
+        if recorder is not None:
+            recorder.record(captured_at, frame, objects, action.as_dict())
+        last_action = action
+        return last_action
+
+    def stats() -> dict:
+        out = {"change_gate": gate.summary(), "actuator": actuator.summary(), "scheduler": scheduler.summary(),
+               "actions": parser.summary()}
+        if feed is not None:
+            out["object_feed"] = feed.summary()
+        if speculator is not None:
+            out["speculation"] = speculator.summary()
+        if recorder is not None:
+            out["recorder"] = recorder.summary()
+        out.update(_client_stats(client))
+        return out
+
+    def on_stop() -> None:
+        capturer.stop()
+        actuator.stop()
+        if speculator is not None:
+            speculator.close()
+        if recorder is not None:
+            recorder.stop()
+        if feed is not None:
+            feed.stop()
+        close_client(client, logger)
+
+    return Pipeline(
+        capture=capture_observation,
+        infer=infer,
+        actuate=_make_actuate(actuator, config.window.as_dict(), logger, on_submit=on_submit),
+        pace=pace,
+        wait_for_tick=scheduler.wait_for_next_tick,
+        queue_size=config.queue_size,
+        logger=logger,
+        extra_stats=stats,
+        on_stop=on_stop,
+    )
+
+
+def build_multi_pipeline(config, logger, run_dir: Optional[str] = None) -> BatchPipeline:
+    """Assemble one agent per configured window around a batched model client.
+
+    With the plugin enabled, each window subscribes to its own object feed
+    (`plugin_addresses`) and its clicks are snapped to its objects.
+    Speculation is not supported here.  Recordings, if enabled, go to one
+    store per window.
+    """
+    client = select_client(config)
+    regions = config.capture.regions
+    system_prompt = build_system_prompt(regions, config.decoding)
+    actuator = _make_actuator(config)
+    capturers = []
+    agents = []
+    gates = []
+    schedulers = []
+    recorders = []
+    feeds: List[Optional[ObjectFeed]] = []
+    grids = []
+    last_actions: List[Optional[Action]] = []
+    parser = _make_action_parser(config, regions)
+    window_sizes = [(rect.width, rect.height) for rect in config.windows]
+    if config.speculation.enabled:
+        logger.warning("Speculation is not supported with several windows; disabled")
+    for index, rect in enumerate(config.windows):
+        name = f"window{index}"
+        capturer, capture, pace = _make_capture(config, rect.as_dict())
+        # Every client has its own tick phase; only the minimum interval is
+        # enforced here.
+        scheduler = _make_scheduler(config)
+        feed = None
+        if config.plugin_enabled:
+            addresses = config.plugin_addresses or [config.plugin_address]
+            if index < len(addresses):
+                feed = ObjectFeed(addresses[index], max_age=config.plugin_max_age, conflate=config.plugin_conflate)
+                if config.scheduler.sync == "plugin":
+                    feed.add_tick_listener(lambda tick, received, s=scheduler: s.observe_tick(received, tick))
+                feed.start()
+            else:
+                logger.warning("No plugin address for %s; its clicks get no objects or snapping", name)
+        schedulers.append(scheduler)
+        capturers.append(capturer)
+        feeds.append(feed)
+        grids.append(GridIndex(config.snap.cell_size))
+        agents.append(Agent(
+            name=name,
+            capture=_with_objects(capture, feed),
+            actuate=_make_actuate(actuator, rect.as_dict(), logger, name),
+            pace=pace,
+            wait_for_tick=scheduler.wait_for_next_tick,
+        ))
+        gates.append(ChangeDetector(config.change_gate.threshold, max_skip=config.change_gate.max_skip))
+        recorders.append(_make_recorder(config, run_dir, system_prompt, name=f"recording_{name}"))
+        last_actions.append(None)
+    generate_actions = getattr(client, "generate_actions", None)
+
+    def infer_batch(items: List[tuple]) -> List[Optional[Action]]:
+        results: List[Optional[Action]] = [None] * len(items)
+        pending = []
+        for pos, (agent, (frame, _, _)) in enumerate(items):
+            if gates[agent].changed(frame):
+                pending.append(pos)
+            elif config.change_gate.policy == "reuse":
+                results[pos] = last_actions[agent]
+        if pending:
+            frames = [items[pos][1][0] for pos in pending]
+            objects = [items[pos][1][1] for pos in pending]
+            if generate_actions is not None:
+                actions = generate_actions(system_prompt, frames, objects)
+            else:
+                actions = [client.generate_action(system_prompt, frame, objects=objs)
+                           for frame, objs in zip(frames, objects)]
+            if len(actions) != len(pending):
+                # zip() would silently leave the remaining windows idle.
+                raise RuntimeError(f"Expected {len(pending)} actions from the model client, got {len(actions)}")
+            parsed = [(pos, parser.parse(output)) for pos, output in zip(pending, actions)]
+            valid = [(pos, action) for pos, action in parsed if action is not None]
+            # Windows without objects share one vectorised mapping, each to
+            # its own size; clicks with objects are mapped and snapped.
+            plain = [(pos, action) for pos, action in valid if not (items[pos][1][1] and config.snap.enabled)]
+            mapped = parser.to_window([action for _, action in plain],
+                                      [window_sizes[items[pos][0]] for pos, _ in plain])
+            by_pos = {pos: action for (pos, _), action in zip(plain, mapped)}
+            for pos, action in valid:
+                if pos not in by_pos:
+                    agent, (_, objs, _) = items[pos]
+                    by_pos[pos] = parser.snap_to_window(action, window_sizes[agent], grids[agent], objs,
+                                                        config.snap.max_distance)
+            for pos in pending:
+                agent, (frame, objs, captured_at) = items[pos]
+                action = by_pos.get(pos)
+                if action is not None:
+                    results[pos] = action
+                    last_actions[agent] = action
+                if recorders[agent] is not None:
+                    recorders[agent].record(captured_at, frame, objs,
+                                            action.as_dict() if action is not None else None)
+        return results
+
+    def stats() -> dict:
+        out = {
+            "change_gate": [gate.summary() for gate in gates],
+            "actuator": actuator.summary(),
+            "scheduler": [scheduler.summary() for scheduler in schedulers],
+            "actions": parser.summary(),
+        }
+        if any(feed is not None for feed in feeds):
+            out["object_feed"] = [feed.summary() if feed is not None else None for feed in feeds]
+        if any(recorder is not None for recorder in recorders):
+            out["recorder"] = [recorder.summary() for recorder in recorders if recorder is not None]
+        out.update(_client_stats(client))
+        return out
+
+    def on_stop() -> None:
+        for capturer in capturers:
+            capturer.stop()
+        actuator.stop()
+        for recorder in recorders:
+            if recorder is not None:
+                recorder.stop()
+        for feed in feeds:
+            if feed is not None:
+                feed.stop()
+        close_client(client, logger)
+
+    return BatchPipeline(
+        agents,
+        infer_batch,
+        batch_window=config.batch_window,
+        logger=logger,
+        extra_stats=stats,
+        on_stop=on_stop,
+    )
+
+
+def build_pipeline(config, logger, run_dir: Optional[str] = None):
+    """Build a single‑window pipeline, or a batched one for several windows."""
+    if len(config.windows) > 1:
+        return build_multi_pipeline(config, logger, run_dir)
+    return build_live_pipeline(config, logger, run_dir)
+
+
 def run_live(config_path: str) -> None:
     """Run the live capture loop."""
     config = load_config(config_path)
     run_dir = prepare_run_dir(config.log_dir)
     logger = setup_logging(run_dir)
     logger.info("Starting live capture… press Ctrl+C to exit.")
-    capturer = ScreenCapturer(config.window.as_dict(), fps=config.fps)
-    scheduler = TickScheduler(min_interval=0.6)
+    pipeline = build_pipeline(config, logger, run_dir)
+    with MetricsReporting(config, logger):
+        try:
+            pipeline.run_until(lambda: True)
+        except KeyboardInterrupt:
+            logger.info("Live capture stopped by user.")
+
+
+def run_benchmark(
+    config_path: str,
+    frames_dir: Optional[str] = None,
+    iterations: Optional[int] = None,
+    concurrency: int = 1,
+    warmup: int = 2,
+    stub_latency: Optional[str] = None,
+    report_path: Optional[str] = None,
+) -> dict:
+    """Run the offline benchmark and write a JSON report.
+
+    Args:
+        config_path: YAML config; its model section selects the backend.
+        frames_dir: Frames to replay (defaults to `demo_frames/`).
+        iterations: Measured requests (defaults to one per frame).
+        concurrency: Requests kept in flight.
+        warmup: Unmeasured requests sent first.
+        stub_latency: If set, benchmark against a local `StubModelServer`
+            with this latency distribution instead of the configured backend.
+        report_path: Where to write the report (defaults to `bench.json` in
+            the run directory).
+
+    Returns:
+        The report.
+    """
+    config = load_config(config_path)
+    run_dir = prepare_run_dir(config.log_dir)
+    logger = setup_logging(run_dir)
+    source = frames_dir or str(Path(__file__).resolve().parent.parent / "demo_frames")
+    frames = load_frames(source)
+    if not frames:
+        logger.error("No frames found in %s", source)
+        return {}
+    # The cache would hide the request path being measured.
+    config.cache.enabled = False
+    config.model.pool_size = max(config.model.pool_size, concurrency)
+    stub = None
+    if stub_latency:
+        stub = StubModelServer(parse_latency(stub_latency))
+        stub.start()
+        config.model.backend = "ollama"
+        config.model.url = stub.url
     client = select_client(config)
-    system_prompt = build_system_prompt()
     try:
-        while True:
-            scheduler.wait_for_next_tick()
-            frame = capturer.grab_resized((224, 224))
-            # TODO: subscribe to plugin if enabled
-            action = client.generate_action(system_prompt, frame, objects=None)
-            click = action.get("click", [112, 112])
-            move_and_click((click[0], click[1]), config.window.as_dict(), duration=0.15)
-            logger.info(json.dumps(action))
-    except KeyboardInterrupt:
-        logger.info("Live capture stopped by user.")
+        report = run_bench(
+            client,
+            frames,
+            build_system_prompt(decoding=config.decoding),
+            iterations=iterations,
+            concurrency=concurrency,
+            warmup=warmup,
+            channel_order=config.channel_order,
+        )
+    finally:
+        close_client(client, logger)
+        if stub is not None:
+            stub.stop()
+    report.update({
+        "backend": config.model.backend,
+        "model": config.model.model_name,
+        "stream": config.model.stream,
+        "image_format": config.model.image_format,
+        "frames_dir": source,
+        "stub_latency": stub_latency,
+    })
+    out_path = report_path or os.path.join(run_dir, "bench.json")
+    with open(out_path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+    log_stats(logger, "bench", report)
+    logger.info("Benchmark report written to %s", out_path)
+    return report
+
+
+def run_evaluation(
+    config_path: str,
+    frames_dir: Optional[str] = None,
+    labels_path: Optional[str] = None,
+    workers: int = 4,
+    report_path: Optional[str] = None,
+) -> dict:
+    """Score the configured client on labelled frames and write a report.
+
+    Args:
+        config_path: YAML config; its model section selects the backend.
+        frames_dir: Frame directory or recording (defaults to `demo_frames/`).
+        labels_path: Target boxes (defaults to `labels.json` in `frames_dir`).
+        workers: Worker processes sending requests.
+        report_path: Where to write the report (defaults to `eval.json` in
+            the run directory).
+
+    Returns:
+        The report.
+    """
+    config = load_config(config_path)
+    run_dir = prepare_run_dir(config.log_dir)
+    logger = setup_logging(run_dir)
+    source = frames_dir or str(Path(__file__).resolve().parent.parent / "demo_frames")
+    labels_path = labels_path or os.path.join(source, "labels.json")
+    if not os.path.exists(labels_path):
+        logger.error("No labels found at %s", labels_path)
+        return {}
+    # The action cache would score cached actions instead of the model.
+    config.cache.enabled = False
+    decoding = config.decoding
+    model = (f"{config.model.backend}:{config.model.model_name}:{config.model.image_format}:"
+             f"{config.model.image_quality}:{decoding.structured}:{decoding.reason}:{decoding.reason_length}:"
+             f"{decoding.max_tokens}")
+    report = run_eval(
+        partial(select_client, config),
+        source,
+        load_labels(labels_path),
+        build_system_prompt(decoding=config.decoding),
+        model,
+        workers=workers,
+        channel_order=config.channel_order,
+        fallback_reasons=BaseClient.FALLBACK_REASONS,
+        schema=_action_schema(config),
+    )
+    report.update({"frames_dir": source, "labels": labels_path})
+    out_path = report_path or os.path.join(run_dir, "eval.json")
+    with open(out_path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+    log_stats(logger, "eval", {k: v for k, v in report.items() if k != "results"})
+    logger.info("Evaluation report written to %s", out_path)
+    return report
 
 
 class AppGUI:
@@ -167,50 +823,22 @@ class AppGUI:
         config = load_config(self.config_path)
         run_dir = prepare_run_dir(config.log_dir)
         logger = setup_logging(run_dir)
-        system_prompt = build_system_prompt()
-        client = select_client(config)
-        demo_dir = Path(__file__).resolve().parent.parent / "demo_frames"
-        frames = sorted([p for p in demo_dir.iterdir() if p.suffix.lower() in {".png", ".jpg", ".jpeg"}])
-        if not frames:
+        if not _replay_demo(config, logger, run_dir, 10, lambda: self.running):
             messagebox.showerror("Error", "No demo frames found.")
-            self.stop()
-            return
-        for idx, frame_path in enumerate(frames[:10]):
-            if not self.running:
-                break
-            img = cv2.imread(str(frame_path))
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            resized = cv2.resize(img_rgb, (224, 224))
-            action = client.generate_action(system_prompt, resized, objects=None)
-            click = tuple(action.get("click", [112, 112]))
-            annotated = draw_click(resized, click)
-            out_path = Path(run_dir) / f"gui_demo_{idx+1:04d}.png"
-            cv2.imwrite(str(out_path), cv2.cvtColor(annotated, cv2.COLOR_RGB2BGR))
-            logger.info(f"Demo frame {idx+1}: {json.dumps(action)}")
-            # Sleep to display pacing
-            time.sleep(1.0 / max(config.fps, 1e-3))
         self.stop()
 
     def _run_live_thread(self) -> None:
         config = load_config(self.config_path)
         run_dir = prepare_run_dir(config.log_dir)
         logger = setup_logging(run_dir)
-        capturer = ScreenCapturer(config.window.as_dict(), fps=config.fps)
-        scheduler = TickScheduler(min_interval=0.6)
-        client = select_client(config)
-        system_prompt = build_system_prompt()
-        try:
-            while self.running:
-                scheduler.wait_for_next_tick()
-                frame = capturer.grab_resized((224, 224))
-                action = client.generate_action(system_prompt, frame, objects=None)
-                click = action.get("click", [112, 112])
-                move_and_click((click[0], click[1]), config.window.as_dict(), duration=0.15)
-                logger.info(json.dumps(action))
-        except Exception as exc:
-            logger.exception("Error in live thread", exc_info=exc)
-        finally:
-            self.stop()
+        pipeline = build_pipeline(config, logger, run_dir)
+        with MetricsReporting(config, logger):
+            try:
+                pipeline.run_until(lambda: self.running)
+            except Exception as exc:
+                logger.exception("Error in live thread", exc_info=exc)
+            finally:
+                self.stop()
 
 
 def parse_args(args: List[str]) -> argparse.Namespace:
@@ -218,12 +846,42 @@ def parse_args(args: List[str]) -> argparse.Namespace:
     parser.add_argument("--config", type=str, required=True, help="Path to YAML config file")
     parser.add_argument("--demo", action="store_true", help="Run the offline demo harness")
     parser.add_argument("--live", action="store_true", help="Run live capture without GUI")
+    parser.add_argument("--bench", action="store_true", help="Run the offline throughput benchmark")
+    parser.add_argument("--eval", action="store_true", help="Score click accuracy and latency on labelled frames")
+    parser.add_argument("--frames", type=str, default=None,
+                        help="Frame directory (or recording for --eval) for --bench/--eval (default: demo_frames/)")
+    parser.add_argument("--labels", type=str, default=None, help="Target boxes for --eval (default: <frames>/labels.json)")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes for --eval")
+    parser.add_argument("--iterations", type=int, default=None, help="Measured requests for --bench")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests in flight for --bench")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured warmup requests for --bench")
+    parser.add_argument("--stub-latency", type=str, default=None,
+                        help="Benchmark a local stub model, e.g. constant:0.2 or lognormal:0.25:0.5")
+    parser.add_argument("--report", type=str, default=None, help="Path of the --bench/--eval JSON report")
     return parser.parse_args(args)
 
 
 def main(argv: Optional[List[str]] = None) -> None:
     opts = parse_args(argv or sys.argv[1:])
-    if opts.demo:
+    if opts.bench:
+        run_benchmark(
+            opts.config,
+            frames_dir=opts.frames,
+            iterations=opts.iterations,
+            concurrency=opts.concurrency,
+            warmup=opts.warmup,
+            stub_latency=opts.stub_latency,
+            report_path=opts.report,
+        )
+    elif opts.eval:
+        run_evaluation(
+            opts.config,
+            frames_dir=opts.frames,
+            labels_path=opts.labels,
+            workers=opts.workers,
+            report_path=opts.report,
+        )
+    elif opts.demo:
         run_demo(opts.config)
     elif opts.live:
         run_live(opts.config)
@@ -0,0 +1,220 @@
+"""Per‑stage latency metrics.
+
+Stages of the loop (capture, resize, encode, HTTP round‑trip, parse, scheduler
+wait, mouse movement, …) record their durations in a process‑wide
+`REGISTRY`, either with `REGISTRY.observe(stage, seconds)` or with the
+`REGISTRY.span(stage)` context manager.  Each stage keeps a Prometheus‑style
+cumulative histogram for the whole run plus a sliding window of recent samples
+from which p50/p95/p99 are computed.
+
+`MetricsServer` exposes the registry in the Prometheus text format on a local
+`/metrics` endpoint and `SummaryReporter` periodically writes a percentile
+summary to `run.log`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .utils.logging_utils import log_stats
+
+# Bucket upper bounds in seconds, spanning sub‑millisecond encodes to
+# multi‑second model calls.
+DEFAULT_BUCKETS: Sequence[float] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.6, 1.0, 2.5, 5.0, 10.0,
+)
+QUANTILES: Sequence[float] = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Cumulative bucket counts plus a window of recent samples."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, window: int = 1024):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent: deque = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantiles(self, qs: Sequence[float] = QUANTILES) -> List[float]:
+        """Return the requested quantiles of the recent window (seconds)."""
+        if not self.recent:
+            return [0.0] * len(qs)
+        return [float(v) for v in np.quantile(np.fromiter(self.recent, dtype=np.float64), qs)]
+
+    def cumulative(self) -> List[int]:
+        """Prometheus `le` bucket counts (each includes all smaller buckets)."""
+        out, running = [], 0
+        for c in self.counts:
+            running += c
+            out.append(running)
+        return out
+
+
+class MetricsRegistry:
+    """Thread‑safe collection of stage histograms and counters."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, window: int = 1024):
+        self.buckets = buckets
+        self.window = window
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record a duration for `stage`."""
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = Histogram(self.buckets, self.window)
+            hist.observe(seconds)
+
+    @contextlib.contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block and record it under `stage`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def inc(self, name: str, value: float = 1.0) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0.0) + value
+
+    def reset(self) -> None:
+        """Drop all recorded data."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return count, mean and p50/p95/p99 in milliseconds per stage."""
+        with self._lock:
+            out: Dict[str, Dict[str, float]] = {}
+            for stage, hist in sorted(self._histograms.items()):
+                p50, p95, p99 = hist.quantiles()
+                out[stage] = {
+                    "count": hist.count,
+                    "mean_ms": round(hist.sum / hist.count * 1000.0, 2) if hist.count else 0.0,
+                    "p50_ms": round(p50 * 1000.0, 2),
+                    "p95_ms": round(p95 * 1000.0, 2),
+                    "p99_ms": round(p99 * 1000.0, 2),
+                }
+            if self._counters:
+                out["counters"] = dict(sorted(self._counters.items()))
+            return out
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP qposrs_stage_seconds Duration of each loop stage.",
+            "# TYPE qposrs_stage_seconds histogram",
+        ]
+        quantile_lines = [
+            "# HELP qposrs_stage_quantile_seconds Recent‑window quantiles of each loop stage.",
+            "# TYPE qposrs_stage_quantile_seconds gauge",
+        ]
+        with self._lock:
+            for stage, hist in sorted(self._histograms.items()):
+                for bound, count in zip(hist.buckets, hist.cumulative()):
+                    lines.append(f'qposrs_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'qposrs_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+                lines.append(f'qposrs_stage_seconds_sum{{stage="{stage}"}} {hist.sum:.6f}')
+                lines.append(f'qposrs_stage_seconds_count{{stage="{stage}"}} {hist.count}')
+                for q, value in zip(QUANTILES, hist.quantiles()):
+                    quantile_lines.append(f'qposrs_stage_quantile_seconds{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            counter_lines = []
+            for name, value in sorted(self._counters.items()):
+                counter_lines.append(f"# TYPE qposrs_{name}_total counter")
+                counter_lines.append(f"qposrs_{name}_total {value:g}")
+        return "\n".join(lines + quantile_lines + counter_lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class MetricsServer:
+    """Serve a registry on `http://host:port/metrics` from a daemon thread."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = "127.0.0.1", port: int = 9108):
+        registry_ = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry_.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+
+class SummaryReporter:
+    """Log `registry.summary()` every `interval` seconds."""
+
+    def __init__(self, logger: logging.Logger, registry: MetricsRegistry = REGISTRY, interval: float = 30.0):
+        self.logger = logger
+        self.registry = registry
+        self.interval = float(interval)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="metrics-summary", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            log_stats(self.logger, "metrics", self.registry.summary())
+
+    def stop(self) -> None:
+        """Stop reporting and write a final summary."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        log_stats(self.logger, "metrics", self.registry.summary())
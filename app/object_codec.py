@@ -0,0 +1,212 @@
+"""Compact binary encoding of the plugin's object feed.
+
+In crowded areas the plugin publishes hundreds of objects per tick, and
+serialising them to JSON in Java and parsing them back in Python costs more
+than the data is worth.  This module defines an optional fixed‑layout binary
+format, mirrored by `BinaryObjectEncoder` in the RuneLite plugin.  All values
+are little‑endian:
+
+    header   magic "QPOB", version u8, flags u8, sequence u16,
+             tick i32, name count u16, object count u16        (16 bytes)
+    names    per name: byte length u16, UTF‑8 bytes
+    records  per object, packed (18 bytes):
+             index u16, name u16, id i32, type u8, level u8, bbox 4 × i16
+    removed  deltas only: count u16, then that many indices u16
+
+`name` indexes the interned name table, so a name repeated by many NPCs is
+sent once.  `bbox` is `[x1, y1, x2, y2]` in canvas pixels, as drawn by
+`overlay.draw_objects`.
+`decode_objects` maps the records straight onto `OBJECT_DTYPE` without
+copying; `to_dicts` converts them to the dictionaries the model clients send.
+
+With flags 0 a message is a self‑contained snapshot.  In delta mode the
+plugin sends a keyframe (`FLAG_KEYFRAME`, every object) every few ticks and
+in between a delta (`FLAG_DELTA`) carrying only the objects added or changed
+since the previous message plus the indices that disappeared, keyed by NPC
+index.  Both carry a wrapping sequence number so a lost message can be
+detected; `object_table.ObjectTable` applies them.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"QPOB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHiHH")
+NAME_LENGTH = struct.Struct("<H")
+REMOVED_COUNT = struct.Struct("<H")
+NO_TICK = -1
+
+FLAG_KEYFRAME = 0x01
+FLAG_DELTA = 0x02
+
+OBJECT_DTYPE = np.dtype([
+    ("index", "<u2"),
+    ("name", "<u2"),
+    ("id", "<i4"),
+    ("type", "u1"),
+    ("level", "u1"),
+    ("bbox", "<i2", (4,)),
+])
+
+# Type codes shared with the plugin.
+TYPES: Tuple[str, ...] = ("NPC", "OBJECT", "PLAYER", "ITEM")
+TYPE_CODES: Dict[str, int] = {name: code for code, name in enumerate(TYPES)}
+_TYPE_NAMES: Tuple[str, ...] = tuple(TYPES[k] if k < len(TYPES) else str(k) for k in range(256))
+
+
+def is_binary(raw: bytes) -> bool:
+    """Return True if `raw` is a binary object‑feed message."""
+    return raw[:4] == MAGIC
+
+
+@dataclass
+class FeedMessage:
+    """A decoded binary message.
+
+    `records` views the message buffer.  For deltas, `records` holds the
+    objects added or changed since the previous message and `removed` the
+    indices that disappeared.
+    """
+
+    flags: int
+    seq: int
+    tick: Optional[int]
+    names: List[str]
+    records: np.ndarray
+    removed: np.ndarray
+
+    @property
+    def is_delta(self) -> bool:
+        return bool(self.flags & FLAG_DELTA)
+
+    @property
+    def is_keyframe(self) -> bool:
+        return bool(self.flags & FLAG_KEYFRAME)
+
+
+def encode_message(
+    tick: Optional[int],
+    objects: Sequence[Dict[str, Any]],
+    seq: int = 0,
+    flags: int = 0,
+    removed: Sequence[int] = (),
+) -> bytes:
+    """Encode object dictionaries in the binary format.
+
+    The plugin does this in Java; the Python encoder exists for tests,
+    benchmarks and replaying recorded feeds.
+
+    Args:
+        tick: Game tick number, or None.
+        objects: Dictionaries with `id`, `name`, `type`, `bbox`, `level` and
+            optionally `index`.  For a delta, only added or changed objects.
+        seq: Message sequence number (wraps at 2**16).
+        flags: `FLAG_KEYFRAME`, `FLAG_DELTA` or 0 for a plain snapshot.
+        removed: Indices removed since the previous message (deltas only).
+
+    Returns:
+        The encoded message.
+    """
+    names: Dict[str, int] = {}
+    records = np.zeros(len(objects), dtype=OBJECT_DTYPE)
+    for i, obj in enumerate(objects):
+        name = obj.get("name") or ""
+        records[i]["index"] = obj.get("index", i)
+        records[i]["name"] = names.setdefault(name, len(names))
+        records[i]["id"] = obj.get("id", -1)
+        records[i]["type"] = TYPE_CODES.get(str(obj.get("type", "NPC")).upper(), 0)
+        records[i]["level"] = obj.get("level", 0)
+        records[i]["bbox"] = obj.get("bbox") or (0, 0, 0, 0)
+    tick = NO_TICK if tick is None else int(tick)
+    parts = [HEADER.pack(MAGIC, VERSION, flags, seq & 0xFFFF, tick, len(names), len(objects))]
+    for name in names:
+        data = name.encode("utf-8")
+        parts.append(NAME_LENGTH.pack(len(data)))
+        parts.append(data)
+    parts.append(records.tobytes())
+    if flags & FLAG_DELTA:
+        parts.append(REMOVED_COUNT.pack(len(removed)))
+        parts.append(np.asarray(removed, dtype="<u2").tobytes())
+    return b"".join(parts)
+
+
+def encode_objects(tick: Optional[int], objects: Sequence[Dict[str, Any]]) -> bytes:
+    """Encode a plain full snapshot (see `encode_message`)."""
+    return encode_message(tick, objects)
+
+
+def decode_message(raw: bytes) -> FeedMessage:
+    """Decode a binary message of any kind.
+
+    Args:
+        raw: Message produced by `encode_message` or the plugin.
+
+    Returns:
+        The decoded message; its arrays view `raw`.
+    """
+    if len(raw) < HEADER.size:
+        raise ValueError("Truncated object feed message")
+    magic, version, flags, seq, tick, name_count, object_count = HEADER.unpack_from(raw)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Unsupported object feed message")
+    offset = HEADER.size
+    names = []
+    try:
+        for _ in range(name_count):
+            (length,) = NAME_LENGTH.unpack_from(raw, offset)
+            offset += NAME_LENGTH.size
+            names.append(bytes(raw[offset:offset + length]).decode("utf-8"))
+            offset += length
+        records_end = offset + object_count * OBJECT_DTYPE.itemsize
+        removed_count = 0
+        if flags & FLAG_DELTA:
+            (removed_count,) = REMOVED_COUNT.unpack_from(raw, records_end)
+            expected = records_end + REMOVED_COUNT.size + 2 * removed_count
+        else:
+            expected = records_end
+    except struct.error:
+        raise ValueError("Truncated object feed message") from None
+    if len(raw) != expected:
+        raise ValueError("Object feed message has the wrong length")
+    records = np.frombuffer(raw, dtype=OBJECT_DTYPE, count=object_count, offset=offset)
+    removed = np.frombuffer(raw, dtype="<u2", count=removed_count, offset=records_end + REMOVED_COUNT.size) \
+        if removed_count else np.zeros(0, dtype="<u2")
+    return FeedMessage(flags=flags, seq=seq, tick=None if tick == NO_TICK else tick,
+                       names=names, records=records, removed=removed)
+
+
+def decode_objects(raw: bytes) -> Tuple[Optional[int], List[str], np.ndarray]:
+    """Decode a full (non‑delta) binary message.
+
+    Args:
+        raw: Message produced by `encode_objects` or the plugin.
+
+    Returns:
+        `(tick, names, records)` where `records` is a read‑only
+        `OBJECT_DTYPE` array viewing `raw`.
+    """
+    message = decode_message(raw)
+    if message.is_delta:
+        raise ValueError("Delta messages need an ObjectTable")
+    return message.tick, message.names, message.records
+
+
+def to_dicts(names: Sequence[str], records: np.ndarray) -> List[Dict[str, Any]]:
+    """Convert decoded records to the dictionaries sent to the model."""
+    return [
+        {"index": index, "id": obj_id, "name": names[name], "type": _TYPE_NAMES[kind], "bbox": bbox, "level": level}
+        for index, name, obj_id, kind, level, bbox in zip(
+            records["index"].tolist(),
+            records["name"].tolist(),
+            records["id"].tolist(),
+            records["type"].tolist(),
+            records["level"].tolist(),
+            records["bbox"].tolist(),
+        )
+    ]
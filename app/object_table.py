@@ -0,0 +1,111 @@
+"""Incrementally updated table of the objects the plugin reports.
+
+In delta mode the plugin sends a full keyframe every few ticks and otherwise
+only what changed, keyed by NPC index (see `object_codec`).  `ObjectTable`
+keeps the current state in a preallocated `OBJECT_DTYPE` array indexed by NPC
+index plus a presence mask, so applying a delta is a couple of vectorised
+assignments regardless of how many objects are on screen.
+
+Every message carries a sequence number.  If a delta arrives out of sequence
+a message was lost, the table can no longer be trusted, and deltas are
+ignored until the next keyframe resynchronises it.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .object_codec import OBJECT_DTYPE, FeedMessage
+
+# NPC indices are 16‑bit.
+CAPACITY = 1 << 16
+
+
+class ObjectTable:
+    """Objects currently visible, rebuilt from keyframes and deltas."""
+
+    def __init__(self) -> None:
+        self._records = np.zeros(CAPACITY, dtype=OBJECT_DTYPE)
+        self._present = np.zeros(CAPACITY, dtype=bool)
+        self._name_ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.seq: Optional[int] = None
+        self.tick: Optional[int] = None
+        self.synced = False
+        self.keyframes = 0
+        self.deltas = 0
+        self.gaps = 0
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._present))
+
+    def apply(self, message: FeedMessage) -> bool:
+        """Apply a keyframe or delta.
+
+        Args:
+            message: A decoded message with `FLAG_KEYFRAME` or `FLAG_DELTA`.
+
+        Returns:
+            True if the table is now up to date with the message, False if
+            the delta was skipped because the table is waiting for a keyframe.
+        """
+        if message.is_keyframe:
+            self._present[:] = False
+            # A fresh list, so snapshots holding the old one stay valid.
+            self._name_ids = {}
+            self.names = []
+            self._upsert(message)
+            self.synced = True
+            self.keyframes += 1
+        elif message.is_delta:
+            if not self.synced:
+                self.skipped += 1
+                return False
+            if message.seq != (self.seq + 1) & 0xFFFF:
+                self.synced = False
+                self.gaps += 1
+                self.skipped += 1
+                return False
+            self._present[message.removed] = False
+            self._upsert(message)
+            self.deltas += 1
+        else:
+            raise ValueError("Not a keyframe or delta message")
+        self.seq = message.seq
+        self.tick = message.tick
+        return True
+
+    def _upsert(self, message: FeedMessage) -> None:
+        records = message.records
+        if not len(records):
+            return
+        remap = np.fromiter((self._intern(name) for name in message.names), dtype=np.uint16, count=len(message.names))
+        index = records["index"]
+        self._records[index] = records
+        self._records["name"][index] = remap[records["name"]]
+        self._present[index] = True
+
+    def _intern(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def records(self) -> np.ndarray:
+        """Return a copy of the present records, ordered by index."""
+        return self._records[self._present]
+
+    def summary(self) -> Dict[str, Any]:
+        """Return keyframe, delta and resync counts for logging."""
+        return {
+            "objects": len(self),
+            "keyframes": self.keyframes,
+            "deltas": self.deltas,
+            "gaps": self.gaps,
+            "skipped": self.skipped,
+            "synced": self.synced,
+        }
@@ -0,0 +1,448 @@
+"""Staged capture → inference → actuation pipeline.
+
+The serial loop in `run_live` spends each tick on the capture, the model
+round‑trip and the mouse path one after another.  This module splits the loop
+into three threads joined by bounded queues:
+
+* a **capture producer** that grabs frames at the configured frame rate,
+* an **inference worker** that turns the freshest frame into an action, and
+* an **actuator consumer** that waits for the next tick and clicks the newest
+  action available by then.
+
+The queues drop their oldest entry when full, so a slow stage always works on
+the newest data instead of a backlog.  While the actuator moves the mouse for
+frame N, the inference worker is already busy with frame N+1.  Inference
+time, scheduler wait, the time to hand an action to the actuator and the age
+of each frame at actuation are recorded in the metrics registry and logged
+periodically; the actuator itself records how long each completed mouse move
+took (`mouse_move`).
+
+`BatchPipeline` runs several agents (one per game window) from one process:
+each agent keeps its own capture and actuator threads, while a single
+inference thread groups the frames that are ready in the same tick into one
+batched model request and fans the actions back out.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .metrics import REGISTRY, MetricsRegistry
+from .utils.logging_utils import log_stats
+
+
+class DropOldestQueue:
+    """A bounded FIFO queue that discards the oldest item when full."""
+
+    def __init__(self, maxsize: int = 1):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, item: Any) -> None:
+        """Enqueue an item, evicting the oldest entry if the queue is full."""
+        with self._lock:
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Dequeue an item, raising `queue.Empty` after `timeout` seconds."""
+        return self._queue.get(timeout=timeout)
+
+    def newest(self, item: Any) -> Any:
+        """Return the newest of `item` and anything queued since.
+
+        Items superseded this way are counted as dropped.
+        """
+        with self._lock:
+            while True:
+                try:
+                    newer = self._queue.get_nowait()
+                except queue.Empty:
+                    return item
+                self.dropped += 1
+                item = newer
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+@dataclass
+class FrameItem:
+    """A captured frame travelling through the pipeline."""
+
+    seq: int
+    frame: np.ndarray
+    captured_at: float
+    agent: int = 0
+    action: Any = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class Pipeline:
+    """Run capture, inference and actuation as overlapping stages.
+
+    Each stage is a plain callable so the pipeline stays independent of the
+    concrete capturer, client and mouse backend:
+
+    * `capture()` returns the next `(timestamp, frame)` pair, or None if no
+      frame is available yet (timestamps come from `time.monotonic()`),
+    * `infer(frame)` returns an action (e.g. an `actions.Action`), or None
+      for a no‑op,
+    * `actuate(action)` performs the action.
+
+    `pace` is called by the capture thread before every grab (typically
+    `ScreenCapturer.wait`) and `wait_for_tick` by the actuator before every
+    action (typically `TickScheduler.wait_for_next_tick`).  Stage timings go
+    to `metrics` (the process‑wide registry by default).  `extra_stats`
+    may return additional entries (e.g. encoder statistics) for reports and
+    `on_stop` releases resources once `run_until` returns.
+    """
+
+    def __init__(
+        self,
+        capture: Callable[[], Optional[Tuple[float, np.ndarray]]],
+        infer: Callable[[np.ndarray], Optional[Any]],
+        actuate: Callable[[Any], None],
+        pace: Optional[Callable[[], None]] = None,
+        wait_for_tick: Optional[Callable[[], None]] = None,
+        queue_size: int = 1,
+        logger: Optional[logging.Logger] = None,
+        report_every: int = 20,
+        extra_stats: Optional[Callable[[], Dict[str, Any]]] = None,
+        on_stop: Optional[Callable[[], None]] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.capture = capture
+        self.infer = infer
+        self.actuate = actuate
+        self.pace = pace
+        self.wait_for_tick = wait_for_tick
+        self.logger = logger or logging.getLogger("qposrs")
+        self.report_every = max(int(report_every), 1)
+        self.extra_stats = extra_stats
+        self.on_stop = on_stop
+        self.frames = DropOldestQueue(queue_size)
+        self.actions = DropOldestQueue(queue_size)
+        self.metrics = metrics if metrics is not None else REGISTRY
+        self._stop = threading.Event()
+        self._threads: list = []
+        self._seq = 0
+        self.error: Optional[BaseException] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Start the three stage threads."""
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._guard, args=(self._capture_loop,), name="pipeline-capture", daemon=True),
+            threading.Thread(target=self._guard, args=(self._infer_loop,), name="pipeline-infer", daemon=True),
+            threading.Thread(target=self._guard, args=(self._actuate_loop,), name="pipeline-actuate", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Signal all stages to stop and wait for them to exit."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return not self._stop.is_set()
+
+    def run_until(self, should_continue: Callable[[], bool], poll: float = 0.1) -> None:
+        """Start the pipeline and block until `should_continue` returns false.
+
+        The pipeline also stops if any stage raises; the exception is then
+        re‑raised in the calling thread.
+        """
+        self.start()
+        try:
+            while should_continue() and self.running:
+                time.sleep(poll)
+        finally:
+            self.stop()
+            self.report()
+            if self.on_stop is not None:
+                self.on_stop()
+        if self.error is not None:
+            raise self.error
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+    def _guard(self, loop: Callable[[], None]) -> None:
+        try:
+            loop()
+        except BaseException as exc:  # propagate to run_until
+            self.error = exc
+            self._stop.set()
+
+    def _capture_loop(self) -> None:
+        while not self._stop.is_set():
+            if self.pace is not None:
+                self.pace()
+            captured = self.capture()
+            if captured is None:
+                continue
+            captured_at, frame = captured
+            self._seq += 1
+            self.frames.put(FrameItem(seq=self._seq, frame=frame, captured_at=captured_at))
+
+    def _infer_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                item = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            start = time.perf_counter()
+            item.action = self.infer(item.frame)
+            elapsed = time.perf_counter() - start
+            self.metrics.observe("infer", elapsed)
+            item.timings["infer"] = elapsed
+            if item.action is not None:
+                self.actions.put(item)
+
+    def _actuate_loop(self) -> None:
+        acted = 0
+        while not self._stop.is_set():
+            try:
+                item = self.actions.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if self.wait_for_tick is not None:
+                with self.metrics.span("scheduler_wait"):
+                    self.wait_for_tick()
+                # Actions inferred during the wait supersede this one.
+                item = self.actions.newest(item)
+            age = time.monotonic() - item.captured_at
+            self.metrics.observe("frame_age", age)
+            start = time.perf_counter()
+            self.actuate(item.action)
+            elapsed = time.perf_counter() - start
+            # `actuate` only hands the action over; `mouse_move` times the move.
+            self.metrics.observe("actuate", elapsed)
+            item.timings["actuate"] = elapsed
+            item.timings["frame_age"] = age
+            acted += 1
+            if acted % self.report_every == 0:
+                self.report()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def summary(self) -> Dict[str, Any]:
+        """Return per‑stage latency percentiles and queue drop counts."""
+        out: Dict[str, Any] = self.metrics.summary()
+        out["dropped_frames"] = self.frames.dropped
+        out["dropped_actions"] = self.actions.dropped
+        if self.extra_stats is not None:
+            out.update(self.extra_stats())
+        return out
+
+    def report(self) -> None:
+        """Log the current pipeline summary."""
+        log_stats(self.logger, "pipeline", self.summary())
+
+
+@dataclass
+class Agent:
+    """Per‑window stage callables for `BatchPipeline`.
+
+    The callables have the same meaning as the arguments of `Pipeline`.
+    """
+
+    name: str
+    capture: Callable[[], Optional[Tuple[float, np.ndarray]]]
+    actuate: Callable[[Any], None]
+    pace: Optional[Callable[[], None]] = None
+    wait_for_tick: Optional[Callable[[], None]] = None
+
+
+class BatchPipeline:
+    """Serve several agents with one batched inference stage.
+
+    Every agent owns a capture thread and an actuator thread.  The inference
+    thread waits for the first new frame, then gives the other agents up to
+    `batch_window` seconds to produce theirs, and passes all ready frames to
+    `infer_batch(items)` as `(agent_index, frame)` pairs.  It must return one
+    action (or None for a no‑op) per item, in order.
+    """
+
+    def __init__(
+        self,
+        agents: Sequence[Agent],
+        infer_batch: Callable[[List[Tuple[int, np.ndarray]]], List[Optional[Any]]],
+        batch_window: float = 0.05,
+        logger: Optional[logging.Logger] = None,
+        report_every: int = 20,
+        extra_stats: Optional[Callable[[], Dict[str, Any]]] = None,
+        on_stop: Optional[Callable[[], None]] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.agents = list(agents)
+        self.infer_batch = infer_batch
+        self.batch_window = float(batch_window)
+        self.logger = logger or logging.getLogger("qposrs")
+        self.report_every = max(int(report_every), 1)
+        self.extra_stats = extra_stats
+        self.on_stop = on_stop
+        self.frames = [DropOldestQueue(1) for _ in self.agents]
+        self.actions = [DropOldestQueue(1) for _ in self.agents]
+        self.metrics = metrics if metrics is not None else REGISTRY
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list = []
+        self._seq = 0
+        self._acted = 0
+        self._stats_lock = threading.Lock()
+        self.error: Optional[BaseException] = None
+
+    def start(self) -> None:
+        """Start the capture, inference and actuator threads."""
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._guard, args=(self._infer_loop,), name="batch-infer", daemon=True)]
+        for index, agent in enumerate(self.agents):
+            self._threads.append(threading.Thread(target=self._guard, args=(self._capture_loop, index),
+                                                  name=f"{agent.name}-capture", daemon=True))
+            self._threads.append(threading.Thread(target=self._guard, args=(self._actuate_loop, index),
+                                                  name=f"{agent.name}-actuate", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Signal all threads to stop and wait for them to exit."""
+        self._stop.set()
+        self._ready.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return not self._stop.is_set()
+
+    def run_until(self, should_continue: Callable[[], bool], poll: float = 0.1) -> None:
+        """Start the pipeline and block until `should_continue` returns false."""
+        self.start()
+        try:
+            while should_continue() and self.running:
+                time.sleep(poll)
+        finally:
+            self.stop()
+            self.report()
+            if self.on_stop is not None:
+                self.on_stop()
+        if self.error is not None:
+            raise self.error
+
+    def _guard(self, loop: Callable[..., None], *args: Any) -> None:
+        try:
+            loop(*args)
+        except BaseException as exc:  # propagate to run_until
+            self.error = exc
+            self._stop.set()
+            self._ready.set()
+
+    def _capture_loop(self, index: int) -> None:
+        agent = self.agents[index]
+        while not self._stop.is_set():
+            if agent.pace is not None:
+                agent.pace()
+            captured = agent.capture()
+            if captured is None:
+                continue
+            captured_at, frame = captured
+            with self._stats_lock:
+                self._seq += 1
+                seq = self._seq
+            self.frames[index].put(FrameItem(seq=seq, frame=frame, captured_at=captured_at, agent=index))
+            self._ready.set()
+
+    def _collect(self) -> List[FrameItem]:
+        items: List[FrameItem] = []
+        for queue_ in self.frames:
+            try:
+                items.append(queue_.get(timeout=0))
+            except queue.Empty:
+                pass
+        return items
+
+    def _infer_loop(self) -> None:
+        while not self._stop.is_set():
+            if not self._ready.wait(timeout=0.1):
+                continue
+            self._ready.clear()
+            # Give the other agents a moment to deliver frames for this tick.
+            deadline = time.monotonic() + self.batch_window
+            while time.monotonic() < deadline and not all(q.qsize() for q in self.frames):
+                time.sleep(0.002)
+            items = self._collect()
+            if not items:
+                continue
+            start = time.perf_counter()
+            actions = self.infer_batch([(item.agent, item.frame) for item in items])
+            elapsed = time.perf_counter() - start
+            self.metrics.observe("infer", elapsed)
+            self.metrics.inc("batches")
+            self.metrics.inc("batched_frames", len(items))
+            for item, action in zip(items, actions):
+                item.action = action
+                item.timings["infer"] = elapsed
+                if action is not None:
+                    self.actions[item.agent].put(item)
+
+    def _actuate_loop(self, index: int) -> None:
+        agent = self.agents[index]
+        while not self._stop.is_set():
+            try:
+                item = self.actions[index].get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if agent.wait_for_tick is not None:
+                with self.metrics.span("scheduler_wait"):
+                    agent.wait_for_tick()
+                item = self.actions[index].newest(item)
+            self.metrics.observe("frame_age", time.monotonic() - item.captured_at)
+            with self.metrics.span("actuate"):
+                agent.actuate(item.action)
+            with self._stats_lock:
+                self._acted += 1
+                due = self._acted % self.report_every == 0
+            if due:
+                self.report()
+
+    def summary(self) -> Dict[str, Any]:
+        """Return latency percentiles, batch counters and drop counts."""
+        out: Dict[str, Any] = self.metrics.summary()
+        out["dropped_frames"] = sum(q.dropped for q in self.frames)
+        out["dropped_actions"] = sum(q.dropped for q in self.actions)
+        if self.extra_stats is not None:
+            out.update(self.extra_stats())
+        return out
+
+    def report(self) -> None:
+        """Log the current pipeline summary."""
+        log_stats(self.logger, "batch_pipeline", self.summary())
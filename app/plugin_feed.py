@@ -0,0 +1,288 @@
+"""Subscriber for the RuneLite plugin's object feed.
+
+The plugin publishes `{"tick": n, "objects": [...]}` on every `GameTick` over
+a ZeroMQ PUB socket (older builds send a bare JSON array), or the compact
+binary format of `object_codec` when its binary option is enabled; the
+format is detected per message.  `ObjectFeed` receives and decodes these
+messages on a background thread so the capture and inference loops never
+touch the socket.  The socket is opened with `ZMQ_CONFLATE`, so only the
+newest message is ever queued: if the loop falls behind, stale ticks are
+discarded instead of piling up.
+
+When the plugin sends keyframes and deltas, they are applied to an
+`ObjectTable` and each snapshot is the table's state after the message.
+Deltas must not be conflated away, so use `conflate=False` with a delta feed.
+If a keyframe or delta arrives on a conflating socket, the feed logs a
+warning and reconnects without `ZMQ_CONFLATE`.  A lost delta is detected by
+sequence number and the table resyncs on the next keyframe.
+
+Binary records are converted to the prompt's dictionaries once per message,
+on the receiver thread, so lookups from the capture and inference loops only
+return a ready list.  Decoded snapshots are kept in a short history stamped with their monotonic
+arrival time.  `at(timestamp)` returns the snapshot that was current when a
+frame was captured, which keeps the object list aligned with the image even
+when inference runs a frame or two behind capture.
+
+Tick listeners (`add_tick_listener`) are called with `(tick, received)` for
+every decoded message; the tick scheduler uses them to phase‑lock to the
+game's `GameTick`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import zmq
+
+from .object_codec import decode_message, is_binary, to_dicts
+from .object_table import ObjectTable
+
+logger = logging.getLogger("qposrs")
+
+
+@dataclass
+class ObjectSnapshot:
+    """Objects published for one game tick.
+
+    Binary messages keep their `OBJECT_DTYPE` `records` and name table;
+    the feed fills `objects` from them before publishing the snapshot.
+    """
+
+    tick: Optional[int]
+    objects: Optional[List[Dict[str, Any]]]
+    received: float
+    records: Optional[np.ndarray] = None
+    names: Sequence[str] = ()
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        """Return the objects as dictionaries for the model prompt."""
+        if self.objects is None:
+            self.objects = to_dicts(self.names, self.records) if self.records is not None else []
+        return self.objects
+
+
+class ObjectFeed:
+    """Background, latest‑value subscriber to the plugin's object feed.
+
+    Args:
+        address: ZeroMQ endpoint the plugin publishes on.
+        max_age: Snapshots older than this many seconds relative to a frame
+            are treated as stale (two game ticks by default).
+        history: Number of recent snapshots kept for alignment.
+        poll_ms: Socket poll interval; bounds how long `stop` takes.
+        conflate: Keep only the newest queued message.  Disable for delta
+            feeds; it is switched off when the first keyframe or delta
+            arrives.
+    """
+
+    def __init__(
+        self,
+        address: str = "tcp://127.0.0.1:5555",
+        max_age: float = 1.2,
+        history: int = 8,
+        poll_ms: int = 100,
+        conflate: bool = True,
+    ):
+        self.address = address
+        self.conflate = bool(conflate)
+        self.table = ObjectTable()
+        self.max_age = float(max_age)
+        self.poll_ms = int(poll_ms)
+        self._history: deque = deque(maxlen=max(int(history), 1))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reconnect = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.received = 0
+        self.parse_errors = 0
+        self.missed_ticks = 0
+        self.lookups = 0
+        self.misses = 0
+        self._age_total = 0.0
+        self._tick_listeners: List[Callable[[Optional[int], float], None]] = []
+
+    def add_tick_listener(self, callback: Callable[[Optional[int], float], None]) -> None:
+        """Call `callback(tick, received)` for every decoded message.
+
+        Callbacks run on the receiver thread and must be quick.
+        """
+        self._tick_listeners.append(callback)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Connect and start receiving on a daemon thread."""
+        self._stop.clear()
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="object-feed", daemon=True)
+        self._thread.start()
+        ready.wait(timeout=2.0)
+
+    def stop(self) -> None:
+        """Stop the receiver thread and close the socket."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _connect(self, context: zmq.Context) -> zmq.Socket:
+        socket = context.socket(zmq.SUB)
+        # CONFLATE must be set before connecting to take effect.
+        if self.conflate:
+            socket.setsockopt(zmq.CONFLATE, 1)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.setsockopt(zmq.SUBSCRIBE, b"")
+        socket.connect(self.address)
+        return socket
+
+    def _run(self, ready: threading.Event) -> None:
+        context = zmq.Context.instance()
+        socket = self._connect(context)
+        ready.set()
+        try:
+            while not self._stop.is_set():
+                if self._reconnect.is_set():
+                    self._reconnect.clear()
+                    socket.close()
+                    socket = self._connect(context)
+                if not socket.poll(self.poll_ms, zmq.POLLIN):
+                    continue
+                try:
+                    raw = socket.recv(zmq.NOBLOCK)
+                except zmq.Again:
+                    continue
+                self.ingest(raw)
+        finally:
+            socket.close()
+
+    # ------------------------------------------------------------------
+    # Decoding
+    # ------------------------------------------------------------------
+    @staticmethod
+    def decode(raw: bytes) -> tuple:
+        """Decode one JSON message into `(tick, objects)`.
+
+        Accepts the `{"tick": n, "objects": [...]}` envelope as well as a bare
+        object array, for which the tick is None.
+        """
+        data = json.loads(raw)
+        if isinstance(data, list):
+            return None, data
+        if isinstance(data, dict) and isinstance(data.get("objects"), list):
+            tick = data.get("tick")
+            return (int(tick) if tick is not None else None), data["objects"]
+        raise ValueError("Unrecognised object feed message")
+
+    def ingest(self, raw: bytes, received: Optional[float] = None) -> Optional[ObjectSnapshot]:
+        """Decode a message and make it the newest snapshot.
+
+        Args:
+            raw: Message payload as published by the plugin.
+            received: Arrival time on the `time.monotonic()` clock
+                (defaults to now).
+
+        Returns:
+            The new snapshot, or None if the message could not be decoded.
+        """
+        received = time.monotonic() if received is None else received
+        try:
+            if is_binary(raw):
+                message = decode_message(raw)
+                tick = message.tick
+                if message.is_keyframe or message.is_delta:
+                    if self.conflate:
+                        # Conflation would silently discard deltas.
+                        logger.warning("Object feed %s sends keyframes and deltas but was opened with "
+                                       "plugin_conflate: true; reconnecting without conflation. Set "
+                                       "plugin_conflate: false for delta feeds.", self.address)
+                        self.conflate = False
+                        self._reconnect.set()
+                    if not self.table.apply(message):
+                        self._notify(tick, received)
+                        return None
+                    snapshot = ObjectSnapshot(tick=tick, objects=None, received=received,
+                                              records=self.table.records(), names=self.table.names)
+                else:
+                    snapshot = ObjectSnapshot(tick=tick, objects=None, received=received,
+                                              records=message.records, names=message.names)
+            else:
+                tick, objects = self.decode(raw)
+                snapshot = ObjectSnapshot(tick=tick, objects=objects, received=received)
+        except ValueError:
+            self.parse_errors += 1
+            logger.debug("Dropped undecodable object feed message")
+            return None
+        # Convert here, once per message, rather than on every lookup.
+        snapshot.as_dicts()
+        with self._lock:
+            if self._history:
+                last = self._history[-1].tick
+                if tick is not None and last is not None and tick > last + 1:
+                    self.missed_ticks += tick - last - 1
+            self._history.append(snapshot)
+            self.received += 1
+        self._notify(tick, received)
+        return snapshot
+
+    def _notify(self, tick: Optional[int], received: float) -> None:
+        for callback in self._tick_listeners:
+            callback(tick, received)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def latest(self) -> Optional[ObjectSnapshot]:
+        """Return the newest snapshot, however old."""
+        with self._lock:
+            return self._history[-1] if self._history else None
+
+    def at(self, timestamp: float) -> Optional[ObjectSnapshot]:
+        """Return the snapshot that was current at `timestamp`.
+
+        Args:
+            timestamp: Frame capture time on the `time.monotonic()` clock.
+
+        Returns:
+            The newest snapshot received no later than `timestamp`, or None
+            if there is none or it is older than `max_age`.
+        """
+        with self._lock:
+            self.lookups += 1
+            for snapshot in reversed(self._history):
+                if snapshot.received <= timestamp:
+                    age = timestamp - snapshot.received
+                    if age <= self.max_age:
+                        self._age_total += age
+                        return snapshot
+                    break
+            self.misses += 1
+            return None
+
+    def objects_at(self, timestamp: float) -> Optional[List[Dict[str, Any]]]:
+        """Return the object list aligned with a frame, or None."""
+        snapshot = self.at(timestamp)
+        return snapshot.as_dicts() if snapshot is not None else None
+
+    def summary(self) -> Dict[str, Any]:
+        """Return receive and alignment statistics for logging."""
+        with self._lock:
+            hits = self.lookups - self.misses
+            latest = self._history[-1] if self._history else None
+            return {
+                "received": self.received,
+                "parse_errors": self.parse_errors,
+                "missed_ticks": self.missed_ticks,
+                "lookups": self.lookups,
+                "misses": self.misses,
+                "mean_age_ms": round(self._age_total / hits * 1000.0, 2) if hits else 0.0,
+                "last_tick": latest.tick if latest else None,
+                "table": self.table.summary(),
+            }
@@ -0,0 +1,294 @@
+"""Background recorder for frames, objects and actions.
+
+`RunRecorder` stores what the agent saw and did in a run directory without
+slowing down the tick.  `record` copies the frame and puts it on a bounded
+queue; if the writer thread falls behind (slow disk) the frame is dropped
+and counted instead of blocking the caller.
+
+The store is append‑only and chunked:
+
+    meta.json              prompt and store settings
+    frames_00000.npy       `(chunk_size, h, w, 3)` uint8 array, memory‑mappable
+                           with `np.load(..., mmap_mode="r")`
+    deltas_00000.bin       zlib‑compressed delta frames (delta mode only)
+    regions_00000.bin      zlib‑compressed extra region crops (region runs only)
+    index.jsonl            one line per frame: timestamp, storage location,
+                           objects and action
+
+With `compression="delta"` only every `keyframe_interval`‑th frame is stored
+in full; the frames in between are stored as the zlib‑compressed XOR against
+their keyframe.  Consecutive OSRS frames differ in few pixels, so the deltas
+are small, and any frame can still be restored from one keyframe and one
+delta.  For region observations the first (viewport) image goes through the
+frame store and the other crops (inventory, minimap) are compressed into
+`regions_NNNNN.bin`; `iter_recording(path, regions=True)` returns them all.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import REGISTRY, MetricsRegistry
+from .regions import Observation, as_images
+
+logger = logging.getLogger("qposrs")
+
+COMPRESSIONS = ("none", "delta")
+
+
+def _chunk_name(kind: str, chunk: int) -> str:
+    return f"{kind}_{chunk:05d}.{'npy' if kind == 'frames' else 'bin'}"
+
+
+def _read_blob(path: str, offset: int, length: int) -> bytes:
+    with open(path, "rb") as fh:
+        fh.seek(offset)
+        return zlib.decompress(fh.read(length))
+
+
+class RunRecorder:
+    """Write frames, objects and actions to a chunked store on a thread.
+
+    Args:
+        path: Directory of the store (created if missing).
+        chunk_size: Full frames per `.npy` chunk.
+        queue_size: Frames buffered for the writer before dropping.
+        compression: `none` or `delta` (keyframes plus compressed deltas).
+        keyframe_interval: Frames per keyframe in delta mode.
+        prompt: System prompt saved in `meta.json`.
+        channel_order: Channel order of the recorded frames, for readers.
+        metrics: Registry for write timings (the process‑wide one by default).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        chunk_size: int = 256,
+        queue_size: int = 64,
+        compression: str = "none",
+        keyframe_interval: int = 30,
+        prompt: Optional[str] = None,
+        channel_order: str = "rgb",
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.path = path
+        self.chunk_size = max(int(chunk_size), 1)
+        self.compression = compression
+        self.keyframe_interval = max(int(keyframe_interval), 1)
+        self.prompt = prompt
+        self.channel_order = channel_order
+        self.metrics = metrics if metrics is not None else REGISTRY
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(int(queue_size), 1))
+        self._thread: Optional[threading.Thread] = None
+        self.recorded = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.chunks = 0
+        # Writer state, only touched by the writer thread.
+        self._seq = 0
+        self._frames: Optional[np.ndarray] = None
+        self._slot = 0
+        self._chunk = -1
+        self._deltas = None
+        self._regions = None
+        self._key: Optional[Tuple[int, int, np.ndarray]] = None
+        self._since_key = 0
+        self._index = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Create the store and start the writer thread."""
+        os.makedirs(self.path, exist_ok=True)
+        meta = {
+            "prompt": self.prompt,
+            "channel_order": self.channel_order,
+            "chunk_size": self.chunk_size,
+            "compression": self.compression,
+            "keyframe_interval": self.keyframe_interval,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, indent=2)
+        self._index = open(os.path.join(self.path, "index.jsonl"), "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write out everything queued so far and close the store."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def record(
+        self,
+        timestamp: float,
+        frame: Observation,
+        objects: Optional[List[Dict[str, Any]]] = None,
+        action: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Queue one observation and the action taken on it.
+
+        Never blocks: the frame (every region of it) is copied (capture
+        buffers are reused) and dropped if the writer is behind.
+
+        Returns:
+            False if the frame was dropped.
+        """
+        images = [np.array(image, dtype=np.uint8, copy=True) for image in as_images(frame)]
+        try:
+            self._queue.put_nowait((timestamp, images, objects, action))
+        except queue.Full:
+            self.dropped += 1
+            self.metrics.inc("recorder_dropped")
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Writer side
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                start = time.perf_counter()
+                try:
+                    self._write(*item)
+                except OSError as exc:
+                    self.dropped += 1
+                    logger.warning("Recorder failed to write a frame: %s", exc)
+                self.metrics.observe("record", time.perf_counter() - start)
+        finally:
+            self._close_chunk()
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+
+    def _new_chunk(self, shape: Tuple[int, ...]) -> None:
+        self._close_chunk()
+        self._chunk += 1
+        self._slot = 0
+        self._frames = np.lib.format.open_memmap(
+            os.path.join(self.path, _chunk_name("frames", self._chunk)),
+            mode="w+", dtype=np.uint8, shape=(self.chunk_size,) + shape)
+        if self.compression == "delta":
+            self._deltas = open(os.path.join(self.path, _chunk_name("deltas", self._chunk)), "wb")
+        self.chunks += 1
+
+    def _close_chunk(self) -> None:
+        if self._frames is not None:
+            self._frames.flush()
+            self._frames = None
+        if self._deltas is not None:
+            self._deltas.close()
+            self._deltas = None
+        if self._regions is not None:
+            self._regions.close()
+            self._regions = None
+
+    def _write(self, timestamp: float, images: List[np.ndarray], objects, action) -> None:
+        entry: Dict[str, Any] = {"seq": self._seq, "ts": timestamp}
+        image = images[0]
+        key_due = (self.compression == "none" or self._key is None or self._key[2].shape != image.shape
+                   or self._since_key >= self.keyframe_interval)
+        if key_due:
+            if self._frames is None or self._slot >= self.chunk_size or self._frames.shape[1:] != image.shape:
+                self._new_chunk(image.shape)
+            self._frames[self._slot] = image
+            entry.update(chunk=self._chunk, slot=self._slot)
+            self._key = (self._chunk, self._slot, image)
+            self._slot += 1
+            self._since_key = 1
+            self.bytes_written += image.nbytes
+        else:
+            # Keyframes open chunks, so a delta always joins the current one.
+            key_chunk, key_slot, key_image = self._key
+            data = zlib.compress(np.bitwise_xor(image, key_image).tobytes(), 1)
+            offset = self._deltas.tell()
+            self._deltas.write(data)
+            entry.update(chunk=key_chunk, slot=key_slot, delta=[offset, len(data)])
+            self._since_key += 1
+            self.bytes_written += len(data)
+        if len(images) > 1:
+            entry["regions"] = self._write_regions(images[1:])
+        entry["objects"] = objects
+        entry["action"] = action
+        self._index.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+        self._index.flush()
+        self._seq += 1
+        self.recorded += 1
+
+    def _write_regions(self, images: List[np.ndarray]) -> List[List[Any]]:
+        # Stored next to the frame's chunk, which is always the current one.
+        if self._regions is None:
+            self._regions = open(os.path.join(self.path, _chunk_name("regions", self._chunk)), "ab")
+        located = []
+        for image in images:
+            data = zlib.compress(np.ascontiguousarray(image).tobytes(), 1)
+            located.append([self._regions.tell(), len(data), list(image.shape)])
+            self._regions.write(data)
+            self.bytes_written += len(data)
+        return located
+
+    def summary(self) -> Dict[str, Any]:
+        """Return recorded and dropped frame counts and bytes written."""
+        return {
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "chunks": self.chunks,
+            "mbytes": round(self.bytes_written / 1e6, 2),
+        }
+
+
+def read_index(path: str) -> List[Dict[str, Any]]:
+    """Return the index entries of a recording, oldest first."""
+    with open(os.path.join(path, "index.jsonl"), "r", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def iter_recording(path: str, regions: bool = False) -> Iterator[Tuple[Dict[str, Any], Observation]]:
+    """Yield `(entry, frame)` for every recorded frame, restoring deltas.
+
+    Keyframe chunks are memory‑mapped, so only the frames read are loaded.
+
+    Args:
+        path: Directory of the store.
+        regions: Yield region observations as the full list of crops instead
+            of only the viewport image.
+    """
+    chunks: Dict[int, np.ndarray] = {}
+    for entry in read_index(path):
+        chunk = entry["chunk"]
+        if chunk not in chunks:
+            chunks[chunk] = np.load(os.path.join(path, _chunk_name("frames", chunk)), mmap_mode="r")
+        frame = chunks[chunk][entry["slot"]]
+        if "delta" in entry:
+            data = _read_blob(os.path.join(path, _chunk_name("deltas", chunk)), *entry["delta"])
+            frame = np.bitwise_xor(frame, np.frombuffer(data, dtype=np.uint8).reshape(frame.shape))
+        if not regions or "regions" not in entry:
+            yield entry, frame
+            continue
+        crops = [frame]
+        for offset, length, shape in entry["regions"]:
+            data = _read_blob(os.path.join(path, _chunk_name("regions", chunk)), offset, length)
+            crops.append(np.frombuffer(data, dtype=np.uint8).reshape(shape))
+        yield entry, crops
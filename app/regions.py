@@ -0,0 +1,108 @@
+"""Multi‑region observations cut from a single window grab.
+
+Squashing a 765×503 window into 224×224 distorts its aspect ratio and shrinks
+the inventory to a few unreadable pixels.  Instead the window can be cut into
+named regions – typically the game viewport, the inventory and the minimap –
+each resized to its own resolution.  All regions are sliced out of the one mss
+grab, so they show the same instant, and `RegionPreprocessor` resizes them
+straight from the raw BGRA buffer into preallocated outputs.
+
+The model receives the crops as separate images, in configuration order, and
+answers with a click in the pixels of one of them (`"image": i`, the first
+region by default).  `actions.ActionParser.to_window` maps that click back
+into window coordinates before snapping and actuation.
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence, Union
+
+import cv2
+import numpy as np
+
+from .config import RegionConfig
+
+Observation = Union[np.ndarray, Sequence[np.ndarray]]
+
+
+def as_images(observation: Observation) -> List[np.ndarray]:
+    """Return the images of an observation; a bare frame is one image."""
+    if isinstance(observation, np.ndarray):
+        return [observation]
+    return list(observation)
+
+
+class RegionPreprocessor:
+    """Slice regions out of a BGRA buffer and resize them without allocating.
+
+    Each region is a view into the raw buffer; it is resized into a BGRA
+    scratch image of its output size and channel‑converted into one of
+    `pool_size` rotating output sets.  Returned images are reused after
+    `pool_size` further calls, so consumers that keep them longer must copy.
+    """
+
+    def __init__(self, regions: Sequence[RegionConfig], channel_order: str = "rgb", pool_size: int = 4):
+        """Create a preprocessor.
+
+        Args:
+            regions: Crops to produce, in output order.
+            channel_order: `rgb` or `bgr` channel order of returned images.
+            pool_size: Number of output sets to rotate through.
+        """
+        if not regions:
+            raise ValueError("At least one region is required")
+        if channel_order not in ("rgb", "bgr"):
+            raise ValueError(f"Unsupported channel order: {channel_order}")
+        self.regions = list(regions)
+        self._conversion = cv2.COLOR_BGRA2RGB if channel_order == "rgb" else cv2.COLOR_BGRA2BGR
+        self._scratch = []
+        for region in self.regions:
+            width, height = region.output_size
+            same = (width, height) == (region.width, region.height)
+            self._scratch.append(None if same else np.empty((height, width, 4), dtype=np.uint8))
+        self._outputs = [
+            [np.empty((r.output_size[1], r.output_size[0], 3), dtype=np.uint8) for r in self.regions]
+            for _ in range(max(int(pool_size), 1))
+        ]
+        self._next = 0
+
+    def process(self, buffer, width: int, height: int) -> List[np.ndarray]:
+        """Cut every region out of a raw BGRA window buffer.
+
+        Args:
+            buffer: Object exposing the buffer protocol (e.g. `ScreenShot.raw`)
+                holding `height * width * 4` bytes of BGRA pixels.
+            width: Source width in pixels.
+            height: Source height in pixels.
+
+        Returns:
+            One (h, w, 3) image per region, viewing the output pool.
+        """
+        src = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4)
+        outputs = self._outputs[self._next]
+        self._next = (self._next + 1) % len(self._outputs)
+        for region, scratch, out in zip(self.regions, self._scratch, outputs):
+            if region.left < 0 or region.top < 0 or region.left + region.width > width \
+                    or region.top + region.height > height:
+                raise ValueError(f"Region {region.name!r} lies outside the {width}×{height} window")
+            crop = src[region.top:region.top + region.height, region.left:region.left + region.width]
+            if scratch is not None:
+                cv2.resize(crop, region.output_size, dst=scratch, interpolation=cv2.INTER_AREA)
+                crop = scratch
+            cv2.cvtColor(crop, self._conversion, dst=out)
+        return outputs
+
+
+def region_prompt(prompt: str, regions: Sequence[RegionConfig]) -> str:
+    """Extend the system prompt to describe a multi‑region observation."""
+    lines = [
+        f"image {i}: {region.name} ({region.output_size[0]}×{region.output_size[1]} pixels)"
+        for i, region in enumerate(regions)
+    ]
+    return (
+        f"{prompt}\n\nThis observation is split into {len(regions)} images of the same moment:\n"
+        + "\n".join(lines)
+        + "\nGive `click` in the pixels of the image the target appears in and add "
+        "`\"image\": <index>` to the action (default 0)."
+    )
+
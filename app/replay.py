@@ -0,0 +1,204 @@
+"""Memory‑mapped replay datasets.
+
+Replaying `demo_frames/` used to decode every PNG and convert and resize it
+again on every run.  `ReplayDataset` does that work once: the preprocessed
+frames are written to a uint8 `.npy` cache and opened with `mmap_mode="r"`,
+so later replays, benchmarks and evaluations start immediately and only touch
+the frames they read.
+
+A dataset is built from either
+
+* a directory of images – the cache lives in `.replay_cache/` next to them
+  and is keyed by the file names, sizes and modification times, so editing,
+  adding or removing a frame rebuilds it, or
+* a run recorded by `recorder.RunRecorder` – the cache lives in the
+  recording and is keyed by its index; recorded actions and objects are kept
+  alongside the frames.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .recorder import iter_recording, read_index
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+CACHE_DIR = ".replay_cache"
+
+
+def _cache_key(parts: Sequence[Any]) -> str:
+    blob = json.dumps(list(parts), separators=(",", ":"))
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _preprocess(img: np.ndarray, size: Tuple[int, int], conversion: Optional[int]) -> np.ndarray:
+    if conversion is not None:
+        img = cv2.cvtColor(img, conversion)
+    if img.shape[1::-1] != tuple(size):
+        img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+    return img
+
+
+def _write_cache(path: str, frames: Iterator[np.ndarray], count: int, size: Tuple[int, int]) -> np.ndarray:
+    """Write `count` frames to a `.npy` file atomically and map it."""
+    tmp = path + ".tmp"
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.uint8, shape=(count, size[1], size[0], 3))
+    for i, frame in enumerate(frames):
+        out[i] = frame
+    out.flush()
+    del out
+    os.replace(tmp, path)
+    return np.load(path, mmap_mode="r")
+
+
+class ReplayDataset:
+    """Preprocessed frames with random access and batch iteration.
+
+    Use `from_directory`, `from_recording` or `open` rather than the
+    constructor.
+
+    Attributes:
+        frames: `(n, h, w, 3)` uint8 array, memory‑mapped and read‑only.
+        sources: Per frame, the image file name or recording sequence number.
+        entries: Per frame, the recording index entry (with `action` and
+            `objects`), or None for image directories.
+    """
+
+    def __init__(self, frames: np.ndarray, sources: List[Any], entries: Optional[List[Dict[str, Any]]] = None):
+        self.frames = frames
+        self.sources = sources
+        self.entries = entries
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def open(cls, source: str, size: Tuple[int, int] = (224, 224), channel_order: str = "rgb") -> "ReplayDataset":
+        """Open a recording or an image directory, whichever `source` is."""
+        if os.path.exists(os.path.join(source, "index.jsonl")):
+            return cls.from_recording(source, size, channel_order)
+        return cls.from_directory(source, size, channel_order)
+
+    @classmethod
+    def from_directory(
+        cls,
+        source: str,
+        size: Tuple[int, int] = (224, 224),
+        channel_order: str = "rgb",
+        cache_dir: Optional[str] = None,
+    ) -> "ReplayDataset":
+        """Load the images in a directory, decoding them only if not cached.
+
+        Args:
+            source: Directory of `.png`/`.jpg` frames, replayed in name order.
+            size: Output (width, height).
+            channel_order: `rgb` or `bgr` channel order of the frames.
+            cache_dir: Where to keep the cache (defaults to
+                `<source>/.replay_cache`).
+
+        Returns:
+            The dataset.  Unreadable images are skipped.
+        """
+        if channel_order not in ("rgb", "bgr"):
+            raise ValueError(f"Unsupported channel order: {channel_order}")
+        paths = sorted(p for p in Path(source).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+        stats = [(p.name, p.stat().st_size, p.stat().st_mtime_ns) for p in paths]
+        key = _cache_key([stats, list(size), channel_order])
+        cache_dir = cache_dir or os.path.join(source, CACHE_DIR)
+        cache = os.path.join(cache_dir, f"frames_{key}.npy")
+        names_path = os.path.join(cache_dir, f"frames_{key}.json")
+        if os.path.exists(cache) and os.path.exists(names_path):
+            with open(names_path, "r", encoding="utf-8") as fh:
+                names = json.load(fh)
+            return cls(np.load(cache, mmap_mode="r"), names)
+        conversion = cv2.COLOR_BGR2RGB if channel_order == "rgb" else None
+        decoded = []
+        for path in paths:
+            img = cv2.imread(str(path))
+            if img is not None:
+                decoded.append((path.name, _preprocess(img, size, conversion)))
+        if not decoded:
+            return cls(np.zeros((0, size[1], size[0], 3), dtype=np.uint8), [])
+        os.makedirs(cache_dir, exist_ok=True)
+        frames = _write_cache(cache, (frame for _, frame in decoded), len(decoded), size)
+        names = [name for name, _ in decoded]
+        with open(names_path, "w", encoding="utf-8") as fh:
+            json.dump(names, fh)
+        return cls(frames, names)
+
+    @classmethod
+    def from_recording(
+        cls,
+        source: str,
+        size: Tuple[int, int] = (224, 224),
+        channel_order: str = "rgb",
+    ) -> "ReplayDataset":
+        """Load a run recorded by `RunRecorder`, restoring delta frames once.
+
+        Args:
+            source: The recording directory.
+            size: Output (width, height).
+            channel_order: `rgb` or `bgr` channel order of the frames.
+
+        Returns:
+            The dataset, with the recorded index entries.
+        """
+        if channel_order not in ("rgb", "bgr"):
+            raise ValueError(f"Unsupported channel order: {channel_order}")
+        with open(os.path.join(source, "meta.json"), "r", encoding="utf-8") as fh:
+            recorded_order = json.load(fh).get("channel_order", "rgb")
+        index = os.path.join(source, "index.jsonl")
+        stat = os.stat(index)
+        key = _cache_key([stat.st_size, stat.st_mtime_ns, list(size), channel_order])
+        cache = os.path.join(source, f"replay_{key}.npy")
+        conversion = None if recorded_order == channel_order else cv2.COLOR_RGB2BGR
+        entries = []
+
+        def frames() -> Iterator[np.ndarray]:
+            for entry, frame in iter_recording(source):
+                entries.append(entry)
+                yield _preprocess(np.asarray(frame), size, conversion)
+
+        if os.path.exists(cache):
+            entries = read_index(source)
+            data = np.load(cache, mmap_mode="r")
+        else:
+            count = len(read_index(source))
+            if not count:
+                return cls(np.zeros((0, size[1], size[0], 3), dtype=np.uint8), [], [])
+            data = _write_cache(cache, frames(), count, size)
+        return cls(data, [entry["seq"] for entry in entries], entries)
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        """Return one frame as a read‑only view of the cache."""
+        return self.frames[index]
+
+    def batches(self, batch_size: int, shuffle: bool = False, seed: Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Iterate over `(indices, frames)` batches.
+
+        In order, each batch is a view of consecutive frames; shuffled
+        batches are gathered into a new array.
+        """
+        batch_size = max(int(batch_size), 1)
+        order = np.arange(len(self))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        for start in range(0, len(self), batch_size):
+            indices = order[start:start + batch_size]
+            if shuffle:
+                yield indices, self.frames[indices]
+            else:
+                yield indices, self.frames[start:start + len(indices)]
@@ -1,30 +1,237 @@
 """Tick scheduler for pacing actions.
 
-This module defines a simple scheduler that enforces a minimum time interval
+This module defines a scheduler that enforces a minimum time interval
 between successive actions.  It is used to mimic game ticks (roughly
-0.6 seconds per tick in Old School RuneScape) and avoid rapid double‑clicks.
+0.6 seconds per tick in Old School RuneScape) and avoid rapid double‑clicks.
+
+The scheduler can also phase‑lock to the game's real ticks.  Tick boundaries
+are reported with `observe_tick` – from the plugin's `GameTick` messages or
+from frames where the scene visibly changed – and a simple software PLL
+keeps an estimate of the tick phase and period.  Once locked:
+
+* `wait_for_inference` holds the capture stage until the next boundary minus
+  the rolling model‑latency estimate, so the action is ready just as the tick
+  turns over, and
+* `wait_for_next_tick` holds an action that is ready shortly before a
+  boundary until just after it.
+
+Phase error (drift) and missed ticks are reported by `summary`.  All times
+come from `time.monotonic()`.
 """
 
 from __future__ import annotations
 
+import math
+import threading
 import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import numpy as np
+
+TICK_SECONDS = 0.6
 
 
 class TickScheduler:
-    """Scheduler to enforce minimum intervals between actions."""
+    """Scheduler to enforce minimum intervals between actions.
 
-    def __init__(self, min_interval: float = 0.6):
+    Args:
+        min_interval: Minimum time between two actions; always honoured.
+        period: Nominal game tick length.
+        offset: How long after a boundary a held action is released.
+        hold: Actions ready at most this long before a boundary are held
+            until just after it; others are released immediately.
+        gain: Fraction of each observed phase error the PLL corrects.
+        latency_window: Number of recent inference times kept.
+        latency_percentile: Percentile of those times used as the estimate.
+        lock_timeout: Ticks without an observation after which the lock is
+            considered lost and the scheduler falls back to `min_interval`.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = TICK_SECONDS,
+        period: float = TICK_SECONDS,
+        offset: float = 0.03,
+        hold: float = 0.1,
+        gain: float = 0.3,
+        latency_window: int = 20,
+        latency_percentile: float = 90.0,
+        lock_timeout: float = 5.0,
+    ):
         self.min_interval = float(min_interval)
+        self.nominal = float(period)
+        self.period = float(period)
+        self.offset = float(offset)
+        self.hold = float(hold)
+        self.gain = float(gain)
+        self.latency_percentile = float(latency_percentile)
+        self.lock_timeout = float(lock_timeout)
         self.last_time: float = 0.0
+        self._latencies: Deque[float] = deque(maxlen=max(int(latency_window), 1))
+        self._lock = threading.Lock()
+        self._anchor: Optional[float] = None
+        self._last_seen: Optional[float] = None
+        self._last_tick: Optional[int] = None
+        self._started_for: Optional[float] = None
+        self.ticks = 0
+        self.missed_ticks = 0
+        self.early_starts = 0
+        self.held = 0
+        self.on_tick = 0
+        self.actions = 0
+        self._drift_total = 0.0
+        self._drift_max = 0.0
+        self._drift_count = 0
+        self.last_drift = 0.0
+
+    # ------------------------------------------------------------------
+    # Phase lock
+    # ------------------------------------------------------------------
+    def observe_tick(self, timestamp: float, tick: Optional[int] = None) -> None:
+        """Report a tick boundary seen at `timestamp`.
+
+        Args:
+            timestamp: Time of the boundary on the `time.monotonic()` clock.
+            tick: Game tick number, if known (plugin feed).  Without it the
+                number of elapsed ticks is inferred from the period, and
+                observations less than half a tick apart are ignored.
+        """
+        with self._lock:
+            if self._anchor is None or self._last_seen is None:
+                self._anchor = self._last_seen = timestamp
+                self._last_tick = tick
+                self.ticks = 1
+                return
+            dt = timestamp - self._last_seen
+            if tick is not None and self._last_tick is not None:
+                elapsed = tick - self._last_tick
+                if elapsed <= 0:
+                    return
+            else:
+                elapsed = int(round(dt / self.period))
+                if elapsed <= 0:
+                    return
+            if dt > self.lock_timeout * self.period:
+                # Lost lock; restart from this observation.
+                self._anchor = timestamp
+            else:
+                self.missed_ticks += elapsed - 1
+                predicted = self._anchor + round((timestamp - self._anchor) / self.period) * self.period
+                error = timestamp - predicted
+                self._anchor = predicted + self.gain * error
+                self.last_drift = error
+                self._drift_total += abs(error)
+                self._drift_max = max(self._drift_max, abs(error))
+                self._drift_count += 1
+                if tick is not None and self._last_tick is not None:
+                    # Tick numbers make the interval exact; refine the period.
+                    estimate = dt / elapsed
+                    if 0.5 * self.nominal <= estimate <= 1.5 * self.nominal:
+                        self.period += self.gain * (estimate - self.period)
+            self._last_seen = timestamp
+            self._last_tick = tick
+            self.ticks += 1
+
+    @property
+    def locked(self) -> bool:
+        """True once two boundaries were seen and the last one is recent."""
+        with self._lock:
+            return self._is_locked(time.monotonic())
+
+    def _is_locked(self, now: float) -> bool:
+        return (self.ticks >= 2 and self._last_seen is not None
+                and now - self._last_seen <= self.lock_timeout * self.period)
+
+    def next_boundary(self, now: Optional[float] = None) -> Optional[float]:
+        """Return the predicted next tick boundary at or after `now`."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self._is_locked(now):
+                return None
+            return self._anchor + math.ceil((now - self._anchor) / self.period) * self.period
+
+    # ------------------------------------------------------------------
+    # Latency estimate
+    # ------------------------------------------------------------------
+    def record_latency(self, seconds: float) -> None:
+        """Add one measured inference time to the rolling estimate."""
+        with self._lock:
+            self._latencies.append(float(seconds))
+
+    @property
+    def latency(self) -> float:
+        """Rolling inference latency estimate (0 until measured)."""
+        with self._lock:
+            if not self._latencies:
+                return 0.0
+            return float(np.percentile(self._latencies, self.latency_percentile))
+
+    # ------------------------------------------------------------------
+    # Waiting
+    # ------------------------------------------------------------------
+    def wait_for_inference(self) -> None:
+        """Wait until inference should start to finish by the next boundary.
+
+        Returns immediately while not locked.  Inference starts once per
+        boundary, and at once if the latency estimate exceeds the time left.
+        """
+        now = time.monotonic()
+        boundary = self.next_boundary(now)
+        if boundary is None:
+            return
+        lead = self.latency
+        if self._started_for is not None and boundary - self._started_for < self.period / 2:
+            boundary += self.period
+        start = boundary - lead
+        if start > now:
+            time.sleep(start - now)
+            self.early_starts += 1
+        self._started_for = boundary
 
     def wait_for_next_tick(self) -> None:
-        """Wait until the minimum interval has elapsed since the last action."""
-        now = time.time()
-        elapsed = now - self.last_time
-        if elapsed < self.min_interval:
-            time.sleep(self.min_interval - elapsed)
-        self.last_time = time.time()
+        """Wait until the minimum interval has elapsed since the last action.
+
+        When locked, an action ready less than `hold` seconds before a
+        boundary is also held until `offset` seconds after it.
+        """
+        now = time.monotonic()
+        due = self.last_time + self.min_interval
+        boundary = self.next_boundary(now)
+        if boundary is not None and boundary - now <= self.hold:
+            due = max(due, boundary + self.offset)
+            self.held += 1
+        if due > now:
+            time.sleep(due - now)
+        self.last_time = time.monotonic()
+        self.actions += 1
+        phase = self._phase(self.last_time)
+        if phase is not None and phase <= self.offset + self.hold:
+            self.on_tick += 1
+
+    def _phase(self, now: float) -> Optional[float]:
+        with self._lock:
+            if not self._is_locked(now):
+                return None
+            return (now - self._anchor) % self.period
 
     def reset(self) -> None:
         """Reset the scheduler timer."""
-        self.last_time = 0.0
\ No newline at end of file
+        self.last_time = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Return lock, drift, missed‑tick and timing statistics."""
+        drift_count = self._drift_count
+        return {
+            "locked": self.locked,
+            "period_ms": round(self.period * 1000.0, 2),
+            "ticks": self.ticks,
+            "missed_ticks": self.missed_ticks,
+            "mean_drift_ms": round(self._drift_total / drift_count * 1000.0, 2) if drift_count else 0.0,
+            "max_drift_ms": round(self._drift_max * 1000.0, 2),
+            "latency_ms": round(self.latency * 1000.0, 2),
+            "early_starts": self.early_starts,
+            "held": self.held,
+            "on_tick": self.on_tick,
+            "actions": self.actions,
+        }
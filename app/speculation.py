@@ -0,0 +1,164 @@
+"""Speculative inference while an action is being carried out.
+
+A model round‑trip usually takes longer than the mouse movement, and after
+many actions the scene barely changes: the same fishing spot, the next log in
+the same inventory slot.  `Speculator` exploits this.  As soon as action N is
+handed to the actuator it starts inference on the most recent frame in the
+background.  The first frame captured after the action completed is compared
+with the speculative frame by perceptual hash:
+
+* close enough – the speculative action is used, and the round‑trip that has
+  already elapsed is saved,
+* too different – the speculation is discarded and the frame goes to the
+  model as usual; the model time spent on it is counted as wasted.
+
+Only one speculation is in flight at a time, and while it is pending frames
+captured before the action completed are not sent to the model at all.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .metrics import REGISTRY, MetricsRegistry
+from .regions import Observation, as_images
+from .utils.imagehash import dhash, hamming
+
+
+class Speculation:
+    """One background inference and the frame it was made from."""
+
+    def __init__(self, frame_hash: int, started: float, after: Optional[Any]):
+        self.frame_hash = frame_hash
+        self.future: Optional[Future] = None
+        self.started = started
+        self.after = after
+        self.elapsed = 0.0
+
+
+class Speculator:
+    """Run inference on the current frame while the previous action executes.
+
+    Args:
+        infer: `infer(image, objects)` returning an action; called on a
+            worker thread.
+        max_distance: Largest dHash Hamming distance between the speculative
+            and the post‑action frame for the result to be kept.
+        metrics: Registry for counters (the process‑wide one by default).
+    """
+
+    def __init__(self, infer: Callable[[Observation, Optional[List[Dict[str, Any]]]], Dict[str, Any]],
+                 max_distance: int = 6, metrics: Optional[MetricsRegistry] = None):
+        self.infer = infer
+        self.max_distance = int(max_distance)
+        self.metrics = metrics if metrics is not None else REGISTRY
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculate")
+        self._lock = threading.Lock()
+        self._pending: Optional[Speculation] = None
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0.0
+        self.saved = 0.0
+
+    def speculate(self, image: Observation, objects: Optional[List[Dict[str, Any]]] = None,
+                  after: Optional[Any] = None) -> bool:
+        """Start inference on `image` unless a speculation is already pending.
+
+        Args:
+            image: The most recent frame (or region crops); it is copied, as
+                capture buffers are reused.
+            objects: Object list sent with the frame.
+            after: The actuator `Command` being executed; frames captured
+                before it finished are not compared.
+
+        Returns:
+            True if a speculation was started.
+        """
+        with self._lock:
+            if self._pending is not None:
+                return False
+            images = [crop.copy() for crop in as_images(image)]
+            frame = images[0] if isinstance(image, np.ndarray) else images
+            spec = Speculation(dhash(images[0]), time.perf_counter(), after)
+            spec.future = self._executor.submit(self._run, spec, frame, objects)
+            self._pending = spec
+            self.started += 1
+            return True
+
+    def _run(self, spec: Speculation, image: Observation, objects: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        try:
+            return self.infer(image, objects)
+        finally:
+            spec.elapsed = time.perf_counter() - spec.started
+
+    @property
+    def pending(self) -> bool:
+        return self._pending is not None
+
+    def waiting(self, captured_at: float) -> bool:
+        """True if a frame captured at `captured_at` predates the action."""
+        spec = self._pending
+        if spec is None or spec.after is None:
+            return False
+        return not spec.after.done.is_set() or captured_at < spec.after.finished
+
+    def take(self, image: Observation, captured_at: float) -> Optional[Dict[str, Any]]:
+        """Resolve the pending speculation against a post‑action frame.
+
+        Args:
+            image: Frame captured after the action completed.
+            captured_at: Its capture time on the `time.monotonic()` clock.
+
+        Returns:
+            The speculative action if the frames match (waiting for it if
+            still running), otherwise None; the speculation is consumed
+            either way.  Returns None without consuming it when there is
+            none or the frame predates the action.
+        """
+        with self._lock:
+            spec = self._pending
+            if spec is None or self.waiting(captured_at):
+                return None
+            self._pending = None
+        if hamming(spec.frame_hash, dhash(as_images(image)[0])) > self.max_distance:
+            self.misses += 1
+            self.metrics.inc("speculation_misses")
+            spec.future.add_done_callback(lambda _: self._waste(spec))
+            return None
+        saved = time.perf_counter() - spec.started
+        try:
+            action = spec.future.result()
+        except Exception:
+            self.misses += 1
+            self.metrics.inc("speculation_misses")
+            return None
+        self.hits += 1
+        self.saved += min(saved, spec.elapsed)
+        self.metrics.inc("speculation_hits")
+        return action
+
+    def _waste(self, spec: Speculation) -> None:
+        with self._lock:
+            self.wasted += spec.elapsed
+        self.metrics.observe("speculation_wasted", spec.elapsed)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return hit rate and saved vs wasted model time."""
+        resolved = self.hits + self.misses
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / resolved, 3) if resolved else 0.0,
+            "saved_s": round(self.saved, 3),
+            "wasted_s": round(self.wasted, 3),
+        }
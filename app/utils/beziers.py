@@ -1,19 +1,71 @@
-"""Bezier path generation for mouse movements."""
+"""Bezier path generation for mouse movements.
+
+Paths are evaluated as a matrix product of a Bernstein basis table, cached
+per step count, with the four control points, so generating a path costs a
+single small NumPy operation instead of a Python loop per point.
+`bezier_paths` generates many paths at once for benchmarks and replay tools.
+"""
 
 from __future__ import annotations
 
 import random
-from typing import Iterable, List, Tuple
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+
+@lru_cache(maxsize=32)
+def bernstein_basis(steps: int) -> np.ndarray:
+    """Return the cubic Bernstein basis sampled at `steps` points.
+
+    Args:
+        steps: Number of points, evenly spaced in t ∈ [0, 1].
+
+    Returns:
+        Read‑only array of shape (steps, 4); row i holds the weights of the
+        four control points at t = i / (steps - 1).
+    """
+    t = np.linspace(0.0, 1.0, steps) if steps > 1 else np.zeros(1)
+    u = 1.0 - t
+    basis = np.stack([u ** 3, 3 * u ** 2 * t, 3 * u * t ** 2, t ** 3], axis=1)
+    basis.setflags(write=False)
+    return basis
 
 
-def _cubic_bezier(t: float, p0: float, p1: float, p2: float, p3: float) -> float:
-    """Compute a single dimension of a cubic Bezier curve."""
-    return (
-        (1 - t) ** 3 * p0
-        + 3 * (1 - t) ** 2 * t * p1
-        + 3 * (1 - t) * t ** 2 * p2
-        + t ** 3 * p3
-    )
+def _control_points(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Build (n, 4, 2) control points with the usual ±30 px jitter.
+
+    Offsets are drawn from `random.uniform` in the order x1, y1, x2, y2 for
+    each path in turn, exactly as successive `bezier_path` calls would.
+    """
+    n = len(starts)
+    jitter = np.array([random.uniform(-30, 30) for _ in range(4 * n)], dtype=np.float64).reshape(n, 2, 2)
+    delta = ends - starts
+    ctrl = np.empty((n, 4, 2), dtype=np.float64)
+    ctrl[:, 0] = starts
+    ctrl[:, 1] = starts + delta * 0.25 + jitter[:, 0]
+    ctrl[:, 2] = starts + delta * 0.75 + jitter[:, 1]
+    ctrl[:, 3] = ends
+    return ctrl
+
+
+def bezier_paths(starts, ends, steps: int = 20) -> np.ndarray:
+    """Generate one jittered cubic Bezier path per start/end pair.
+
+    Args:
+        starts: Array‑like of shape (n, 2) with start positions.
+        ends: Array‑like of shape (n, 2) with target positions.
+        steps: Number of points per path.
+
+    Returns:
+        Integer array of shape (n, steps, 2).
+    """
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    ctrl = _control_points(starts, ends)
+    points = np.matmul(bernstein_basis(steps), ctrl)
+    return np.trunc(points).astype(np.int64)
 
 
 def bezier_path(start: Tuple[int, int], end: Tuple[int, int], steps: int = 20) -> List[Tuple[int, int]]:
@@ -33,18 +85,12 @@ def bezier_path(start: Tuple[int, int], end: Tuple[int, int], steps: int = 20) -
     """
     x0, y0 = start
     x3, y3 = end
-    # Control points near the start and end with random offsets
-    def rand_offset():
-        return random.uniform(-30, 30)
-
-    x1 = x0 + (x3 - x0) * 0.25 + rand_offset()
-    y1 = y0 + (y3 - y0) * 0.25 + rand_offset()
-    x2 = x0 + (x3 - x0) * 0.75 + rand_offset()
-    y2 = y0 + (y3 - y0) * 0.75 + rand_offset()
-    points: List[Tuple[int, int]] = []
-    for i in range(steps):
-        t = i / (steps - 1)
-        x = _cubic_bezier(t, x0, x1, x2, x3)
-        y = _cubic_bezier(t, y0, y1, y2, y3)
-        points.append((int(x), int(y)))
-    return points
\ No newline at end of file
+    # Same draw order as `bezier_paths`: x1, y1, x2, y2
+    ctrl = np.array([
+        [x0, y0],
+        [x0 + (x3 - x0) * 0.25 + random.uniform(-30, 30), y0 + (y3 - y0) * 0.25 + random.uniform(-30, 30)],
+        [x0 + (x3 - x0) * 0.75 + random.uniform(-30, 30), y0 + (y3 - y0) * 0.75 + random.uniform(-30, 30)],
+        [x3, y3],
+    ], dtype=np.float64)
+    path = np.trunc(bernstein_basis(steps) @ ctrl).astype(np.int64)
+    return list(map(tuple, path.tolist()))
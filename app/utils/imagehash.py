@@ -0,0 +1,34 @@
+"""Perceptual hashing of frames.
+
+A difference hash (dHash) reduces a frame to a 64‑bit integer whose bits
+record whether each pixel of a small grayscale thumbnail is brighter than its
+right‑hand neighbour.  Visually similar frames produce hashes that differ in
+only a few bits, so the Hamming distance between two hashes is a cheap
+similarity measure.
+"""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+
+def dhash(frame: np.ndarray, hash_size: int = 8) -> int:
+    """Compute the difference hash of a frame.
+
+    Args:
+        frame: Image of shape (h, w, 3) in RGB or BGR order, or (h, w).
+        hash_size: Hash side length; the hash has `hash_size ** 2` bits.
+
+    Returns:
+        The hash as a Python integer.
+    """
+    gray = frame.mean(axis=2) if frame.ndim == 3 else frame
+    small = cv2.resize(gray.astype(np.float32), (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    """Return the number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
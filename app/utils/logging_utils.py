@@ -2,15 +2,16 @@
 
 This module sets up a run directory and configures Python's logging module to
 write logs to both the console and a file.  Frames, prompts and actions are
-also stored in this directory for later inspection.
+also stored in this directory for later inspection by `app.recorder`.
 """
 
 from __future__ import annotations
 
 import datetime
+import json
 import logging
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
 
 
 def prepare_run_dir(base_dir: Optional[str] = None) -> str:
@@ -53,4 +54,15 @@ def setup_logging(log_dir: str) -> logging.Logger:
     fh.setLevel(logging.INFO)
     fh.setFormatter(formatter)
     logger.addHandler(fh)
-    return logger
\ No newline at end of file
+    return logger
+
+
+def log_stats(logger: logging.Logger, name: str, stats: Dict[str, Any]) -> None:
+    """Write a named statistics record to the run log as one JSON line.
+
+    Args:
+        logger: Logger returned by `setup_logging`.
+        name: Short label such as `pipeline` or `action_cache`.
+        stats: JSON‑serialisable statistics.
+    """
+    logger.info("%s %s", name, json.dumps(stats, sort_keys=True))
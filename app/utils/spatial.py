@@ -0,0 +1,177 @@
+"""Uniform grid index over object bounding boxes.
+
+The plugin reports a bounding box `[x1, y1, x2, y2]` in window pixels for
+every visible object.  `GridIndex` buckets the boxes into square cells so
+"what is under this point" and "which object centre is nearest" only look at
+a handful of cells instead of every object.  Between ticks most objects keep
+their box, so `sync` only re‑buckets the entries that were added, moved or
+removed.
+
+`snap` uses the index to move a model click that narrowly missed a target
+onto that target's centre.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+Box = Tuple[int, int, int, int]
+
+
+class GridIndex:
+    """Spatial hash of boxes keyed by object id.
+
+    Args:
+        cell: Cell side length in pixels; roughly the size of a typical
+            object works best.
+    """
+
+    def __init__(self, cell: int = 32):
+        self.cell = max(int(cell), 1)
+        self._boxes: Dict[Hashable, Box] = {}
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._boxes
+
+    def _cell_range(self, box: Box) -> Iterable[Tuple[int, int]]:
+        x1, y1, x2, y2 = box
+        c = self.cell
+        for cx in range(x1 // c, x2 // c + 1):
+            for cy in range(y1 // c, y2 // c + 1):
+                yield cx, cy
+
+    def insert(self, key: Hashable, box: Sequence[int]) -> None:
+        """Add or move an entry.  Empty boxes are ignored."""
+        x1, y1, x2, y2 = (int(v) for v in box)
+        if key in self._boxes:
+            self.remove(key)
+        if x2 <= x1 or y2 <= y1:
+            return
+        box = (x1, y1, x2, y2)
+        self._boxes[key] = box
+        for cell in self._cell_range(box):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """Remove an entry if present."""
+        box = self._boxes.pop(key, None)
+        if box is None:
+            return
+        for cell in self._cell_range(box):
+            members = self._cells.get(cell)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._cells[cell]
+
+    def clear(self) -> None:
+        self._boxes.clear()
+        self._cells.clear()
+
+    def sync(self, objects: Sequence[Dict[str, Any]]) -> int:
+        """Make the index match one tick's objects, touching only changes.
+
+        Args:
+            objects: Object dictionaries with `bbox`; keyed by their `index`
+                field, or by position when it is missing.
+
+        Returns:
+            The number of entries inserted, moved or removed.
+        """
+        seen = set()
+        changed = 0
+        for position, obj in enumerate(objects):
+            bbox = obj.get("bbox")
+            if not bbox:
+                continue
+            box = tuple(int(v) for v in bbox)
+            if box[2] <= box[0] or box[3] <= box[1]:
+                continue
+            key = obj.get("index", position)
+            seen.add(key)
+            if self._boxes.get(key) != box:
+                self.insert(key, box)
+                changed += 1
+        for key in [k for k in self._boxes if k not in seen]:
+            self.remove(key)
+            changed += 1
+        return changed
+
+    def box(self, key: Hashable) -> Optional[Box]:
+        return self._boxes.get(key)
+
+    def at(self, x: float, y: float) -> List[Hashable]:
+        """Return the keys of all boxes containing the point, smallest first."""
+        cell = (int(x) // self.cell, int(y) // self.cell)
+        hits = []
+        for key in self._cells.get(cell, ()):
+            x1, y1, x2, y2 = self._boxes[key]
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                hits.append(key)
+        hits.sort(key=lambda k: _area(self._boxes[k]))
+        return hits
+
+    def nearest(self, x: float, y: float, max_distance: float) -> Optional[Hashable]:
+        """Return the key whose box centre is closest to the point.
+
+        Only centres within `max_distance` pixels are considered; the search
+        widens ring by ring and stops once no closer centre can exist.
+        """
+        c = self.cell
+        cx, cy = int(x) // c, int(y) // c
+        best_key, best = None, float(max_distance)
+        checked: Set[Hashable] = set()
+        for ring in range(int(math.ceil(max_distance / c)) + 1):
+            # Points in cells beyond this ring are at least this far away.
+            if best_key is not None and (ring - 1) * c > best:
+                break
+            for cell in _ring(cx, cy, ring):
+                for key in self._cells.get(cell, ()):
+                    if key in checked:
+                        continue
+                    checked.add(key)
+                    mx, my = centre(self._boxes[key])
+                    distance = math.hypot(mx - x, my - y)
+                    if distance <= best:
+                        best_key, best = key, distance
+        return best_key
+
+    def snap(self, x: float, y: float, max_distance: float) -> Optional[Tuple[int, int]]:
+        """Return the centre of the target the point hits or nearly hits.
+
+        A point inside one or more boxes snaps to the smallest of them;
+        otherwise to the nearest centre within `max_distance`.  Returns None
+        if there is no such object.
+        """
+        hits = self.at(x, y)
+        key = hits[0] if hits else self.nearest(x, y, max_distance)
+        if key is None:
+            return None
+        return centre(self._boxes[key])
+
+
+def centre(box: Box) -> Tuple[int, int]:
+    """Return the integer centre of a box."""
+    x1, y1, x2, y2 = box
+    return (x1 + x2) // 2, (y1 + y2) // 2
+
+
+def _area(box: Box) -> int:
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+
+def _ring(cx: int, cy: int, r: int) -> Iterable[Tuple[int, int]]:
+    if r == 0:
+        yield cx, cy
+        return
+    for dx in range(-r, r + 1):
+        yield cx + dx, cy - r
+        yield cx + dx, cy + r
+    for dy in range(-r + 1, r):
+        yield cx - r, cy + dy
+        yield cx + r, cy + dy
@@ -0,0 +1,5 @@
+"""Micro‑benchmarks for Qwen‑Plays‑OSRS.
+
+Run individual scripts as modules from the repository root, e.g.
+`python -m benchmarks.bench_capture`.
+"""
@@ -0,0 +1,71 @@
+"""Micro‑benchmark of action validation and click mapping.
+
+Compares `jsonschema.validate` with the validator compiled by
+`app.actions.compile_schema`, and per‑action scalar mapping of clicks to
+window pixels with the batched `ActionParser.to_window`.
+
+Usage:
+    python -m benchmarks.bench_actions [--iterations 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Callable
+
+from jsonschema import validate
+
+from app.actions import ACTION_SCHEMA, ActionParser, compile_schema
+
+BATCH = 64
+WINDOW = (765, 503)
+
+
+def time_per_call(fn: Callable[[], object], iterations: int) -> float:
+    """Mean wall time per call in microseconds."""
+    for _ in range(5):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def scalar_to_window(click, model=(224, 224), window=WINDOW):
+    x = min(max(int((click[0] + 0.5) * window[0] / model[0]), 0), window[0] - 1)
+    y = min(max(int((click[1] + 0.5) * window[1] / model[1]), 0), window[1] - 1)
+    return x, y
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    opts = parser.parse_args()
+
+    action = {"click": [123, 45], "modifiers": {"shift": False}, "reason": "attack the goblin"}
+    compiled = compile_schema(ACTION_SCHEMA)
+    actions = ActionParser(metrics=None)
+    parsed = [actions.parse({"click": [random.randrange(224), random.randrange(224)],
+                             "modifiers": {"shift": False}, "reason": ""}) for _ in range(BATCH)]
+    batch_iterations = max(opts.iterations // 20, 10)
+    row = {
+        "jsonschema_us": round(time_per_call(lambda: validate(instance=action, schema=ACTION_SCHEMA),
+                                             max(opts.iterations // 10, 10)), 2),
+        "compiled_us": round(time_per_call(lambda: compiled(action), opts.iterations), 2),
+        "parse_us": round(time_per_call(lambda: actions.parse(action), opts.iterations), 2),
+        "scalar_map_us_per_action": round(time_per_call(
+            lambda: [scalar_to_window(a.click) for a in parsed], batch_iterations) / BATCH, 3),
+        "batched_map_us_per_action": round(time_per_call(
+            lambda: actions.to_window(parsed, WINDOW), batch_iterations) / BATCH, 3),
+    }
+    print(f"validate: jsonschema {row['jsonschema_us']:.2f} µs, compiled {row['compiled_us']:.2f} µs, "
+          f"parse {row['parse_us']:.2f} µs | map batch of {BATCH}: scalar {row['scalar_map_us_per_action']:.3f} "
+          f"µs/action, batched {row['batched_map_us_per_action']:.3f} µs/action")
+    print(json.dumps(row, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Micro‑benchmark of mouse path generation.
+
+Compares the original per‑point Python loop with the NumPy implementation in
+`app.utils.beziers`, for single paths as `move_and_click` uses them and for
+the batch API.
+
+Usage:
+    python -m benchmarks.bench_beziers [--iterations 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Callable, List, Tuple
+
+from app.utils.beziers import bezier_path, bezier_paths
+
+STEPS: List[int] = [15, 20, 60]
+BATCH = 256
+
+
+def _cubic_bezier(t: float, p0: float, p1: float, p2: float, p3: float) -> float:
+    return (1 - t) ** 3 * p0 + 3 * (1 - t) ** 2 * t * p1 + 3 * (1 - t) * t ** 2 * p2 + t ** 3 * p3
+
+
+def loop_bezier_path(start: Tuple[int, int], end: Tuple[int, int], steps: int = 20) -> List[Tuple[int, int]]:
+    """The previous pure‑Python implementation, kept as the baseline."""
+    x0, y0 = start
+    x3, y3 = end
+    x1 = x0 + (x3 - x0) * 0.25 + random.uniform(-30, 30)
+    y1 = y0 + (y3 - y0) * 0.25 + random.uniform(-30, 30)
+    x2 = x0 + (x3 - x0) * 0.75 + random.uniform(-30, 30)
+    y2 = y0 + (y3 - y0) * 0.75 + random.uniform(-30, 30)
+    points = []
+    for i in range(steps):
+        t = i / (steps - 1)
+        points.append((int(_cubic_bezier(t, x0, x1, x2, x3)), int(_cubic_bezier(t, y0, y1, y2, y3))))
+    return points
+
+
+def time_per_call(fn: Callable[[], object], iterations: int) -> float:
+    """Mean wall time per call in microseconds."""
+    for _ in range(5):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    opts = parser.parse_args()
+
+    starts = [(random.randrange(0, 1920), random.randrange(0, 1080)) for _ in range(BATCH)]
+    ends = [(random.randrange(0, 1920), random.randrange(0, 1080)) for _ in range(BATCH)]
+    batch_iterations = max(opts.iterations // 50, 10)
+    results = []
+    for steps in STEPS:
+        row = {
+            "steps": steps,
+            "loop_us": round(time_per_call(lambda: loop_bezier_path(starts[0], ends[0], steps), opts.iterations), 2),
+            "numpy_us": round(time_per_call(lambda: bezier_path(starts[0], ends[0], steps), opts.iterations), 2),
+            "loop_batch_us_per_path": round(time_per_call(
+                lambda: [loop_bezier_path(s, e, steps) for s, e in zip(starts, ends)], batch_iterations) / BATCH, 2),
+            "numpy_batch_us_per_path": round(time_per_call(
+                lambda: bezier_paths(starts, ends, steps), batch_iterations) / BATCH, 2),
+        }
+        results.append(row)
+        print(f"{steps:>3} steps: loop {row['loop_us']:>7.2f} µs, numpy {row['numpy_us']:>7.2f} µs | "
+              f"batch of {BATCH}: loop {row['loop_batch_us_per_path']:>6.2f} µs/path, "
+              f"numpy {row['numpy_batch_us_per_path']:>6.2f} µs/path")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
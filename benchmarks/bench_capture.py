@@ -0,0 +1,90 @@
+"""Micro‑benchmark of the capture preprocessing paths.
+
+Compares the default copy path of `ScreenCapturer.grab_resized` (copy the mss
+buffer, convert BGRA→RGB, mask the chat, resize) with the zero‑copy
+`FusedPreprocessor`.  A synthetic BGRA buffer stands in for `ScreenShot.raw`,
+so no display is required.  For each client size the script reports the mean
+time per frame and the bytes allocated per frame as traced by `tracemalloc`.
+
+Usage:
+    python -m benchmarks.bench_capture [--iterations 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+import cv2
+import numpy as np
+
+from app.capture import CHAT_FRACTION, FusedPreprocessor
+
+SIZES: List[Tuple[int, int]] = [(765, 503), (1280, 720), (1920, 1080), (2560, 1440)]
+
+
+def copy_path(buffer: bytearray, width: int, height: int, size=(224, 224)) -> np.ndarray:
+    """Replicate the default `grab` + `grab_resized` preprocessing."""
+    img = np.array(np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4))
+    img = cv2.cvtColor(img, cv2.COLOR_BGRA2RGB)
+    img[int(height * CHAT_FRACTION):, :] = 0
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def time_per_frame(fn: Callable[[], np.ndarray], iterations: int) -> float:
+    """Mean wall time per call in microseconds."""
+    for _ in range(5):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def bytes_allocated_per_frame(fn: Callable[[], np.ndarray], iterations: int) -> float:
+    """Peak bytes allocated during a call, including blocks freed again."""
+    fn()
+    tracemalloc.start()
+    total = 0
+    for _ in range(iterations):
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        total += max(peak - base, 0)
+    tracemalloc.stop()
+    return total / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    opts = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+    for width, height in SIZES:
+        buffer = bytearray(rng.integers(0, 255, size=width * height * 4, dtype=np.uint8).tobytes())
+        fused = FusedPreprocessor((224, 224), channel_order="rgb", mask_chat=True)
+        paths = {
+            "copy": lambda: copy_path(buffer, width, height),
+            "zero_copy": lambda: fused.process(buffer, width, height),
+        }
+        for name, fn in paths.items():
+            row = {
+                "size": f"{width}x{height}",
+                "path": name,
+                "us_per_frame": round(time_per_frame(fn, opts.iterations), 1),
+                "bytes_allocated_per_frame": round(bytes_allocated_per_frame(fn, min(opts.iterations, 50))),
+            }
+            results.append(row)
+            print(f"{row['size']:>10} {name:>9}: {row['us_per_frame']:>9.1f} µs/frame "
+                  f"{row['bytes_allocated_per_frame']:>10} B allocated/frame")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+package com.example.qposrs;
+
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+/**
+ * Fixed-layout binary encoding of the objects published on each tick.
+ *
+ * Mirrors app/object_codec.py.  All values are little-endian:
+ *
+ * <pre>
+ * header   magic "QPOB", version u8, flags u8, sequence u16,
+ *          tick i32, name count u16, object count u16        (16 bytes)
+ * names    per name: byte length u16, UTF-8 bytes
+ * records  per object (18 bytes):
+ *          index u16, name u16, id i32, type u8, level u8, bbox 4 x i16
+ * removed  deltas only: count u16, then that many indices u16
+ * </pre>
+ *
+ * Names are interned per message so a name shared by many NPCs is sent once.
+ */
+public final class BinaryObjectEncoder
+{
+    private static final byte[] MAGIC = {'Q', 'P', 'O', 'B'};
+    private static final int VERSION = 1;
+    private static final int HEADER_SIZE = 16;
+    private static final int RECORD_SIZE = 18;
+
+    public static final int FLAG_KEYFRAME = 0x01;
+    public static final int FLAG_DELTA = 0x02;
+
+    private BinaryObjectEncoder()
+    {
+    }
+
+    /** Type code shared with the Python decoder. */
+    public static int typeCode(String type)
+    {
+        switch (type)
+        {
+            case "OBJECT":
+                return 1;
+            case "PLAYER":
+                return 2;
+            case "ITEM":
+                return 3;
+            default:
+                return 0;
+        }
+    }
+
+    public static byte[] encode(int tick, List<QpOsrsPlugin.ObjectInfo> objects)
+    {
+        return encode(tick, objects, 0, 0, null);
+    }
+
+    /**
+     * Encode a message.
+     *
+     * @param flags   0 for a plain snapshot, FLAG_KEYFRAME or FLAG_DELTA
+     * @param seq     sequence number, truncated to 16 bits
+     * @param removed indices removed since the previous message (deltas only)
+     */
+    public static byte[] encode(int tick, List<QpOsrsPlugin.ObjectInfo> objects, int flags, int seq, int[] removed)
+    {
+        Map<String, Integer> nameIndex = new HashMap<>();
+        List<byte[]> names = new ArrayList<>();
+        int[] nameIds = new int[objects.size()];
+        int nameBytes = 0;
+        for (int i = 0; i < objects.size(); i++)
+        {
+            String name = objects.get(i).name == null ? "" : objects.get(i).name;
+            Integer id = nameIndex.get(name);
+            if (id == null)
+            {
+                id = names.size();
+                nameIndex.put(name, id);
+                byte[] utf8 = name.getBytes(StandardCharsets.UTF_8);
+                names.add(utf8);
+                nameBytes += 2 + utf8.length;
+            }
+            nameIds[i] = id;
+        }
+
+        boolean delta = (flags & FLAG_DELTA) != 0;
+        int removedCount = delta && removed != null ? removed.length : 0;
+        int removedBytes = delta ? 2 + 2 * removedCount : 0;
+        ByteBuffer buf = ByteBuffer.allocate(HEADER_SIZE + nameBytes + RECORD_SIZE * objects.size() + removedBytes)
+            .order(ByteOrder.LITTLE_ENDIAN);
+        buf.put(MAGIC);
+        buf.put((byte) VERSION);
+        buf.put((byte) flags);
+        buf.putShort((short) seq);
+        buf.putInt(tick);
+        buf.putShort((short) names.size());
+        buf.putShort((short) objects.size());
+        for (byte[] utf8 : names)
+        {
+            buf.putShort((short) utf8.length);
+            buf.put(utf8);
+        }
+        for (int i = 0; i < objects.size(); i++)
+        {
+            QpOsrsPlugin.ObjectInfo info = objects.get(i);
+            buf.putShort((short) info.index);
+            buf.putShort((short) nameIds[i]);
+            buf.putInt(info.id);
+            buf.put((byte) typeCode(info.type));
+            buf.put((byte) info.level);
+            for (int k = 0; k < 4; k++)
+            {
+                buf.putShort((short) info.bbox[k]);
+            }
+        }
+        if (delta)
+        {
+            buf.putShort((short) removedCount);
+            for (int k = 0; k < removedCount; k++)
+            {
+                buf.putShort((short) removed[k]);
+            }
+        }
+        return buf.array();
+    }
+}
@@ -0,0 +1,77 @@
+package com.example.qposrs;
+
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.Objects;
+
+/**
+ * Turns the per-tick object lists into keyframes and deltas.
+ *
+ * A keyframe with every object is sent every {@code keyframeInterval}
+ * messages; in between only the objects that were added or changed since the
+ * previous message are sent, together with the indices that disappeared.
+ * Objects are keyed by NPC index.  Every message carries an increasing
+ * sequence number so the subscriber can detect a lost delta and wait for the
+ * next keyframe.
+ */
+public class ObjectDeltaTracker
+{
+    private final int keyframeInterval;
+    private Map<Integer, QpOsrsPlugin.ObjectInfo> previous = new HashMap<>();
+    private int seq;
+    private int sinceKeyframe;
+
+    public ObjectDeltaTracker(int keyframeInterval)
+    {
+        this.keyframeInterval = Math.max(keyframeInterval, 1);
+        this.sinceKeyframe = this.keyframeInterval;
+    }
+
+    public byte[] encode(int tick, List<QpOsrsPlugin.ObjectInfo> objects)
+    {
+        Map<Integer, QpOsrsPlugin.ObjectInfo> current = new HashMap<>();
+        for (QpOsrsPlugin.ObjectInfo info : objects)
+        {
+            current.put(info.index, info);
+        }
+        byte[] message;
+        if (sinceKeyframe >= keyframeInterval)
+        {
+            message = BinaryObjectEncoder.encode(tick, objects, BinaryObjectEncoder.FLAG_KEYFRAME, seq, null);
+            sinceKeyframe = 0;
+        }
+        else
+        {
+            List<QpOsrsPlugin.ObjectInfo> changed = new ArrayList<>();
+            for (QpOsrsPlugin.ObjectInfo info : objects)
+            {
+                if (!same(previous.get(info.index), info))
+                {
+                    changed.add(info);
+                }
+            }
+            int[] removed = previous.keySet().stream()
+                .filter(index -> !current.containsKey(index))
+                .mapToInt(Integer::intValue)
+                .toArray();
+            message = BinaryObjectEncoder.encode(tick, changed, BinaryObjectEncoder.FLAG_DELTA, seq, removed);
+        }
+        previous = current;
+        seq = (seq + 1) & 0xFFFF;
+        sinceKeyframe++;
+        return message;
+    }
+
+    private static boolean same(QpOsrsPlugin.ObjectInfo a, QpOsrsPlugin.ObjectInfo b)
+    {
+        return a != null
+            && a.id == b.id
+            && a.level == b.level
+            && Objects.equals(a.name, b.name)
+            && Objects.equals(a.type, b.type)
+            && Arrays.equals(a.bbox, b.bbox);
+    }
+}
@@ -2,6 +2,8 @@ package com.example.qposrs;
 
 import com.google.gson.Gson;
 import com.google.inject.Provides;
+import java.awt.Rectangle;
+import java.awt.Shape;
 import java.util.ArrayList;
 import java.util.List;
 import javax.inject.Inject;
@@ -33,6 +35,10 @@ public class QpOsrsPlugin extends Plugin
 
     private ZmqPublisher publisher;
 
+    private QpOsrsConfig config;
+
+    private ObjectDeltaTracker deltaTracker;
+
     private final Gson gson = new Gson();
 
     @Provides
@@ -44,8 +50,11 @@ public class QpOsrsPlugin extends Plugin
     @Override
     protected void startUp() throws Exception
     {
-        QpOsrsConfig config = provideConfig(getInjector());
-        publisher = new ZmqPublisher("tcp://127.0.0.1:5555");
+        config = provideConfig(getInjector());
+        // Deltas must all arrive, so only full snapshots may be conflated
+        boolean delta = config.binaryFeed() && config.deltaFeed();
+        deltaTracker = delta ? new ObjectDeltaTracker(config.keyframeInterval()) : null;
+        publisher = new ZmqPublisher("tcp://127.0.0.1:5555", !delta);
         publisher.start();
         log.info("QpOsrsPlugin started");
     }
@@ -58,6 +67,7 @@ public class QpOsrsPlugin extends Plugin
             publisher.close();
             publisher = null;
         }
+        deltaTracker = null;
         log.info("QpOsrsPlugin stopped");
     }
 
@@ -79,24 +89,63 @@ public class QpOsrsPlugin extends Plugin
             }
             int id = npc.getId();
             String name = npc.getName();
-            // Bounding boxes require project->scene conversion; omitted for brevity
-            ObjectInfo info = new ObjectInfo(id, name, "NPC", new int[]{0, 0, 0, 0}, wp.getPlane());
+            ObjectInfo info = new ObjectInfo(npc.getIndex(), id, name, "NPC", canvasBounds(npc), wp.getPlane());
             objects.add(info);
         }
-        String json = gson.toJson(objects);
+        // The tick number lets the subscriber align objects with captured frames
+        if (deltaTracker != null)
+        {
+            publisher.publish(deltaTracker.encode(client.getTickCount(), objects));
+            return;
+        }
+        if (config != null && config.binaryFeed())
+        {
+            publisher.publish(BinaryObjectEncoder.encode(client.getTickCount(), objects));
+            return;
+        }
+        String json = gson.toJson(new TickObjects(client.getTickCount(), objects));
         publisher.publish(json);
     }
 
+    /**
+     * Canvas-space bounding box [x1, y1, x2, y2] of an NPC's convex hull, or
+     * all zeros when it is not on screen.
+     */
+    private static int[] canvasBounds(NPC npc)
+    {
+        Shape hull = npc.getConvexHull();
+        if (hull == null)
+        {
+            return new int[]{0, 0, 0, 0};
+        }
+        Rectangle r = hull.getBounds();
+        return new int[]{r.x, r.y, r.x + r.width, r.y + r.height};
+    }
+
+    public static class TickObjects
+    {
+        public final int tick;
+        public final List<ObjectInfo> objects;
+
+        public TickObjects(int tick, List<ObjectInfo> objects)
+        {
+            this.tick = tick;
+            this.objects = objects;
+        }
+    }
+
     public static class ObjectInfo
     {
+        public final int index;
         public final int id;
         public final String name;
         public final String type;
         public final int[] bbox;
         public final int level;
 
-        public ObjectInfo(int id, String name, String type, int[] bbox, int level)
+        public ObjectInfo(int index, int id, String name, String type, int[] bbox, int level)
         {
+            this.index = index;
             this.id = id;
             this.name = name;
             this.type = type;
@@ -127,4 +176,40 @@ interface QpOsrsConfig extends Config
     {
         return true;
     }
+
+    @ConfigItem(
+        keyName = "binaryFeed",
+        name = "Binary object feed",
+        description = "Publish a compact binary encoding instead of JSON",
+        position = 2,
+        section = qpSection
+    )
+    default boolean binaryFeed()
+    {
+        return false;
+    }
+
+    @ConfigItem(
+        keyName = "deltaFeed",
+        name = "Delta object feed",
+        description = "With the binary feed, send only changes between periodic keyframes",
+        position = 3,
+        section = qpSection
+    )
+    default boolean deltaFeed()
+    {
+        return false;
+    }
+
+    @ConfigItem(
+        keyName = "keyframeInterval",
+        name = "Keyframe interval",
+        description = "Ticks between full snapshots in the delta feed",
+        position = 4,
+        section = qpSection
+    )
+    default int keyframeInterval()
+    {
+        return 10;
+    }
 }
\ No newline at end of file
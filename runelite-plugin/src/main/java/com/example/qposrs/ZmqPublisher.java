@@ -8,24 +8,35 @@ import org.zeromq.ZMQ;
 /**
  * Simple ZeroMQ publisher that sends strings on a TCP socket.
  *
- * The Python app subscribes to this socket to receive JSON arrays of objects.
+ * The Python app subscribes to this socket to receive the objects of each
+ * game tick.  Only the newest snapshot is worth delivering, so the socket is
+ * conflated by default: a slow subscriber never makes messages queue up here.
+ * Delta feeds must deliver every message and disable conflation.
  */
 @Slf4j
 public class ZmqPublisher implements AutoCloseable
 {
     private final String address;
+    private final boolean conflate;
     private ZContext context;
     private ZMQ.Socket socket;
 
     public ZmqPublisher(String address)
+    {
+        this(address, true);
+    }
+
+    public ZmqPublisher(String address, boolean conflate)
     {
         this.address = address;
+        this.conflate = conflate;
     }
 
     public void start()
     {
         context = new ZContext();
         socket = context.createSocket(SocketType.PUB);
+        socket.setConflate(conflate);
         socket.bind(address);
         log.info("ZeroMQ publisher bound to {}", address);
     }
@@ -38,6 +49,14 @@ public class ZmqPublisher implements AutoCloseable
         }
     }
 
+    public void publish(byte[] message)
+    {
+        if (socket != null)
+        {
+            socket.send(message);
+        }
+    }
+
     @Override
     public void close()
     {
@@ -0,0 +1,99 @@
+"""Tests for the perceptual-hash action cache."""
+
+import threading
+
+import numpy as np
+
+from app.llm_clients.cache import ActionCache, CachedClient
+from app.utils.imagehash import dhash, hamming
+
+
+class _CountingClient:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_action(self, prompt, image, objects=None):
+        self.calls += 1
+        return {"click": [self.calls, 0], "modifiers": {"shift": False}, "reason": "model"}
+
+
+def _frame(seed):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, size=(224, 224, 3), dtype=np.uint8)
+
+
+def test_near_duplicate_frames_hash_close():
+    frame = _frame(0)
+    noisy = frame.copy()
+    noisy[100:104, 100:104] = 255  # e.g. the cursor
+    assert hamming(dhash(frame), dhash(noisy)) <= 4
+    assert hamming(dhash(frame), dhash(_frame(1))) > 10
+
+
+def test_cached_client_hits_on_repeat_and_respects_objects():
+    inner = _CountingClient()
+    client = CachedClient(inner, ActionCache(max_entries=8))
+    frame = _frame(0)
+    first = client.generate_action("p", frame)
+    assert client.generate_action("p", frame) == first
+    assert inner.calls == 1
+    client.generate_action("p", frame, objects=[{"id": 1}])
+    assert inner.calls == 2
+    assert client.summary()["hits"] == 1
+
+
+def test_malformed_replies_are_not_cached():
+    class _Malformed:
+        calls = 0
+
+        def generate_action(self, prompt, image, objects=None):
+            self.calls += 1
+            return {"click": "somewhere", "reason": "model"}
+
+    inner = _Malformed()
+    client = CachedClient(inner, ActionCache())
+    frame = _frame(0)
+    client.generate_action("p", frame)
+    client.generate_action("p", frame)
+    assert inner.calls == 2 and len(client.cache) == 0
+
+
+def test_counters_are_exact_across_threads():
+    client = CachedClient(_CountingClient(), ActionCache())
+    frame = _frame(0)
+    client.generate_action("p", frame)
+    threads = [threading.Thread(target=lambda: [client.generate_action("p", frame) for _ in range(200)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = client.summary()
+    assert summary["hits"] == 800 and summary["misses"] == 1
+
+
+def test_lru_and_ttl_eviction():
+    cache = ActionCache(max_entries=2, ttl=0.0, max_distance=0)
+    for h in (1, 2, 3):
+        cache.put(h, "ctx", {"h": h})
+    assert cache.get(1, "ctx") is None
+    assert cache.get(3, "ctx").action == {"h": 3}
+    expiring = ActionCache(ttl=1e-9)
+    expiring.put(1, "ctx", {})
+    assert expiring.get(1, "ctx") is None
+    # An expired nearest entry does not hide a live one within the threshold.
+    near = ActionCache(ttl=60.0, max_distance=4)
+    near.put(0b1, "ctx", {"h": "stale"})
+    near.put(0b111, "ctx", {"h": "live"})
+    near._entries[("ctx", 0b1)].created -= 120.0
+    assert near.get(0b0, "ctx").action == {"h": "live"} and len(near) == 1
+
+
+def test_persistence_roundtrip(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = ActionCache(path=path)
+    cache.put(0xABCDEF, "ctx", {"click": [1, 2]}, latency=0.5)
+    cache.save()
+    restored = ActionCache(path=path)
+    assert restored.load() == 1
+    assert restored.get(0xABCDEF, "ctx").latency == 0.5
@@ -1,29 +1,9 @@
 """Unit tests for action schema validation."""
 
-import json
+import pytest
 from jsonschema import validate, ValidationError
 
-
-ACTION_SCHEMA = {
-    "type": "object",
-    "properties": {
-        "click": {
-            "type": "array",
-            "items": {"type": "integer"},
-            "minItems": 2,
-            "maxItems": 2,
-        },
-        "modifiers": {
-            "type": "object",
-            "properties": {
-                "shift": {"type": "boolean"},
-            },
-            "required": ["shift"],
-        },
-        "reason": {"type": "string"},
-    },
-    "required": ["click", "modifiers", "reason"],
-}
+from app.actions import ACTION_SCHEMA, compile_schema
 
 
 def test_valid_action():
@@ -47,4 +27,37 @@ def test_invalid_action_wrong_type():
         validate(instance=action, schema=ACTION_SCHEMA)
         assert False, "Expected ValidationError"
     except ValidationError:
-        pass
\ No newline at end of file
+        pass
+
+
+@pytest.mark.parametrize("action", [
+    {"click": [123, 456], "modifiers": {"shift": False}, "reason": "test"},
+    {"click": [1, 2], "modifiers": {"shift": False}},
+    {"click": ["x", "y"], "modifiers": {"shift": False}, "reason": "bad"},
+    {"click": [1, 2, 3], "modifiers": {"shift": True}, "reason": ""},
+    {"click": [1.5, 2], "modifiers": {"shift": True}, "reason": ""},
+    {"click": [True, 2], "modifiers": {"shift": True}, "reason": ""},
+    {"click": [1, 2], "modifiers": {}, "reason": ""},
+    {"click": [1, 2], "modifiers": {"shift": 0}, "reason": ""},
+    {"click": [1, 2], "modifiers": {"shift": False}, "reason": None},
+    [1, 2],
+])
+def test_compiled_validator_agrees_with_jsonschema(action):
+    try:
+        validate(instance=action, schema=ACTION_SCHEMA)
+        expected = True
+    except ValidationError:
+        expected = False
+    assert (compile_schema(ACTION_SCHEMA)(action) is None) == expected
+
+
+def test_compiled_validator_messages():
+    check = compile_schema(ACTION_SCHEMA)
+    assert check({"click": [1, 2], "modifiers": {"shift": False}}) == "$.reason: missing"
+    assert check({"click": ["x", 2], "modifiers": {"shift": False}, "reason": ""}) == "$.click[]: expected integer"
+    capped = compile_schema({"type": "object", "properties": {"reason": {"type": "string", "maxLength": 3}},
+                             "additionalProperties": False})
+    assert capped({"reason": "abcd"}) == "$.reason: maxLength"
+    assert capped({"other": 1}) == "$: unexpected property"
+    with pytest.raises(ValueError):
+        compile_schema({"type": "object", "patternProperties": {}})
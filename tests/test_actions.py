@@ -0,0 +1,81 @@
+"""Tests for action parsing and model-to-window click mapping."""
+
+import numpy as np
+
+from app.actions import Action, ActionParser, scale_points
+from app.config import FIXED_REGIONS
+from app.metrics import MetricsRegistry
+from app.utils.spatial import GridIndex
+
+
+def _raw(x, y, **extra):
+    return dict({"click": [x, y], "modifiers": {"shift": False}, "reason": "r"}, **extra)
+
+
+def test_parse_counts_failures():
+    metrics = MetricsRegistry()
+    parser = ActionParser(fallback_reasons=("fallback centre click",), metrics=metrics)
+    action = parser.parse(_raw(3, 4))
+    assert action == Action(3, 4, False, "r") and action.as_dict() == _raw(3, 4)
+    assert parser.parse({"click": [1, 2]}) is None
+    assert parser.parse(_raw("a", 2)) is None
+    assert parser.parse(_raw(112, 112, reason="fallback centre click")) is None
+    assert parser.parse("not an object") is None
+    assert parser.summary() == {
+        "parsed": 1,
+        "invalid": 4,
+        "failures": {"$.modifiers: missing": 1, "$.click[]: expected integer": 1, "fallback": 1,
+                     "$: expected object": 1},
+    }
+    assert metrics.summary()["counters"]["invalid_actions"] == 4
+
+
+def test_model_clicks_scale_to_window():
+    parser = ActionParser()
+    actions = [parser.parse(_raw(0, 0)), parser.parse(_raw(112, 112)), parser.parse(_raw(500, -3))]
+    mapped = parser.to_window(actions, (765, 503))
+    assert [a.click for a in mapped] == [(1, 1), (384, 252), (764, 0)]
+    # One window size per action maps a whole batch in one call.
+    mapped = parser.to_window(actions[:2], [(224, 224), (448, 448)])
+    assert [a.click for a in mapped] == [(0, 0), (225, 225)]
+    assert parser.to_window([], (765, 503)) == []
+
+
+def test_region_clicks_map_into_their_region():
+    parser = ActionParser(regions=FIXED_REGIONS)
+    viewport, inventory = FIXED_REGIONS[0], FIXED_REGIONS[1]
+    actions = [parser.parse(_raw(192, 126)), parser.parse(_raw(0, 0, image=1)), parser.parse(_raw(0, 0, image=9)),
+               parser.parse(_raw(10_000, -5))]
+    assert [a.image for a in actions] == [0, 1, 0, 0]
+    mapped = parser.to_window(actions)
+    # Centre of the 384×252 viewport image is the centre of the 512×334 crop;
+    # clicks outside the image are clamped to the region.
+    assert [a.click for a in mapped] == [(4 + 256, 4 + 167), (inventory.left, inventory.top),
+                                         (viewport.left, viewport.top),
+                                         (viewport.left + viewport.width - 1, viewport.top)]
+    assert all(a.image == 0 for a in mapped)
+
+
+def test_model_click_snaps_to_window_pixel_box():
+    metrics = MetricsRegistry()
+    parser = ActionParser(metrics=metrics)
+    # A goblin in the middle of the 765×503 canvas; (112, 112) in the 224×224
+    # model image is the same spot but, unscaled, far from the box.
+    goblin = [{"index": 1, "bbox": [370, 235, 400, 270]}]
+    grid = GridIndex(cell=32)
+    action = parser.snap_to_window(parser.parse(_raw(112, 112)), (765, 503), grid, goblin, 24.0)
+    assert action.click == (385, 252)
+    assert grid.snap(112, 112, 24.0) is None
+    assert metrics.summary()["counters"]["snapped_clicks"] == 1
+    # Nothing within reach: the click is only mapped.
+    action = parser.snap_to_window(parser.parse(_raw(0, 0)), (765, 503), grid, goblin, 24.0)
+    assert action.click == (1, 1)
+
+
+def test_scale_points_matches_scalar_mapping():
+    rng = np.random.default_rng(0)
+    points = rng.integers(-10, 240, size=(100, 2))
+    out = scale_points(points, (224, 224), (765, 503))
+    for (x, y), (wx, wy) in zip(points, out):
+        assert wx == min(max(int(np.floor((x + 0.5) * 765 / 224)), 0), 764)
+        assert wy == min(max(int(np.floor((y + 0.5) * 503 / 224)), 0), 502)
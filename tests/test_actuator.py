@@ -0,0 +1,61 @@
+"""Tests for the background mouse actuator."""
+
+import time
+
+from app.actuator import Actuator, NullBackend
+from app.metrics import MetricsRegistry
+
+WINDOW = {"left": 100, "top": 50, "width": 765, "height": 503}
+
+
+def make(duration=0.05):
+    backend = NullBackend(start=(0, 0))
+    actuator = Actuator(backend, steps=10, duration=duration, metrics=MetricsRegistry())
+    actuator.start()
+    return backend, actuator
+
+
+def test_submit_returns_immediately_and_clicks_in_window():
+    backend, actuator = make(duration=0.1)
+    try:
+        start = time.monotonic()
+        command = actuator.submit((10, 20), WINDOW)
+        assert time.monotonic() - start < 0.02
+        assert command.done.wait(2.0)
+        assert backend.clicks() == [(110, 70)]
+        assert command.actual >= 0.1
+        # clamped to the window
+        actuator.submit((5000, -5), WINDOW).done.wait(2.0)
+        assert backend.clicks()[-1] == (100 + 765 - 1, 50)
+    finally:
+        actuator.stop()
+    stats = actuator.summary()
+    assert stats["completed"] == 2
+    assert stats["planned_ms"] == 100.0
+    assert stats["actual_ms"] >= 100.0
+
+
+def test_newer_target_preempts_in_flight_path():
+    backend, actuator = make(duration=0.3)
+    try:
+        first = actuator.submit((700, 400), WINDOW)
+        time.sleep(0.05)
+        second = actuator.submit((20, 20), WINDOW)
+        assert second.done.wait(2.0)
+        assert first.preempted and not second.preempted
+        assert backend.clicks() == [(120, 70)]
+    finally:
+        actuator.stop()
+    assert actuator.summary()["preempted"] == 1
+
+
+def test_other_sources_are_queued_not_preempted():
+    backend, actuator = make(duration=0.05)
+    try:
+        a = actuator.submit((10, 10), WINDOW, source="window0")
+        b = actuator.submit((30, 30), WINDOW, source="window1")
+        assert actuator.wait_idle(2.0)
+        assert not a.preempted and not b.preempted
+        assert backend.clicks() == [(110, 60), (130, 80)]
+    finally:
+        actuator.stop()
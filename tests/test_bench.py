@@ -0,0 +1,84 @@
+"""Tests for the offline benchmark harness and stub model server."""
+
+import cv2
+import numpy as np
+import pytest
+
+from app.actions import action_schema, compile_schema
+from app.bench import StubModelServer, load_frames, parse_latency, run_bench
+from app.llm_clients import OllamaClient
+from app.metrics import MetricsRegistry
+from app.recorder import RunRecorder
+
+
+def test_parse_latency_specs():
+    assert parse_latency("constant:0.2")() == 0.2
+    uniform = parse_latency("uniform:0.1:0.3", seed=1)
+    assert all(0.1 <= uniform() <= 0.3 for _ in range(50))
+    assert all(parse_latency("normal:0.0:1.0", seed=2)() >= 0.0 for _ in range(50))
+    with pytest.raises(ValueError):
+        parse_latency("gamma:1")
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_bench_against_stub(stream):
+    server = StubModelServer(parse_latency("constant:0.05"))
+    server.start()
+    client = OllamaClient(url=server.url, pool_size=4, stream=stream)
+    frames = [np.full((300, 400, 3), i, dtype=np.uint8) for i in range(4)]
+    try:
+        report = run_bench(client, frames, "p", iterations=16, concurrency=4, warmup=1,
+                           registry=MetricsRegistry())
+    finally:
+        client.close()
+        server.stop()
+    assert report["fallbacks"] == 0
+    assert server.requests == 17
+    # 16 requests of 50 ms, four at a time, take well under the serial 0.8 s
+    assert report["wall_s"] < 0.6
+    assert report["latency_ms"]["p50"] >= 50.0
+    assert report["stages"]["resize"]["count"] == 16
+    if stream:
+        assert client.early_stops == 17
+
+
+def test_load_frames_from_images_and_recordings(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    frame = np.zeros((20, 30, 3), dtype=np.uint8)
+    frame[..., 2] = 200  # red in BGR
+    cv2.imwrite(str(images / "frame_0.png"), frame)
+    assert np.array_equal(load_frames(str(images))[0], frame)
+    run = tmp_path / "run"
+    recorder = RunRecorder(str(run), compression="delta", keyframe_interval=2, metrics=MetricsRegistry())
+    recorder.start()
+    expected = []
+    for i in range(3):
+        bgr = frame.copy()
+        bgr[i, :4] = i
+        expected.append(bgr)
+        recorder.record(float(i), bgr[..., ::-1].copy(), None, None)
+    recorder.stop()
+    # Recorded RGB frames, keyframes and deltas alike, come back as BGR.
+    loaded = load_frames(str(run))
+    assert len(loaded) == 3 and all(np.array_equal(a, b) for a, b in zip(loaded, expected))
+
+
+def test_stub_tells_batches_from_region_requests():
+    server = StubModelServer(parse_latency("constant:0.0"))
+    server.start()
+    schema = action_schema("capped", 20, images=2, strict=True)
+    client = OllamaClient(url=server.url, schema=schema)
+    crops = [np.zeros((224, 224, 3), np.uint8), np.zeros((64, 64, 3), np.uint8)]
+    try:
+        region = client.generate_action("p", crops)
+        batch = client.generate_actions("p", [crops[0], crops[0]])
+        # Several windows in region mode: one request and one action each.
+        windows = client.generate_actions("p", [crops, crops, crops])
+    finally:
+        client.close()
+        server.stop()
+    assert region["image"] == 0 and compile_schema(schema)(region) is None
+    assert len(batch) == 2
+    assert len(windows) == 3 and all(compile_schema(schema)(action) is None for action in windows)
+    assert server.requests == 5
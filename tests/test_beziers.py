@@ -0,0 +1,34 @@
+"""Tests for the vectorised Bezier path generator."""
+
+import random
+
+import numpy as np
+
+from app.utils.beziers import bernstein_basis, bezier_path, bezier_paths
+from benchmarks.bench_beziers import loop_bezier_path
+
+
+def test_matches_loop_implementation_with_same_seed():
+    for steps in (2, 15, 20, 60):
+        random.seed(steps)
+        expected = loop_bezier_path((10, 700), (640, 20), steps)
+        random.seed(steps)
+        assert bezier_path((10, 700), (640, 20), steps) == expected
+
+
+def test_batch_equals_successive_single_paths():
+    starts = [(0, 0), (100, 50), (300, 300)]
+    ends = [(500, 400), (20, 20), (301, 299)]
+    random.seed(3)
+    expected = [loop_bezier_path(s, e, 15) for s, e in zip(starts, ends)]
+    random.seed(3)
+    paths = bezier_paths(starts, ends, 15)
+    assert paths.shape == (3, 15, 2)
+    assert [list(map(tuple, p)) for p in paths.tolist()] == expected
+
+
+def test_basis_is_cached_and_partitions_unity():
+    basis = bernstein_basis(20)
+    assert bernstein_basis(20) is basis
+    assert np.allclose(basis.sum(axis=1), 1.0)
+    assert not basis.flags.writeable
@@ -0,0 +1,46 @@
+"""Tests for the background capture thread and its ring buffer."""
+
+import time
+
+import numpy as np
+
+from app.capture import ScreenCapturer
+
+
+class _FakeCapturer(ScreenCapturer):
+    """Capturer that synthesises frames instead of grabbing the screen."""
+
+    def __init__(self, fps):
+        super().__init__({"left": 0, "top": 0, "width": 8, "height": 8}, fps=fps)
+        self.count = 0
+
+    def grab_resized(self, size=(224, 224)):
+        self.count += 1
+        return np.full((size[1], size[0], 3), self.count % 255, dtype=np.uint8)
+
+
+def test_ring_buffer_latest_and_since():
+    capturer = _FakeCapturer(fps=100)
+    assert capturer.latest() is None
+    capturer.start((4, 4), ring_size=3)
+    try:
+        first = capturer.wait_for_frame(0.0, timeout=1.0)
+        assert first is not None
+        second = capturer.wait_for_frame(first[0], timeout=1.0)
+        assert second[0] > first[0]
+        time.sleep(0.1)
+        newer = capturer.since(first[0])
+        assert 1 <= len(newer) <= 3
+        assert [ts for ts, _ in newer] == sorted(ts for ts, _ in newer)
+        assert capturer.latest()[0] == newer[-1][0]
+    finally:
+        capturer.stop()
+    assert not capturer.threaded
+
+
+def test_capture_thread_honours_fps():
+    capturer = _FakeCapturer(fps=20)
+    capturer.start((4, 4))
+    time.sleep(0.5)
+    capturer.stop()
+    assert 5 <= capturer.count <= 13
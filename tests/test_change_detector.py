@@ -0,0 +1,51 @@
+"""Tests for the frame-difference gate."""
+
+import numpy as np
+
+from app.capture import ChangeDetector
+
+
+def _frame(value):
+    return np.full((224, 224, 3), value, dtype=np.uint8)
+
+
+def test_static_frames_are_skipped():
+    gate = ChangeDetector(threshold=2.0, max_skip=0)
+    assert gate.changed(_frame(100))  # first frame is always sent
+    assert not gate.changed(_frame(100))
+    assert not gate.changed(_frame(101))
+    assert gate.changed(_frame(130))
+    assert gate.summary() == {"sent": 2, "skipped": 2, "skip_ratio": 0.5}
+
+
+def test_drift_accumulates_against_last_sent_frame():
+    gate = ChangeDetector(threshold=3.0, max_skip=0)
+    gate.changed(_frame(100))
+    assert not gate.changed(_frame(101))
+    assert not gate.changed(_frame(102))
+    assert gate.changed(_frame(103))
+
+
+def test_max_skip_forces_refresh():
+    gate = ChangeDetector(threshold=2.0, max_skip=2)
+    gate.changed(_frame(50))
+    assert not gate.changed(_frame(50))
+    assert not gate.changed(_frame(50))
+    assert gate.changed(_frame(50))
+
+
+def test_zero_threshold_sends_everything():
+    gate = ChangeDetector(threshold=0.0)
+    assert all(gate.changed(_frame(10)) for _ in range(3))
+
+
+def test_regions_are_compared_one_by_one():
+    gate = ChangeDetector(threshold=2.0, max_skip=0)
+    viewport, inventory = _frame(100), np.full((64, 48, 3), 100, dtype=np.uint8)
+    assert gate.changed([viewport, inventory])
+    assert not gate.changed([viewport, inventory.copy()])
+    # An item used in one slot barely moves the whole-window mean, but its
+    # region changed.
+    used = inventory.copy()
+    used[:16, :12] = 0
+    assert gate.changed([viewport, used])
@@ -0,0 +1,66 @@
+"""Tests for the regression evaluation runner."""
+
+import json
+from functools import partial
+
+import cv2
+import numpy as np
+import pytest
+
+from app.bench import StubModelServer, parse_latency
+from app.evaluation import load_labels, run_eval, score
+from app.llm_clients import OllamaClient
+
+
+def test_score_and_labels(tmp_path):
+    hit, error = score((10, 10), [(0, 0, 20, 20), (100, 100, 120, 120)])
+    assert hit and error == 0.0
+    hit, error = score((30, 10), [(0, 0, 20, 20)])
+    assert not hit and error == 20.0
+    path = tmp_path / "labels.json"
+    path.write_text(json.dumps({"size": [448, 448], "frames": {"a.png": [[40, 20, 0, 0]]}}))
+    assert load_labels(str(path)) == {"a.png": [(0.0, 0.0, 20.0, 10.0)]}
+    path.write_text(json.dumps({"frames": {"a.png": [[1, 2, 3]]}}))
+    with pytest.raises(ValueError):
+        load_labels(str(path))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_eval_against_stub_is_cached(tmp_path, workers):
+    frames_dir = tmp_path / "frames"
+    frames_dir.mkdir()
+    for i in range(4):
+        cv2.imwrite(str(frames_dir / f"frame_{i}.png"), np.full((50, 50, 3), i * 40, np.uint8))
+    # The stub always clicks the centre (112, 112) of the 224×224 frame.
+    labels = {"frame_0.png": [(100, 100, 120, 120)], "frame_1.png": [(0, 0, 10, 10)]}
+    server = StubModelServer(parse_latency("constant:0.02"))
+    server.start()
+    factory = partial(OllamaClient, url=server.url)
+    try:
+        report = run_eval(factory, str(frames_dir), labels, "p", "stub", workers=workers,
+                          fallback_reasons=OllamaClient.FALLBACK_REASONS)
+        assert report["evaluated"] == 4 and report["cached"] == 0
+        assert report["labelled"] == 2 and report["hit_rate"] == 0.5
+        assert report["invalid_rate"] == 0.0
+        assert report["pixel_error"]["mean"] == pytest.approx((np.hypot(2, 2) + np.hypot(107, 107)) / 2, abs=0.01)
+        assert report["latency_ms"]["p50"] >= 20.0
+        assert server.requests == 4
+        # Reruns only evaluate what changed: nothing, then a new prompt.
+        again = run_eval(factory, str(frames_dir), labels, "p", "stub", workers=workers)
+        assert again["evaluated"] == 0 and again["hit_rate"] == 0.5 and server.requests == 4
+        cv2.imwrite(str(frames_dir / "frame_3.png"), np.full((50, 50, 3), 255, np.uint8))
+        changed = run_eval(factory, str(frames_dir), labels, "p", "stub", workers=workers)
+        assert changed["evaluated"] == 1 and server.requests == 5
+        other = run_eval(factory, str(frames_dir), labels, "q", "stub", workers=workers)
+        assert other["evaluated"] == 4 and server.requests == 9
+    finally:
+        server.stop()
+
+
+def test_unreachable_backend_counts_as_invalid(tmp_path):
+    cv2.imwrite(str(tmp_path / "frame.png"), np.zeros((20, 20, 3), np.uint8))
+    factory = partial(OllamaClient, url="http://127.0.0.1:9/api/generate", connect_timeout=0.2)
+    report = run_eval(factory, str(tmp_path), {"frame.png": [(0, 0, 224, 224)]}, "p", "down", workers=0,
+                      cache_path="", fallback_reasons=OllamaClient.FALLBACK_REASONS)
+    assert report["invalid_rate"] == 1.0 and report["hit_rate"] == 0.0 and report["results"][0]["hit"] is False
+    assert report["failures"] == {"fallback": 1}
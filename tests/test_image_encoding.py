@@ -0,0 +1,40 @@
+"""Tests for the shared image encoder."""
+
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from app.llm_clients.encoding import ImageEncoder
+
+
+def _frame():
+    img = np.zeros((224, 224, 3), dtype=np.uint8)
+    img[:, :, 0] = 200  # strong first channel
+    return img
+
+
+@pytest.mark.parametrize("fmt", ["jpeg", "webp", "png"])
+def test_encode_roundtrip_bare_base64(fmt):
+    encoder = ImageEncoder(fmt=fmt, quality=80)
+    encoded = encoder.encode(_frame())
+    raw = base64.b64decode(encoded.data)
+    assert len(raw) == encoded.nbytes
+    decoded = cv2.imdecode(np.frombuffer(raw, dtype=np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (224, 224, 3)
+    # RGB input: first channel ends up as red, i.e. the last BGR channel
+    assert decoded[..., 2].mean() > 150
+    assert encoded.data_uri().startswith(f"data:{encoded.mime};base64,")
+    assert encoder.summary()["frames"] == 1
+
+
+def test_bgr_input_skips_conversion():
+    encoded = ImageEncoder(fmt="png", channel_order="bgr").encode(_frame())
+    decoded = cv2.imdecode(np.frombuffer(base64.b64decode(encoded.data), dtype=np.uint8), cv2.IMREAD_COLOR)
+    assert decoded[..., 0].mean() == 200
+
+
+def test_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        ImageEncoder(fmt="gif")
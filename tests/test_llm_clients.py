@@ -0,0 +1,211 @@
+"""Tests for the pooled HTTP model clients."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from app.actions import action_schema, compile_schema
+from app.llm_clients import OllamaClient, OpenAPIClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+    connections = set()
+    requests = []
+
+    def do_POST(self):
+        type(self).connections.add(self.client_address)
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length))
+        type(self).requests.append(request)
+        time.sleep(type(self).delay)
+        action = {"click": [10, 20], "modifiers": {"shift": False}, "reason": "ok"}
+        images = request.get("images", [])
+        if len(images) > 1:
+            text = json.dumps([dict(action, click=[i, i]) for i in range(len(images))])
+        else:
+            text = json.dumps(action)
+        body = json.dumps({"response": text}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _DribblingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"response": json.dumps({"click": [1, 2], "modifiers": {"shift": False}})}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            # One byte every 20 ms: no single read ever times out.
+            for i in range(len(body)):
+                self.wfile.write(body[i:i + 1])
+                self.wfile.flush()
+                time.sleep(0.02)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(delay=0.0):
+    handler = type("Handler", (_Handler,), {"delay": delay, "connections": set(), "requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler
+
+
+def test_session_reuses_connection():
+    server, handler = _serve()
+    try:
+        client = OllamaClient(url=f"http://127.0.0.1:{server.server_port}/api/generate")
+        image = np.zeros((224, 224, 3), dtype=np.uint8)
+        for _ in range(3):
+            assert client.generate_action("p", image)["click"] == [10, 20]
+        assert len(handler.connections) == 1
+        client.close()
+    finally:
+        server.shutdown()
+
+
+def test_async_deadline_abandons_request():
+    server, _ = _serve(delay=1.0)
+    try:
+        client = OllamaClient(url=f"http://127.0.0.1:{server.server_port}/api/generate", pool_size=1)
+        image = np.zeros((224, 224, 3), dtype=np.uint8)
+        start = time.monotonic()
+        action = asyncio.run(client.agenerate_action("p", image, timeout=0.05))
+        assert time.monotonic() - start < 0.4
+        assert action["click"] == [112, 112]
+        # The abandoned request ends at the deadline, not the read timeout.
+        client._executor.submit(lambda: None).result(timeout=0.5)
+        client.close()
+    finally:
+        server.shutdown()
+
+
+def test_deadline_bounds_the_whole_request():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DribblingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/api/generate"
+    image = np.zeros((224, 224, 3), dtype=np.uint8)
+    try:
+        for stream in (False, True):
+            client = OllamaClient(url=url, read_timeout=1.0, deadline=0.2, stream=stream)
+            start = time.monotonic()
+            action = client.generate_action("p", image)
+            assert time.monotonic() - start < 0.5
+            assert action["reason"] == OllamaClient.FALLBACK_REASONS[1]
+            client.close()
+
+        async def cancelled():
+            client = OllamaClient(url=url, read_timeout=1.0, pool_size=1)
+            task = asyncio.ensure_future(client.agenerate_action("p", image))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            start = time.monotonic()
+            # The cancelled request stops at its next chunk and frees the worker.
+            await asyncio.get_running_loop().run_in_executor(client._executor, lambda: None)
+            client.close()
+            return time.monotonic() - start
+
+        assert asyncio.run(cancelled()) < 0.3
+    finally:
+        server.shutdown()
+
+
+def test_encoder_error_returns_fallback():
+    # An empty frame cannot be encoded; no request is sent.
+    client = OllamaClient(url="http://127.0.0.1:9/api/generate")
+    action = client.generate_action("p", np.zeros((0, 10, 3), dtype=np.uint8))
+    assert action["reason"] == OllamaClient.FALLBACK_REASONS[0]
+    client.close()
+
+
+def test_batch_is_one_request_fanned_out():
+    server, handler = _serve()
+    try:
+        client = OllamaClient(url=f"http://127.0.0.1:{server.server_port}/api/generate")
+        images = [np.zeros((224, 224, 3), dtype=np.uint8) for _ in range(3)]
+        actions = client.generate_actions("p", images)
+        assert [a["click"] for a in actions] == [[0, 0], [1, 1], [2, 2]]
+        assert len(handler.requests) == 1
+        assert len(handler.requests[0]["images"]) == 3
+        client.close()
+    finally:
+        server.shutdown()
+
+
+def test_region_observations_get_one_action_each():
+    server, handler = _serve()
+    try:
+        client = OllamaClient(url=f"http://127.0.0.1:{server.server_port}/api/generate")
+        windows = [[np.zeros((224, 224, 3), np.uint8), np.zeros((64, 64, 3), np.uint8)] for _ in range(3)]
+        actions = client.generate_actions("p", windows)
+        assert len(actions) == 3
+        assert len(handler.requests) == 3 and all(len(r["images"]) == 2 for r in handler.requests)
+        client.close()
+    finally:
+        server.shutdown()
+
+
+def test_ollama_prompt_carries_objects():
+    client = OllamaClient(url="http://127.0.0.1:9/api/generate")
+    frame = np.zeros((224, 224, 3), np.uint8)
+    goblin = [{"name": "Goblin", "bbox": [1, 2, 3, 4]}]
+    assert client._build_payload("p", frame, None)["prompt"] == "p"
+    assert client._build_payload("p", frame, goblin)["prompt"].endswith('Objects: [{"name":"Goblin","bbox":[1,2,3,4]}]')
+    batch = client._build_batch_payload("p", [frame, frame], [None, goblin])["prompt"]
+    assert "Objects in image 1: []" in batch and 'Objects in image 2: [{"name":"Goblin"' in batch
+    client.close()
+
+
+def test_schema_and_token_cap_constrain_requests():
+    schema = action_schema("capped", 20, strict=True)
+    frame = np.zeros((224, 224, 3), np.uint8)
+    ollama = OllamaClient(url="http://127.0.0.1:9/api/generate", schema=schema, max_tokens=48)
+    payload = ollama._build_payload("p", frame, None)
+    assert payload["format"] == schema and payload["options"] == {"num_predict": 48}
+    batch = ollama._build_batch_payload("p", [frame, frame], [None, None])
+    assert batch["format"]["maxItems"] == 2 and batch["options"] == {"num_predict": 96}
+    assert "format" not in OllamaClient(url="http://127.0.0.1:9/api/generate")._build_payload("p", frame, None)
+    remote = OpenAPIClient(url="http://127.0.0.1:9/v1", schema=schema, max_tokens=48)
+    payload = remote._build_payload("p", frame, None)
+    assert payload["response_format"]["json_schema"]["schema"] == schema and payload["max_tokens"] == 48
+    batch = remote._build_batch_payload("p", [frame] * 3, [None] * 3)
+    assert batch["response_format"]["json_schema"]["schema"]["properties"]["actions"]["minItems"] == 3
+    # A reply wrapped in `actions` still parses as the batch array.
+    reply = json.dumps({"actions": [{"click": [i, i], "modifiers": {"shift": False}, "reason": ""} for i in range(3)]})
+    assert [a["click"] for a in remote._batch_response({"response": reply}, 3)] == [[0, 0], [1, 1], [2, 2]]
+    ollama.close()
+    remote.close()
+
+
+def test_terse_schemas():
+    check = compile_schema(action_schema("none", strict=True))
+    assert check({"click": [1, 2], "modifiers": {"shift": False}}) is None
+    assert check({"click": [1, 2], "modifiers": {"shift": False}, "reason": "x"}) == "$: unexpected property"
+    check = compile_schema(action_schema("capped", 5, images=3, strict=True))
+    assert check({"click": [1, 2], "modifiers": {"shift": False}, "reason": "short", "image": 2}) is None
+    assert check({"click": [1, 2], "modifiers": {"shift": False}, "reason": "too long", "image": 2}) == "$.reason: maxLength"
+    assert check({"click": [1, 2], "modifiers": {"shift": False}, "reason": "", "image": 3}) == "$.image: maximum"
+    # The lenient form of `none` accepts replies with or without a reason.
+    check = compile_schema(action_schema("none"))
+    assert check({"click": [1, 2], "modifiers": {"shift": False}, "reason": "x"}) is None
@@ -0,0 +1,49 @@
+"""Tests for the stage latency registry and the /metrics endpoint."""
+
+import urllib.request
+
+from app.metrics import MetricsRegistry, MetricsServer
+
+
+def test_summary_percentiles():
+    registry = MetricsRegistry()
+    for ms in range(1, 101):
+        registry.observe("encode", ms / 1000.0)
+    registry.inc("batches", 3)
+    summary = registry.summary()
+    assert summary["encode"]["count"] == 100
+    assert 49.0 <= summary["encode"]["p50_ms"] <= 52.0
+    assert 98.0 <= summary["encode"]["p99_ms"] <= 100.0
+    assert summary["counters"]["batches"] == 3
+
+
+def test_span_records_duration():
+    registry = MetricsRegistry()
+    with registry.span("parse"):
+        pass
+    assert registry.summary()["parse"]["count"] == 1
+
+
+def test_render_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(buckets=(0.01, 0.1))
+    registry.observe("http", 0.005)
+    registry.observe("http", 0.05)
+    registry.observe("http", 5.0)
+    text = registry.render()
+    assert 'qposrs_stage_seconds_bucket{stage="http",le="0.01"} 1' in text
+    assert 'qposrs_stage_seconds_bucket{stage="http",le="0.1"} 2' in text
+    assert 'qposrs_stage_seconds_bucket{stage="http",le="+Inf"} 3' in text
+    assert 'qposrs_stage_seconds_count{stage="http"} 3' in text
+
+
+def test_server_serves_metrics():
+    registry = MetricsRegistry()
+    registry.observe("capture", 0.002)
+    server = MetricsServer(registry, port=0)
+    server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+    finally:
+        server.stop()
+    assert 'qposrs_stage_seconds_count{stage="capture"} 1' in body
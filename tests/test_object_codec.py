@@ -0,0 +1,44 @@
+"""Tests for the binary object‑feed encoding."""
+
+import json
+
+import pytest
+
+from app.object_codec import OBJECT_DTYPE, decode_objects, encode_objects, is_binary, to_dicts
+from app.plugin_feed import ObjectFeed
+
+OBJECTS = [
+    {"index": 3, "id": 3080, "name": "Goblin", "type": "NPC", "bbox": [10, 20, 30, 40], "level": 0},
+    {"index": 9, "id": 3081, "name": "Goblin", "type": "NPC", "bbox": [-5, 0, 12, 12], "level": 1},
+    {"index": 12, "id": 2, "name": "Bob’s axe", "type": "ITEM", "bbox": [0, 0, 0, 0], "level": 2},
+]
+
+
+def test_round_trip_and_name_interning():
+    raw = encode_objects(42, OBJECTS)
+    assert is_binary(raw)
+    tick, names, records = decode_objects(raw)
+    assert tick == 42
+    assert names == ["Goblin", "Bob’s axe"]
+    assert records.dtype == OBJECT_DTYPE and OBJECT_DTYPE.itemsize == 18
+    assert records["bbox"][1].tolist() == [-5, 0, 12, 12]
+    assert to_dicts(names, records) == OBJECTS
+    assert len(raw) < len(json.dumps(OBJECTS))
+
+
+def test_truncated_message_is_rejected():
+    raw = encode_objects(None, OBJECTS)
+    with pytest.raises(ValueError):
+        decode_objects(raw[:-1])
+    assert decode_objects(raw)[0] is None
+
+
+def test_feed_accepts_binary_messages():
+    feed = ObjectFeed()
+    feed.ingest(encode_objects(7, OBJECTS), received=1.0)
+    snapshot = feed.at(1.1)
+    assert snapshot.tick == 7
+    assert snapshot.records.shape == (3,)
+    # Converted once on ingest; lookups hand out the same list.
+    assert snapshot.objects == OBJECTS
+    assert feed.objects_at(1.1) is snapshot.objects
@@ -0,0 +1,57 @@
+"""Tests for the plugin object feed subscriber."""
+
+import json
+import time
+
+import zmq
+
+from app.plugin_feed import ObjectFeed
+
+
+def _msg(tick, name="Goblin"):
+    return json.dumps({"tick": tick, "objects": [{"id": 1, "name": name}]}).encode()
+
+
+def test_decode_envelope_and_bare_array():
+    assert ObjectFeed.decode(_msg(7)) == (7, [{"id": 1, "name": "Goblin"}])
+    assert ObjectFeed.decode(b'[{"id": 2}]') == (None, [{"id": 2}])
+
+
+def test_alignment_picks_snapshot_current_at_capture():
+    feed = ObjectFeed(max_age=1.2)
+    feed.ingest(_msg(1, "a"), received=10.0)
+    feed.ingest(_msg(2, "b"), received=10.6)
+    feed.ingest(_msg(5, "c"), received=11.2)
+    assert feed.at(10.5).tick == 1
+    assert feed.at(10.9).tick == 2
+    assert feed.at(11.3).tick == 5
+    assert feed.at(9.0) is None        # before the first tick
+    assert feed.at(20.0) is None       # stale
+    assert feed.ingest(b"not json") is None
+    stats = feed.summary()
+    assert stats["missed_ticks"] == 2
+    assert stats["parse_errors"] == 1
+    assert stats["misses"] == 2
+
+
+def test_receives_latest_over_zmq():
+    context = zmq.Context.instance()
+    pub = context.socket(zmq.PUB)
+    pub.setsockopt(zmq.LINGER, 0)
+    pub.bind("tcp://127.0.0.1:*")
+    feed = ObjectFeed(pub.getsockopt_string(zmq.LAST_ENDPOINT), poll_ms=20)
+    feed.start()
+    try:
+        deadline = time.monotonic() + 5.0
+        tick = 0
+        while feed.latest() is None and time.monotonic() < deadline:
+            tick += 1
+            pub.send(_msg(tick))
+            time.sleep(0.02)
+        snapshot = feed.latest()
+        assert snapshot is not None
+        assert snapshot.objects == [{"id": 1, "name": "Goblin"}]
+        assert feed.objects_at(time.monotonic()) == snapshot.objects
+    finally:
+        feed.stop()
+        pub.close()
@@ -0,0 +1,63 @@
+"""Tests for keyframe/delta application in the object table."""
+
+from app.object_codec import FLAG_DELTA, FLAG_KEYFRAME, decode_message, encode_message
+from app.object_table import ObjectTable
+from app.plugin_feed import ObjectFeed
+
+
+def npc(index, name="Goblin", x=0):
+    return {"index": index, "id": 3000 + index, "name": name, "type": "NPC", "bbox": [x, 0, 10, 10], "level": 0}
+
+
+def keyframe(seq, objects):
+    return decode_message(encode_message(seq, objects, seq=seq, flags=FLAG_KEYFRAME))
+
+
+def delta(seq, changed, removed=()):
+    return decode_message(encode_message(seq, changed, seq=seq, flags=FLAG_DELTA, removed=removed))
+
+
+def test_deltas_add_move_and_remove():
+    table = ObjectTable()
+    assert table.apply(keyframe(0, [npc(1), npc(2), npc(5, "Man")]))
+    assert table.apply(delta(1, [npc(2, x=40), npc(9, "Cow")], removed=[1]))
+    records = table.records()
+    assert records["index"].tolist() == [2, 5, 9]
+    assert records["bbox"][0].tolist() == [40, 0, 10, 10]
+    assert [table.names[i] for i in records["name"]] == ["Goblin", "Man", "Cow"]
+    assert len(table) == 3 and table.tick == 1
+
+
+def test_gap_waits_for_next_keyframe():
+    table = ObjectTable()
+    assert not table.apply(delta(0, [npc(1)]))   # no keyframe yet
+    table.apply(keyframe(0, [npc(1)]))
+    assert not table.apply(delta(2, [npc(1, x=5)]))  # seq 1 was lost
+    assert not table.apply(delta(3, [npc(1, x=6)]))
+    assert table.apply(keyframe(4, [npc(1, x=7)]))
+    assert table.apply(delta(5, [], removed=[1]))
+    assert len(table) == 0
+    assert table.summary()["gaps"] == 1
+    assert table.summary()["skipped"] == 3
+
+
+def test_sequence_wraps():
+    table = ObjectTable()
+    table.apply(keyframe(0xFFFF, [npc(1)]))
+    assert table.apply(delta(0, [npc(2)]))
+
+
+def test_feed_snapshots_follow_table():
+    feed = ObjectFeed(conflate=False)
+    feed.ingest(encode_message(10, [npc(1), npc(2)], seq=0, flags=FLAG_KEYFRAME), received=1.0)
+    feed.ingest(encode_message(11, [npc(3)], seq=1, flags=FLAG_DELTA, removed=[1]), received=1.6)
+    assert [obj["index"] for obj in feed.objects_at(1.1)] == [1, 2]
+    assert [obj["index"] for obj in feed.objects_at(1.7)] == [2, 3]
+    assert feed.summary()["table"]["deltas"] == 1
+
+
+def test_delta_message_switches_conflation_off():
+    feed = ObjectFeed()
+    feed.ingest(encode_message(10, [npc(1)], seq=0, flags=FLAG_KEYFRAME), received=1.0)
+    assert not feed.conflate and feed._reconnect.is_set()
+    assert [obj["index"] for obj in feed.objects_at(1.1)] == [1]
@@ -0,0 +1,109 @@
+"""Tests for the staged capture → inference → actuation pipeline."""
+
+import threading
+import time
+
+import numpy as np
+
+from app.metrics import MetricsRegistry
+from app.pipeline import Agent, BatchPipeline, DropOldestQueue, Pipeline
+
+
+def test_drop_oldest_queue_keeps_newest():
+    q = DropOldestQueue(maxsize=2)
+    for i in range(5):
+        q.put(i)
+    assert q.get(timeout=0.1) == 3
+    assert q.get(timeout=0.1) == 4
+    assert q.dropped == 3
+
+
+def test_newest_supersedes_queued_items():
+    q = DropOldestQueue(maxsize=4)
+    assert q.newest("a") == "a"
+    q.put("b")
+    q.put("c")
+    assert q.newest("a") == "c"
+    assert q.qsize() == 0 and q.dropped == 2
+
+
+def test_actuator_acts_on_action_inferred_during_tick_wait():
+    acted = []
+    counter = iter(range(1, 10_000))
+
+    def capture():
+        time.sleep(0.01)
+        return time.monotonic(), next(counter)
+
+    def wait_for_tick():
+        time.sleep(0.1)
+
+    pipeline = Pipeline(capture=capture, infer=lambda frame: frame, actuate=acted.append,
+                        wait_for_tick=wait_for_tick, queue_size=2, metrics=MetricsRegistry())
+    deadline = time.monotonic() + 0.45
+    pipeline.run_until(lambda: time.monotonic() < deadline, poll=0.01)
+    # Without re-reading the queue after the wait, the action clicked would
+    # be the one taken before the 100 ms wait, about ten frames old.
+    assert acted and pipeline.summary()["frame_age"]["p50_ms"] < 60
+
+
+def test_pipeline_overlaps_inference_and_actuation():
+    acted = []
+    infer_starts = []
+    lock = threading.Lock()
+
+    def infer(frame):
+        infer_starts.append(time.monotonic())
+        time.sleep(0.05)
+        return {"click": [int(frame[0, 0, 0]), 0]}
+
+    def actuate(action):
+        with lock:
+            acted.append((time.monotonic(), action))
+        time.sleep(0.05)
+
+    counter = iter(range(1, 10_000))
+
+    def capture():
+        ts = time.monotonic()
+        time.sleep(0.01)
+        return ts, np.full((4, 4, 3), next(counter) % 255, dtype=np.uint8)
+
+    pipeline = Pipeline(capture=capture, infer=infer, actuate=actuate, metrics=MetricsRegistry())
+    deadline = time.monotonic() + 0.6
+    pipeline.run_until(lambda: time.monotonic() < deadline, poll=0.01)
+
+    # Serial execution would manage at most 0.6 / 0.1 = 6 actions.
+    assert len(acted) >= 8
+    summary = pipeline.summary()
+    assert summary["infer"]["count"] >= len(acted)
+    assert summary["frame_age"]["p99_ms"] > 0
+    assert summary["dropped_frames"] > 0
+
+
+def test_batch_pipeline_groups_frames_and_fans_out():
+    acted = {0: [], 1: [], 2: []}
+    batch_sizes = []
+
+    def make_agent(index):
+        def capture():
+            time.sleep(0.02)
+            return time.monotonic(), np.full((4, 4, 3), index, dtype=np.uint8)
+
+        return Agent(name=f"a{index}", capture=capture, actuate=lambda action: acted[index].append(action))
+
+    def infer_batch(items):
+        batch_sizes.append(len(items))
+        time.sleep(0.03)
+        return [{"agent": int(frame[0, 0, 0])} for _, frame in items]
+
+    pipeline = BatchPipeline([make_agent(i) for i in range(3)], infer_batch, batch_window=0.03, metrics=MetricsRegistry())
+    deadline = time.monotonic() + 0.5
+    pipeline.run_until(lambda: time.monotonic() < deadline, poll=0.01)
+
+    for index, actions in acted.items():
+        assert actions
+        assert all(action == {"agent": index} for action in actions)
+    assert max(batch_sizes) == 3
+    counters = pipeline.summary()["counters"]
+    assert counters["batched_frames"] / counters["batches"] > 1.5
@@ -0,0 +1,92 @@
+"""Tests for the background run recorder."""
+
+import json
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from app.metrics import MetricsRegistry
+from app.recorder import RunRecorder, iter_recording, read_index
+
+
+def _frames(count, shape=(24, 32, 3)):
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, size=shape, dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        frame[i % shape[0], :5] = i  # a small change per frame
+        frames.append(frame)
+    return frames
+
+
+@pytest.mark.parametrize("compression", ["none", "delta"])
+def test_roundtrip_across_chunks(tmp_path, compression):
+    frames = _frames(10)
+    recorder = RunRecorder(str(tmp_path), chunk_size=3, compression=compression, keyframe_interval=4,
+                           prompt="p", metrics=MetricsRegistry())
+    recorder.start()
+    for i, frame in enumerate(frames):
+        assert recorder.record(float(i), frame, [{"id": i}], {"click": [i, i]})
+    recorder.stop()
+    restored = list(iter_recording(str(tmp_path)))
+    assert len(restored) == 10
+    for i, (entry, frame) in enumerate(restored):
+        assert entry["ts"] == float(i) and entry["action"] == {"click": [i, i]} and entry["objects"] == [{"id": i}]
+        assert np.array_equal(frame, frames[i])
+    assert json.loads((tmp_path / "meta.json").read_text())["prompt"] == "p"
+    chunk = np.load(tmp_path / "frames_00000.npy", mmap_mode="r")
+    assert isinstance(chunk, np.memmap) and chunk.shape == (3, 24, 32, 3)
+    summary = recorder.summary()
+    assert summary["recorded"] == 10 and summary["dropped"] == 0
+    if compression == "delta":
+        assert sum("delta" in entry for entry in read_index(str(tmp_path))) == 7
+        assert summary["chunks"] == 1
+    else:
+        assert summary["chunks"] == 4
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    recorder = RunRecorder(str(tmp_path), queue_size=2, metrics=MetricsRegistry())
+    release = threading.Event()
+    write = recorder._write
+    recorder._write = lambda *item: (release.wait(2.0), write(*item))
+    recorder.start()
+    frames = _frames(6)
+    accepted = [recorder.record(float(i), frame) for i, frame in enumerate(frames)]
+    release.set()
+    recorder.stop()
+    assert not all(accepted)
+    assert recorder.summary()["dropped"] == accepted.count(False)
+    assert len(read_index(str(tmp_path))) == accepted.count(True)
+
+
+def test_recorded_frame_is_a_copy(tmp_path):
+    recorder = RunRecorder(str(tmp_path), metrics=MetricsRegistry())
+    recorder.start()
+    frame = _frames(1)[0]
+    original = frame.copy()
+    recorder.record(0.0, [frame, np.zeros((4, 4, 3), np.uint8)])
+    frame[:] = 0
+    recorder.stop()
+    (_, restored), = iter_recording(str(tmp_path))
+    assert np.array_equal(restored, original)
+    assert os.path.exists(tmp_path / "index.jsonl")
+
+
+def test_region_observations_keep_every_crop(tmp_path):
+    frames = _frames(5)
+    inventories = [np.full((8, 6, 3), i, np.uint8) for i in range(5)]
+    recorder = RunRecorder(str(tmp_path), compression="delta", keyframe_interval=2, metrics=MetricsRegistry())
+    recorder.start()
+    for i in range(5):
+        recorder.record(float(i), [frames[i], inventories[i]])
+    recorder.stop()
+    restored = list(iter_recording(str(tmp_path), regions=True))
+    assert len(restored) == 5
+    for i, (_, crops) in enumerate(restored):
+        assert np.array_equal(crops[0], frames[i]) and np.array_equal(crops[1], inventories[i])
+    # Viewport-only readers are unaffected.
+    assert all(frame.shape == (24, 32, 3) for _, frame in iter_recording(str(tmp_path)))
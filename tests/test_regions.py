@@ -0,0 +1,65 @@
+"""Tests for multi-region capture and click mapping."""
+
+import cv2
+import numpy as np
+import pytest
+
+from app.config import FIXED_REGIONS, RegionConfig, _parse_regions
+from app.llm_clients import OllamaClient
+from app.llm_clients.cache import ActionCache, CachedClient
+from app.regions import RegionPreprocessor, region_prompt
+
+
+def _window(width=765, height=503):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, size=(height, width, 4), dtype=np.uint8)
+
+
+def test_regions_match_reference_crops():
+    src = _window()
+    pre = RegionPreprocessor(FIXED_REGIONS, channel_order="rgb")
+    crops = pre.process(bytearray(src.tobytes()), 765, 503)
+    assert [c.shape for c in crops] == [(252, 384, 3), (196, 143, 3), (80, 105, 3)]
+    for region, crop in zip(FIXED_REGIONS, crops):
+        ref = src[region.top:region.top + region.height, region.left:region.left + region.width]
+        ref = cv2.cvtColor(cv2.resize(ref, region.output_size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGRA2RGB)
+        assert np.array_equal(crop, ref)
+
+
+def test_native_size_region_is_an_exact_copy():
+    src = _window(64, 64)
+    pre = RegionPreprocessor([RegionConfig("inv", 8, 16, 20, 30)], channel_order="bgr", pool_size=2)
+    a = pre.process(bytearray(src.tobytes()), 64, 64)
+    assert np.array_equal(a[0], src[16:46, 8:28, :3])
+    b = pre.process(bytearray(src.tobytes()), 64, 64)
+    c = pre.process(bytearray(src.tobytes()), 64, 64)
+    assert b[0] is not a[0] and c[0] is a[0]
+
+
+def test_region_outside_window_is_rejected():
+    pre = RegionPreprocessor([RegionConfig("viewport", 0, 0, 100, 100)])
+    with pytest.raises(ValueError):
+        pre.process(bytearray(_window(50, 50).tobytes()), 50, 50)
+
+
+def test_config_and_prompt():
+    assert _parse_regions("fixed") == list(FIXED_REGIONS)
+    regions = _parse_regions([{"name": "viewport", "left": 4, "top": 4, "width": 512, "height": 334,
+                               "size": [256, 167]}])
+    assert regions[0].output_size == (256, 167)
+    with pytest.raises(ValueError):
+        _parse_regions([{"name": "bad", "width": 0, "height": 10}])
+    prompt = region_prompt("base", FIXED_REGIONS)
+    assert "image 1: inventory (143×196 pixels)" in prompt
+
+
+def test_clients_send_every_crop():
+    crops = [np.zeros((252, 384, 3), np.uint8), _window(143, 196)[..., :3]]
+    client = OllamaClient(url="http://127.0.0.1:9/api/generate")
+    assert len(client._build_payload("p", crops, None)["images"]) == 2
+    assert client._fallback(crops)["click"] == [192, 126]
+    cached = CachedClient(client, ActionCache())
+    other = [crops[0], np.ascontiguousarray(crops[1][:, ::-1])]
+    assert cached._key("p", crops, None) != cached._key("p", other, None)
+    assert cached._key("p", crops[0], None)[1] != cached._key("p", crops, None)[1]
+    client.close()
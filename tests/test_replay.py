@@ -0,0 +1,82 @@
+"""Tests for the memory-mapped replay dataset."""
+
+import os
+
+import cv2
+import numpy as np
+
+from app.metrics import MetricsRegistry
+from app.recorder import RunRecorder
+from app.replay import CACHE_DIR, ReplayDataset
+
+
+def _write_frames(path, count=5):
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(count):
+        img = rng.integers(0, 255, size=(40, 60, 3), dtype=np.uint8)
+        cv2.imwrite(str(path / f"frame_{i:04d}.png"), img)
+        frames.append(img)
+    return frames
+
+
+def test_directory_cache_is_reused_and_invalidated(tmp_path):
+    frames = _write_frames(tmp_path)
+    (tmp_path / "notes.txt").write_text("ignored")
+    dataset = ReplayDataset.from_directory(str(tmp_path), size=(32, 16))
+    assert dataset.frames.shape == (5, 16, 32, 3)
+    assert isinstance(dataset.frames, np.memmap)
+    expected = cv2.resize(cv2.cvtColor(frames[2], cv2.COLOR_BGR2RGB), (32, 16), interpolation=cv2.INTER_AREA)
+    assert np.array_equal(dataset[2], expected)
+    caches = sorted(os.listdir(tmp_path / CACHE_DIR))
+    assert len(caches) == 2  # frames and names
+    # Unchanged directory: the cache is opened, nothing is rewritten.
+    again = ReplayDataset.from_directory(str(tmp_path), size=(32, 16))
+    assert again.sources == dataset.sources and sorted(os.listdir(tmp_path / CACHE_DIR)) == caches
+    # Touching a frame rebuilds the cache.
+    stat = os.stat(tmp_path / "frame_0001.png")
+    os.utime(tmp_path / "frame_0001.png", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    ReplayDataset.from_directory(str(tmp_path), size=(32, 16))
+    assert len(os.listdir(tmp_path / CACHE_DIR)) == 4
+    # BGR output skips the conversion.
+    bgr = ReplayDataset.from_directory(str(tmp_path), size=(60, 40), channel_order="bgr")
+    assert np.array_equal(bgr[0], frames[0])
+
+
+def test_recording_roundtrip(tmp_path):
+    rng = np.random.default_rng(1)
+    base = rng.integers(0, 255, size=(20, 30, 3), dtype=np.uint8)
+    recorder = RunRecorder(str(tmp_path), chunk_size=2, compression="delta", keyframe_interval=3,
+                           metrics=MetricsRegistry())
+    recorder.start()
+    frames = []
+    for i in range(7):
+        frame = base.copy()
+        frame[i, :4] = i
+        frames.append(frame)
+        recorder.record(float(i), frame, None, {"click": [i, i]})
+    recorder.stop()
+    dataset = ReplayDataset.open(str(tmp_path), size=(30, 20))
+    assert len(dataset) == 7 and dataset.sources == list(range(7))
+    assert dataset.entries[4]["action"] == {"click": [4, 4]}
+    for i, frame in enumerate(frames):
+        assert np.array_equal(dataset[i], frame)
+    # Recorded RGB replayed as BGR is converted; the cache is kept per order.
+    bgr = ReplayDataset.from_recording(str(tmp_path), size=(30, 20), channel_order="bgr")
+    assert np.array_equal(bgr[3], frames[3][..., ::-1])
+    cached = ReplayDataset.open(str(tmp_path), size=(30, 20))
+    assert cached.entries == dataset.entries and np.array_equal(cached.frames, dataset.frames)
+
+
+def test_batches(tmp_path):
+    _write_frames(tmp_path, count=7)
+    dataset = ReplayDataset.from_directory(str(tmp_path), size=(8, 8))
+    batches = list(dataset.batches(3))
+    assert [len(idx) for idx, _ in batches] == [3, 3, 1]
+    assert np.array_equal(batches[1][1], dataset.frames[3:6])
+    shuffled = list(dataset.batches(3, shuffle=True, seed=0))
+    order = np.concatenate([idx for idx, _ in shuffled])
+    assert sorted(order.tolist()) == list(range(7)) and order.tolist() != list(range(7))
+    for idx, frames in shuffled:
+        assert np.array_equal(frames, dataset.frames[idx])
+    assert len(ReplayDataset.from_directory(str(tmp_path / CACHE_DIR))) == 0
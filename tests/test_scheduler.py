@@ -0,0 +1,67 @@
+"""Tests for tick phase-locking in the TickScheduler."""
+
+import time
+
+from app.plugin_feed import ObjectFeed
+from app.scheduler import TickScheduler
+
+
+def _lock(scheduler, last_boundary, count=5, period=0.6, first_tick=100):
+    for k in range(count):
+        scheduler.observe_tick(last_boundary - (count - 1 - k) * period, tick=first_tick + k)
+
+
+def test_locks_to_ticks_and_counts_missed():
+    scheduler = TickScheduler()
+    assert not scheduler.locked and scheduler.next_boundary() is None
+    now = time.monotonic()
+    _lock(scheduler, now)
+    assert scheduler.locked
+    assert abs(scheduler.next_boundary(now + 0.1) - (now + 0.6)) < 1e-6
+    # Two ticks lost in between, with a 10 ms late arrival.
+    scheduler.observe_tick(now + 1.8 + 0.01, tick=107)
+    summary = scheduler.summary()
+    assert summary["missed_ticks"] == 2
+    assert 9.0 < summary["max_drift_ms"] < 11.0
+
+
+def test_untagged_observations_ignore_sub_tick_changes():
+    scheduler = TickScheduler()
+    scheduler.observe_tick(10.0)
+    scheduler.observe_tick(10.1)  # animation, not a tick
+    scheduler.observe_tick(10.6)
+    scheduler.observe_tick(11.8)
+    assert scheduler.ticks == 3
+    assert scheduler.missed_ticks == 1
+
+
+def test_action_ready_before_boundary_is_held_until_after_it():
+    scheduler = TickScheduler(min_interval=0.0, offset=0.02, hold=0.1)
+    now = time.monotonic()
+    _lock(scheduler, now + 0.05 - 0.6)
+    scheduler.wait_for_next_tick()
+    released = time.monotonic()
+    assert released >= now + 0.05 + 0.02
+    assert scheduler.summary()["on_tick"] == 1
+
+
+def test_inference_starts_latency_ahead_of_boundary():
+    scheduler = TickScheduler()
+    scheduler.wait_for_inference()  # not locked: no wait
+    for _ in range(5):
+        scheduler.record_latency(0.1)
+    now = time.monotonic()
+    _lock(scheduler, now + 0.3 - 0.6)
+    scheduler.wait_for_inference()
+    started = time.monotonic()
+    assert now + 0.18 <= started <= now + 0.3
+    assert scheduler.early_starts == 1
+
+
+def test_object_feed_reports_ticks():
+    scheduler = TickScheduler()
+    feed = ObjectFeed()
+    feed.add_tick_listener(lambda tick, received: scheduler.observe_tick(received, tick))
+    feed.ingest(b'{"tick": 1, "objects": []}', received=5.0)
+    feed.ingest(b'{"tick": 2, "objects": []}', received=5.6)
+    assert scheduler.ticks == 2
@@ -0,0 +1,52 @@
+"""Tests for the grid spatial index and click snapping."""
+
+import random
+
+from app.utils.spatial import GridIndex, centre
+
+
+def test_point_queries_return_smallest_box_first():
+    grid = GridIndex(cell=32)
+    grid.insert("big", (0, 0, 200, 200))
+    grid.insert("small", (90, 90, 110, 110))
+    assert grid.at(100, 100) == ["small", "big"]
+    assert grid.at(10, 10) == ["big"]
+    assert grid.at(300, 300) == []
+
+
+def test_snap_inside_and_near_miss():
+    grid = GridIndex(cell=16)
+    grid.insert(1, (100, 100, 120, 140))
+    assert grid.snap(105, 105, max_distance=20) == (110, 120)
+    assert grid.snap(126, 120, max_distance=20) == (110, 120)
+    assert grid.snap(200, 200, max_distance=20) is None
+
+
+def test_nearest_matches_brute_force():
+    rng = random.Random(0)
+    grid = GridIndex(cell=32)
+    boxes = {}
+    for key in range(300):
+        x, y = rng.randrange(0, 700), rng.randrange(0, 480)
+        boxes[key] = (x, y, x + rng.randrange(4, 40), y + rng.randrange(4, 60))
+        grid.insert(key, boxes[key])
+    for _ in range(200):
+        px, py = rng.uniform(0, 765), rng.uniform(0, 503)
+        dists = {k: ((centre(b)[0] - px) ** 2 + (centre(b)[1] - py) ** 2) ** 0.5 for k, b in boxes.items()}
+        expected = min((k for k in dists if dists[k] <= 50), key=dists.get, default=None)
+        found = grid.nearest(px, py, 50)
+        assert (found is None) == (expected is None)
+        if found is not None:
+            assert abs(dists[found] - dists[expected]) < 1e-9
+
+
+def test_sync_only_touches_changes():
+    grid = GridIndex()
+    objects = [{"index": i, "bbox": [i * 50, 0, i * 50 + 20, 20]} for i in range(5)]
+    assert grid.sync(objects) == 5
+    objects[2] = {"index": 2, "bbox": [105, 5, 125, 25]}
+    assert grid.sync(objects[:4]) == 2  # one moved, one removed
+    assert len(grid) == 4 and 4 not in grid
+    assert grid.box(2) == (105, 5, 125, 25)
+    assert grid.sync([{"index": 9, "bbox": [0, 0, 0, 0]}]) == 4  # empty boxes are not indexed
+    assert len(grid) == 0
@@ -0,0 +1,71 @@
+"""Tests for speculative inference during actuation."""
+
+import time
+
+import numpy as np
+
+from app.actuator import Command
+from app.metrics import MetricsRegistry
+from app.speculation import Speculator
+
+
+def _frame(seed):
+    return np.random.default_rng(seed).integers(0, 255, size=(64, 64, 3), dtype=np.uint8)
+
+
+def _speculator(delay=0.05):
+    calls = []
+
+    def infer(image, objects):
+        calls.append(image)
+        time.sleep(delay)
+        return {"click": [len(calls), 0], "reason": "spec"}
+
+    return Speculator(infer, max_distance=4, metrics=MetricsRegistry()), calls
+
+
+def test_matching_post_action_frame_reuses_speculation():
+    speculator, calls = _speculator()
+    command = Command(target=(0, 0), duration=0.0)
+    frame = _frame(1)
+    assert speculator.speculate(frame, after=command)
+    assert not speculator.speculate(frame, after=command)  # one in flight
+    assert speculator.waiting(time.monotonic())
+    assert speculator.take(frame, time.monotonic()) is None  # action still running
+    command.finish()
+    assert not speculator.waiting(time.monotonic())
+    assert speculator.waiting(command.finished - 1.0)  # frame predates the action
+    time.sleep(0.06)
+    action = speculator.take(frame.copy(), time.monotonic())
+    assert action == {"click": [1, 0], "reason": "spec"}
+    assert len(calls) == 1
+    summary = speculator.summary()
+    assert summary["hits"] == 1 and summary["hit_rate"] == 1.0 and summary["saved_s"] >= 0.04
+    speculator.close()
+
+
+def test_changed_frame_discards_and_counts_wasted_time():
+    speculator, _ = _speculator(delay=0.02)
+    command = Command(target=(0, 0), duration=0.0)
+    speculator.speculate(_frame(1), after=command)
+    command.finish()
+    assert speculator.take(_frame(2), time.monotonic()) is None
+    assert not speculator.pending
+    deadline = time.monotonic() + 1.0
+    while speculator.summary()["wasted_s"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    summary = speculator.summary()
+    assert summary["misses"] == 1 and summary["hits"] == 0
+    assert summary["wasted_s"] >= 0.015
+    speculator.close()
+
+
+def test_speculation_copies_reused_capture_buffers():
+    speculator, calls = _speculator(delay=0.0)
+    frame = _frame(3)
+    speculator.speculate(frame)
+    original = frame.copy()
+    frame[:] = 0
+    speculator.take(original, time.monotonic())
+    assert np.array_equal(calls[0], original)
+    speculator.close()
@@ -0,0 +1,74 @@
+"""Tests for streamed responses and early JSON termination."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from app.llm_clients import OllamaClient
+from app.llm_clients.streaming import JsonObjectScanner, iter_lines, iter_stream_events
+
+
+def test_scanner_returns_first_object_across_chunks():
+    scanner = JsonObjectScanner()
+    chunks = ['Sure! ```json\n{"click": [1', '0, 20], "reason": "a } in {a', ' string \\" }"}', "\n``` and more {"]
+    results = [scanner.feed(c) for c in chunks]
+    assert results[:2] == [None, None]
+    assert scanner.parse() == {"click": [10, 20], "reason": 'a } in {a string " }'}
+
+
+def test_scanner_handles_nested_objects():
+    scanner = JsonObjectScanner()
+    assert scanner.feed('{"modifiers": {"shift": false}') is None
+    assert scanner.feed(', "click": [1, 2]} trailing') is not None
+    assert scanner.parse()["modifiers"] == {"shift": False}
+
+
+def test_iter_stream_events_accepts_ndjson_and_sse():
+    lines = [b'{"response": "a"}', b"", b": keep-alive", b'data: {"response": "b"}', b"data: [DONE]", b'{"x": 1}']
+    assert [e["response"] for e in iter_stream_events(lines)] == ["a", "b"]
+    # Chunks split lines anywhere; a line is yielded once its newline arrives.
+    assert list(iter_lines([b'{"a":', b' 1}\n{"b"', b": 2}\n\n", b"tail"])) == [b'{"a": 1}', b'{"b": 2}', b"", b"tail"]
+
+
+class _StreamingHandler(BaseHTTPRequestHandler):
+    finished = None
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        tokens = ['{"click": [5, 6], ', '"modifiers": {"shift": false}, ', '"reason": "x"}']
+        tokens += [" and here is a long explanation"] * 50
+        try:
+            for token in tokens:
+                self.wfile.write((json.dumps({"response": token, "done": False}) + "\n").encode())
+                self.wfile.flush()
+                time.sleep(0.02)
+            self.wfile.write(b'{"response": "", "done": true}\n')
+            type(self).finished = True
+        except (BrokenPipeError, ConnectionResetError):
+            type(self).finished = False
+
+    def log_message(self, *args):
+        pass
+
+
+def test_stream_returns_early_and_hangs_up():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = OllamaClient(url=f"http://127.0.0.1:{server.server_port}/api/generate", stream=True)
+        start = time.monotonic()
+        action = client.generate_action("p", np.zeros((224, 224, 3), dtype=np.uint8))
+        assert action["click"] == [5, 6]
+        assert time.monotonic() - start < 0.5  # the full stream takes ~1 s
+        assert client.early_stops == 1
+        time.sleep(0.3)
+        assert _StreamingHandler.finished is False
+        client.close()
+    finally:
+        server.shutdown()
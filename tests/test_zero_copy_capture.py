@@ -0,0 +1,37 @@
+"""Tests for the allocation-free capture preprocessing path."""
+
+import cv2
+import numpy as np
+
+from app.capture import CHAT_FRACTION, FusedPreprocessor
+
+
+def _bgra(width=765, height=503):
+    img = np.zeros((height, width, 4), dtype=np.uint8)
+    img[..., 0] = 10   # B
+    img[..., 2] = 200  # R
+    return img
+
+
+def test_matches_copy_path_and_masks_chat():
+    src = _bgra()
+    fused = FusedPreprocessor((224, 224), channel_order="rgb")
+    out = fused.process(bytearray(src.tobytes()), 765, 503)
+    ref = cv2.cvtColor(src, cv2.COLOR_BGRA2RGB)
+    ref[int(503 * CHAT_FRACTION):] = 0
+    ref = cv2.resize(ref, (224, 224), interpolation=cv2.INTER_AREA)
+    assert out.shape == (224, 224, 3)
+    assert tuple(out[10, 10]) == (200, 0, 10)
+    assert not out[-5:].any()
+    assert np.abs(out.astype(int) - ref).mean() < 2.0
+
+
+def test_outputs_rotate_through_pool():
+    fused = FusedPreprocessor((32, 32), channel_order="bgr", mask_chat=False, pool_size=2)
+    buf = bytearray(_bgra(64, 64).tobytes())
+    a = fused.process(buf, 64, 64)
+    b = fused.process(buf, 64, 64)
+    c = fused.process(buf, 64, 64)
+    assert a is not b
+    assert c is a
+    assert tuple(a[0, 0]) == (10, 0, 200)